@@ -1,4 +1,5 @@
 import os
+import click
 from flask import Flask
 from flask_sqlalchemy import SQLAlchemy
 from flask_jwt_extended import JWTManager
@@ -33,17 +34,29 @@ def create_app(config_name='default'):
     from app.config import config
     app.config.from_object(config[config_name])
 
+    # JSON responses via orjson when available, same output as Flask's provider
+    if app.config.get('FAST_JSON', True):
+        from app.utils.json_provider import FastJSONProvider
+        app.json = FastJSONProvider(app)
+
     # Setup extensions
     db.init_app(app)
     jwt.init_app(app)
     migrate.init_app(app, db)
     
-    # Initialize caching (SimpleCache by default; can switch to Redis via env vars)
+    # Initialize caching: a per-process LRU in front of a shared tier (Redis when
+    # CACHE_SHARED_TYPE=redis, else a file cache shared by workers on this host).
+    # CACHE_TYPE=SimpleCache or redis selects a single-tier cache instead.
     cache_config = {
-        'CACHE_TYPE': os.environ.get('CACHE_TYPE', 'SimpleCache'),
+        'CACHE_TYPE': os.environ.get('CACHE_TYPE', 'tiered'),
         'CACHE_DEFAULT_TIMEOUT': int(os.environ.get('CACHE_DEFAULT_TIMEOUT', '300'))
     }
-    if cache_config['CACHE_TYPE'].lower() == 'redis':
+    if cache_config['CACHE_TYPE'].lower() == 'tiered':
+        cache_config['CACHE_TYPE'] = 'app.utils.tiered_cache.TieredCache'
+        cache_config.update({key: app.config[key] for key in (
+            'CACHE_SHARED_TYPE', 'CACHE_DIR', 'CACHE_LOCAL_MAX_ITEMS', 'CACHE_LOCAL_TIMEOUT',
+            'CACHE_STALE_TIMEOUT', 'CACHE_LOCK_TIMEOUT', 'CACHE_LOCK_WAIT')})
+    if cache_config['CACHE_TYPE'].lower() == 'redis' or app.config['CACHE_SHARED_TYPE'] == 'redis':
         cache_config.update({
             'CACHE_REDIS_URL': os.environ.get('CACHE_REDIS_URL', 'redis://localhost:6379/0'),
         })
@@ -142,6 +155,32 @@ def create_app(config_name='default'):
     # Using name parameter to avoid naming conflict
     app.register_blueprint(disease_detection_no_jwt.disease_bp, url_prefix='/disease', name='disease_direct')
     
+    # Maintain the per-user dashboard rollup on every ORM write
+    from app.utils.user_stats import register_user_stats_listeners
+    register_user_stats_listeners()
+    from app.utils.ledger_rollup import register_ledger_rollup_listeners
+    register_ledger_rollup_listeners()
+    
+    # Invalidate cached per-user responses when their source rows change
+    from app.utils.cache_versions import register_cache_version_listeners
+    register_cache_version_listeners()
+    
+    # Sampled per-statement latency for index advice (no-op unless QUERY_SAMPLE_RATE > 0)
+    from app.services.query_profiler_service import query_profiler_service
+    with app.app_context():
+        query_profiler_service.init_app(app, db.engine)
+        # Per-request query counts, Server-Timing header and N+1 warnings
+        from app.utils import sql_instrumentation
+        sql_instrumentation.init_app(app, db.engine)
+    
+    # Load the "similar questions" index in the background rather than on the first request
+    from app.services.similar_posts_service import similar_posts_service
+    similar_posts_service.init_app(app)
+    
+    # Negotiated gzip/brotli for buffered responses such as JSON
+    from app.utils import compression
+    compression.init_app(app)
+    
     # Configure the app to serve React frontend from the root URL
     from app.utils.react_serve import configure_react_serve
     configure_react_serve(app)
@@ -166,6 +205,82 @@ def create_app(config_name='default'):
             init_db()
             print("Database initialized with sample data.")
 
+    @app.cli.command("sweep-uploads")
+    def sweep_uploads():
+        from app.utils.history import sweep_orphaned_uploads
+        with app.app_context():
+            removed = sweep_orphaned_uploads()
+            print(f"Removed {removed} orphaned upload file(s).")
+
+    @app.cli.command("recompute-hot-scores")
+    @click.option("--since-hours", type=int, default=None,
+                  help="Only posts created, replied to or voted on in this window")
+    def recompute_hot_scores_command(since_hours):
+        from datetime import datetime, timedelta
+        from app.utils.hot_rank import recompute_hot_scores
+        since = datetime.utcnow() - timedelta(hours=since_hours) if since_hours else None
+        with app.app_context():
+            updated = recompute_hot_scores(since)
+            print(f"Recomputed hot scores for {updated} post(s).")
+
+    @app.cli.command("reconcile-forum-counters")
+    def reconcile_forum_counters():
+        """Recount forum reply and vote counters; schedule it on one host (e.g. hourly cron)."""
+        from app.utils.forum_counters import reconcile_reply_counters, reconcile_vote_counters
+        with app.app_context():
+            fixed = reconcile_reply_counters()
+            print(f"Fixed reply counters on {fixed} post(s).")
+            fixed = reconcile_vote_counters()
+            print(f"Fixed vote counters on {fixed} post(s).")
+
+    @app.cli.command("rebuild-user-stats")
+    def rebuild_user_stats_command():
+        from app.utils.user_stats import rebuild_all_user_stats
+        with app.app_context():
+            processed = rebuild_all_user_stats()
+            print(f"Rebuilt dashboard stats for {processed} user(s).")
+
+    @app.cli.command("rebuild-ledger-rollups")
+    def rebuild_ledger_rollups_command():
+        from app.utils.ledger_rollup import rebuild_all_ledger_rollups
+        with app.app_context():
+            processed = rebuild_all_ledger_rollups()
+            print(f"Rebuilt monthly ledger rollups for {processed} user(s).")
+
+    @app.cli.command("precompress-assets")
+    @click.option("--path", default=None, help="React build directory (default: frontend/build)")
+    def precompress_assets_command(path):
+        """Write .gz/.br variants of the React build; restart the app afterwards."""
+        from app.utils.compression import precompress_directory
+        from app.utils.react_serve import default_react_build_path
+        written = precompress_directory(path or default_react_build_path())
+        print(f"Wrote {written} precompressed file(s).")
+
+    from flask_migrate.cli import db as db_cli
+
+    @db_cli.command("advise-indexes")
+    @click.option("--limit", type=int, default=10, help="Number of suggestions to show")
+    @click.option("--min-calls", type=int, default=1, help="Ignore statements sampled fewer times")
+    def advise_indexes_command(limit, min_calls):
+        """Suggest composite indexes from sampled query statistics."""
+        from app.services.query_profiler_service import load_samples
+        from app.utils.index_advisor import advise_indexes
+        samples = load_samples(app)
+        if not samples:
+            print("No query samples found; run with QUERY_SAMPLE_RATE > 0 first.")
+            return
+        with app.app_context():
+            suggestions = advise_indexes(samples, min_calls=min_calls)[:limit]
+        if not suggestions:
+            print(f"No missing indexes found across {len(samples)} sampled statement(s).")
+            return
+        for s in suggestions:
+            print(f"CREATE INDEX {s['name']} ON {s['table']} ({', '.join(s['columns'])});")
+            print(f"    ~{s['estimated_savings_ms']:.0f} ms saved of {s['statement_ms']:.0f} ms over "
+                  f"~{s['estimated_calls']:.0f} call(s) ({s['share_of_sampled_time']:.1%} of sampled time), "
+                  f"plan: {s['plan'] or 'not captured'}")
+            print(f"    e.g. {s['example'][:200]}")
+
     # Add default cache headers for GET responses (short-lived)
     @app.after_request
     def add_cache_headers(response):
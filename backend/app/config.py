@@ -63,14 +63,84 @@ class Config:
     MAIL_DEFAULT_SENDER = os.environ.get("MAIL_DEFAULT_SENDER", MAIL_USERNAME or "")
     WEATHER_API_KEY = os.environ.get("WEATHER_API_KEY", "")
 
+    # Per-user history caps (table name -> newest rows kept per user)
+    HISTORY_CAPS = {
+        'disease_scans': int(os.environ.get('HISTORY_CAP_DISEASE_SCANS', 10)),
+        'calculator_results': int(os.environ.get('HISTORY_CAP_CALCULATOR_RESULTS', 10)),
+    }
+
+    # Background sweep of upload files whose rows were trimmed or deleted
+    UPLOAD_SWEEP_INTERVAL = int(os.environ.get('UPLOAD_SWEEP_INTERVAL', 300))  # seconds
+    UPLOAD_SWEEP_GRACE_SECONDS = int(os.environ.get('UPLOAD_SWEEP_GRACE_SECONDS', 600))  # skip fresh uploads
+
+    # Rows deleted per statement (and per commit) by background account deletion
+    ACCOUNT_DELETION_CHUNK_SIZE = int(os.environ.get('ACCOUNT_DELETION_CHUNK_SIZE', 500))
+
+    # Forum view counts are buffered and written in batches ('memory' per process, or 'redis' shared)
+    VIEW_COUNTER_BACKEND = os.environ.get('VIEW_COUNTER_BACKEND', 'memory')
+    VIEW_COUNTER_REDIS_URL = os.environ.get('VIEW_COUNTER_REDIS_URL',
+                                            os.environ.get('CACHE_REDIS_URL', 'redis://localhost:6379/0'))
+    VIEW_COUNTER_FLUSH_INTERVAL = int(os.environ.get('VIEW_COUNTER_FLUSH_INTERVAL', 5))  # seconds
+
+    # Two-tier response cache (CACHE_TYPE=tiered): shared tier 'filesystem' (single host) or 'redis'
+    CACHE_SHARED_TYPE = os.environ.get('CACHE_SHARED_TYPE', 'filesystem').lower()
+    CACHE_DIR = os.environ.get('CACHE_DIR')  # Default: <instance folder>/cache
+    CACHE_LOCAL_MAX_ITEMS = int(os.environ.get('CACHE_LOCAL_MAX_ITEMS', 1000))
+    CACHE_LOCAL_TIMEOUT = float(os.environ.get('CACHE_LOCAL_TIMEOUT', 5))  # seconds an entry stays in-process
+    CACHE_STALE_TIMEOUT = float(os.environ.get('CACHE_STALE_TIMEOUT', 60))  # seconds served stale while one worker refreshes
+    CACHE_LOCK_TIMEOUT = int(os.environ.get('CACHE_LOCK_TIMEOUT', 30))  # seconds before a recompute lock is abandoned
+    CACHE_LOCK_WAIT = float(os.environ.get('CACHE_LOCK_WAIT', 1.0))  # seconds to wait for another worker's result
+
+    # "Similar questions" index: snapshot file (default: instance folder) and refresh intervals;
+    # it is loaded and synced by a background thread (off: only refreshed by explicit refresh() calls)
+    SIMILAR_POSTS_BACKGROUND = os.environ.get('SIMILAR_POSTS_BACKGROUND', 'true').lower() == 'true'
+    SIMILAR_POSTS_SNAPSHOT = os.environ.get('SIMILAR_POSTS_SNAPSHOT')
+    SIMILAR_POSTS_SYNC_INTERVAL = int(os.environ.get('SIMILAR_POSTS_SYNC_INTERVAL', 30))  # seconds
+    SIMILAR_POSTS_SNAPSHOT_INTERVAL = int(os.environ.get('SIMILAR_POSTS_SNAPSHOT_INTERVAL', 300))  # seconds
+
+    # Sampled SQL profiling for `flask db advise-indexes` (0 disables; 0.01 samples 1% of statements)
+    QUERY_SAMPLE_RATE = float(os.environ.get('QUERY_SAMPLE_RATE', 0))
+    SLOW_QUERY_MS = float(os.environ.get('SLOW_QUERY_MS', 200))  # sampled SELECTs slower than this are EXPLAINed
+    QUERY_SAMPLES_DIR = os.environ.get('QUERY_SAMPLES_DIR')  # Default: <instance folder>/query_samples
+    QUERY_SAMPLES_FLUSH_INTERVAL = int(os.environ.get('QUERY_SAMPLES_FLUSH_INTERVAL', 60))  # seconds
+
+    # Per-request SQL counts/time as Server-Timing headers, with N+1 warnings (on outside production)
+    SQL_INSTRUMENTATION = os.environ.get('SQL_INSTRUMENTATION',
+                                         str(os.environ.get('FLASK_ENV') != 'production')).lower() == 'true'
+    SQL_INSTRUMENTATION_LOG = os.environ.get('SQL_INSTRUMENTATION_LOG',
+                                             str(os.environ.get('FLASK_ENV') == 'development')).lower() == 'true'  # JSON line per request
+    SQL_REPEAT_THRESHOLD = int(os.environ.get('SQL_REPEAT_THRESHOLD', 5))  # same fingerprint more often = N+1 warning
+
+    # Serialise JSON responses with orjson when installed (false: Flask's stdlib provider)
+    FAST_JSON = os.environ.get('FAST_JSON', 'true').lower() == 'true'
+
+    # gzip/brotli for buffered responses of at least COMPRESS_MIN_SIZE bytes
+    COMPRESS_ENABLED = os.environ.get('COMPRESS_ENABLED', 'true').lower() == 'true'
+    COMPRESS_MIN_SIZE = int(os.environ.get('COMPRESS_MIN_SIZE', 500))  # bytes
+    COMPRESS_GZIP_LEVEL = int(os.environ.get('COMPRESS_GZIP_LEVEL', 6))
+    COMPRESS_BR_LEVEL = int(os.environ.get('COMPRESS_BR_LEVEL', 4))  # 0-11; high levels are too slow per request
+
 class DevelopmentConfig(Config):
     DEBUG = True
 
 class ProductionConfig(Config):
     DEBUG = False
 
+class TestingConfig(Config):
+    TESTING = True
+    # SQLite unless TEST_DATABASE_URL points at a scratch MySQL database (needed for the EXPLAIN tests)
+    SQLALCHEMY_DATABASE_URI = os.environ.get('TEST_DATABASE_URL', 'sqlite://')
+    SQLALCHEMY_ENGINE_OPTIONS = {}
+    RATELIMIT_ENABLED = False
+    SQL_INSTRUMENTATION = True  # Query budgets in tests/ read the per-request stats
+    SQL_INSTRUMENTATION_LOG = False
+    QUERY_SAMPLE_RATE = 0
+    VIEW_COUNTER_BACKEND = 'memory'
+    SIMILAR_POSTS_BACKGROUND = False  # Tests refresh the index explicitly
+
 config = {
     'default': DevelopmentConfig,
     'development': DevelopmentConfig,
     'production': ProductionConfig,
+    'testing': TestingConfig,
 }
@@ -3,7 +3,9 @@ from .user import User
 from .farm import Farm, Crop
 from .disease import DiseaseDetection, DiseaseInfo
 from .forum import ForumPost, ForumReply
-from .transaction import FarmLedger
+from .transaction import FarmLedger, FarmLedgerMonthly
 from .weather import WeatherData
 from .calculator_result import CalculatorResult
 from .crop_predictions import CropRecommendation, CropYieldPrediction
+from .account_deletion import AccountDeletionJob
+from .user_stats import UserStats
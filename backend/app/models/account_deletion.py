@@ -0,0 +1,36 @@
+# app/models/account_deletion.py
+from app import db
+from datetime import datetime
+
+class AccountDeletionJob(db.Model):
+    """Progress record for a background account deletion"""
+    __tablename__ = 'account_deletion_jobs'
+    
+    id = db.Column(db.String(32), primary_key=True)  # Opaque job token (uuid hex)
+    # No foreign key: the job must outlive the user row it deletes
+    user_id = db.Column(db.Integer, nullable=False, index=True)
+    status = db.Column(db.Enum('pending', 'running', 'completed', 'failed', name='deletion_status'),
+                       default='pending', nullable=False)
+    current_step = db.Column(db.String(64))  # Table currently being cleared
+    steps_done = db.Column(db.Integer, default=0)
+    steps_total = db.Column(db.Integer, default=0)
+    deleted_rows = db.Column(db.JSON)  # {table: rows deleted so far}
+    error_message = db.Column(db.Text)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    finished_at = db.Column(db.DateTime, nullable=True)
+    
+    def to_dict(self):
+        return {
+            "id": self.id,
+            "status": self.status,
+            "current_step": self.current_step,
+            "steps_done": self.steps_done,
+            "steps_total": self.steps_total,
+            "progress": round(100.0 * (self.steps_done or 0) / self.steps_total, 1) if self.steps_total else 0,
+            "deleted_rows": self.deleted_rows or {},
+            "error_message": self.error_message,
+            "created_at": self.created_at.isoformat() if self.created_at else None,
+            "updated_at": self.updated_at.isoformat() if self.updated_at else None,
+            "finished_at": self.finished_at.isoformat() if self.finished_at else None
+        }
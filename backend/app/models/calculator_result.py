@@ -4,6 +4,12 @@ from datetime import datetime
 
 class CalculatorResult(db.Model):
     __tablename__ = 'calculator_results'
+    
+    # Serves the per-user history cap and newest-first listings
+    __table_args__ = (
+        db.Index('idx_calculator_results_user_created', 'user_id', 'created_at'),
+    )
+    
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
     calculator_type = db.Column(db.String(32), nullable=False)  # 'fertilizer', 'pesticide', 'profit'
@@ -1,7 +1,8 @@
 from app import db
 from datetime import datetime
+from app.models.fields import Field, iso, SparseFieldsMixin
 
-class CropRecommendation(db.Model):
+class CropRecommendation(SparseFieldsMixin, db.Model):
     """Model for storing crop recommendation predictions."""
     
     __tablename__ = 'crop_recommendations'
@@ -25,24 +26,27 @@ class CropRecommendation(db.Model):
     # Metadata
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     
-    def to_dict(self):
-        return {
-            'id': self.id,
-            'user_id': self.user_id,
-            'nitrogen': self.nitrogen,
-            'phosphorus': self.phosphorus,
-            'potassium': self.potassium,
-            'temperature': self.temperature,
-            'humidity': self.humidity,
-            'ph': self.ph,
-            'rainfall': self.rainfall,
-            'predicted_crop': self.predicted_crop,
-            'confidence': self.confidence,
-            'created_at': self.created_at.isoformat() if self.created_at else None
-        }
+    __table_args__ = (
+        db.Index('idx_crop_recommendations_user_created', 'user_id', 'created_at'),
+    )
+    
+    FIELDS = {
+        'id': Field('id'),
+        'user_id': Field('user_id'),
+        'nitrogen': Field('nitrogen'),
+        'phosphorus': Field('phosphorus'),
+        'potassium': Field('potassium'),
+        'temperature': Field('temperature'),
+        'humidity': Field('humidity'),
+        'ph': Field('ph'),
+        'rainfall': Field('rainfall'),
+        'predicted_crop': Field('predicted_crop'),
+        'confidence': Field('confidence'),
+        'created_at': iso('created_at'),
+    }
 
 
-class CropYieldPrediction(db.Model):
+class CropYieldPrediction(SparseFieldsMixin, db.Model):
     """Model for storing crop yield predictions."""
     
     __tablename__ = 'crop_yield_predictions'
@@ -65,17 +69,20 @@ class CropYieldPrediction(db.Model):
     # Metadata
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     
-    def to_dict(self):
-        return {
-            'id': self.id,
-            'user_id': self.user_id,
-            'crop': self.crop,
-            'season': self.season,
-            'state': self.state,
-            'annual_rainfall': self.annual_rainfall,
-            'fertilizer': self.fertilizer,
-            'pesticide': self.pesticide,
-            'predicted_yield': self.predicted_yield,
-            'unit': self.unit,
-            'created_at': self.created_at.isoformat() if self.created_at else None
-        }
\ No newline at end of file
+    __table_args__ = (
+        db.Index('idx_crop_yield_predictions_user_created', 'user_id', 'created_at'),
+    )
+    
+    FIELDS = {
+        'id': Field('id'),
+        'user_id': Field('user_id'),
+        'crop': Field('crop'),
+        'season': Field('season'),
+        'state': Field('state'),
+        'annual_rainfall': Field('annual_rainfall'),
+        'fertilizer': Field('fertilizer'),
+        'pesticide': Field('pesticide'),
+        'predicted_yield': Field('predicted_yield'),
+        'unit': Field('unit'),
+        'created_at': iso('created_at'),
+    }
\ No newline at end of file
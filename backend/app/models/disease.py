@@ -15,6 +15,11 @@ class DiseaseDetection(db.Model):
     detected_at = db.Column(db.DateTime, default=datetime.utcnow)
     details = db.Column(db.JSON)  # symptoms, treatment, prevention, etc.
 
+    __table_args__ = (
+        db.Index('idx_disease_detections_user_date', 'user_id', 'detected_at'),
+        db.Index('idx_disease_detections_user_disease', 'user_id', 'predicted_disease'),
+    )
+
     def to_dict(self):
         return {
             "id": self.id,
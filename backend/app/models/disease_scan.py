@@ -2,8 +2,9 @@
 from app import db
 from datetime import datetime
 import json
+from app.models.fields import Field, SparseFieldsMixin
 
-class DiseaseScan(db.Model):
+class DiseaseScan(SparseFieldsMixin, db.Model):
     __tablename__ = 'disease_scans'
     
     # Add indexes for faster queries
@@ -14,7 +15,7 @@ class DiseaseScan(db.Model):
     
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False, index=True)
-    image_data = db.Column(db.LargeBinary, nullable=True)  # BLOB to store image directly
+    image_data = db.deferred(db.Column(db.LargeBinary, nullable=True))  # BLOB to store image directly; loaded only when read
     image_path = db.Column(db.String(255), nullable=True)  # Path as fallback
     image_filename = db.Column(db.String(100), nullable=False)  # Original filename
     image_mimetype = db.Column(db.String(50), nullable=True)  # Image MIME type
@@ -43,8 +44,24 @@ class DiseaseScan(db.Model):
                       default='pending')
     error_message = db.Column(db.Text)  # Error details if scan failed
     
-    def to_dict(self):
-        """Convert scan record to dictionary format"""
+    FIELDS = {
+        "id": Field('id'),
+        "image": Field('id', get=lambda scan: f"/api/disease-scans/scans/{scan.id}/image"),  # Endpoint to serve image
+        "imageFilename": Field('image_filename'),
+        "timestamp": Field('scan_timestamp', get=lambda scan: (
+            scan.scan_timestamp.strftime("%Y-%m-%d %H:%M:%S") if scan.scan_timestamp else None
+        )),
+        # Only this key parses the possible_diseases JSON
+        "diagnosis": Field('is_confident', 'confidence_threshold', 'disease_name', 'confidence_score',
+                           'description', 'treatment', 'possible_diseases', get=lambda scan: scan.diagnosis()),
+        "plantType": Field('plant_type'),
+        "processingTime": Field('processing_time'),
+        "status": Field('status'),
+        "errorMessage": Field('error_message'),
+    }
+
+    def diagnosis(self):
+        """Diagnosis object built from the result columns and the possible diseases JSON"""
         # Parse possible diseases from JSON
         possible_diseases = []
         symptoms = []
@@ -107,17 +124,7 @@ class DiseaseScan(db.Model):
         else:
             diagnosis["lowConfidenceResults"] = possible_diseases
         
-        return {
-            "id": self.id,
-            "image": f"/api/disease-scans/scans/{self.id}/image",  # Endpoint to serve image
-            "imageFilename": self.image_filename,
-            "timestamp": self.scan_timestamp.strftime("%Y-%m-%d %H:%M:%S") if self.scan_timestamp else None,
-            "diagnosis": diagnosis,
-            "plantType": self.plant_type,
-            "processingTime": self.processing_time,
-            "status": self.status,
-            "errorMessage": self.error_message
-        }
+        return diagnosis
     
     def set_possible_diseases(self, diseases_list):
         """Set possible diseases as JSON string"""
@@ -2,8 +2,9 @@
 from app import db
 from datetime import datetime
 from app.models.farm_note import FarmNote
+from app.models.fields import Field, iso, SparseFieldsMixin
 
-class Farm(db.Model):
+class Farm(SparseFieldsMixin, db.Model):
     __tablename__ = 'farms'
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(90), nullable=False)
@@ -17,20 +18,21 @@ class Farm(db.Model):
     crops = db.relationship('Crop', backref='farm', lazy='select', cascade='all, delete-orphan')
     notes = db.relationship('FarmNote', backref='farm', lazy='select', cascade='all, delete-orphan')
 
-    def to_dict(self):
-        """Optimized to_dict method with eager loaded relationships"""
-        return {
-            "id": self.id,
-            "name": self.name,
-            "location": self.location,
-            "mainCrop": self.main_crop,  # Match frontend format
-            "sizeAcres": self.size_acres,  # Match frontend format
-            "soil_type": self.soil_type,
-            "isActive": self.is_active,  # Match frontend format
-            "created_at": self.created_at.isoformat() if self.created_at else None,
-            "crops": [crop.to_dict() for crop in self.crops],
-            "notes": [note.to_dict() for note in sorted(self.notes, key=lambda n: n.created_at or datetime.min, reverse=True)]
-        }
+    # to_dict keys; a ?fields= subset only loads and builds the keys it names
+    FIELDS = {
+        "id": Field('id'),
+        "name": Field('name'),
+        "location": Field('location'),
+        "mainCrop": Field('main_crop'),  # Match frontend format
+        "sizeAcres": Field('size_acres'),  # Match frontend format
+        "soil_type": Field('soil_type'),
+        "isActive": Field('is_active'),  # Match frontend format
+        "created_at": iso('created_at'),
+        "crops": Field('crops', get=lambda farm: [crop.to_dict() for crop in farm.crops]),
+        "notes": Field('notes', get=lambda farm: [
+            note.to_dict() for note in sorted(farm.notes, key=lambda n: n.created_at or datetime.min, reverse=True)
+        ]),
+    }
 
 class Crop(db.Model):
     __tablename__ = 'crops'
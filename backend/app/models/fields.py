@@ -0,0 +1,28 @@
+# app/models/fields.py
+
+class Field:
+    """One to_dict key: the model attributes it reads and how its value is built"""
+    __slots__ = ('attrs', 'get')
+
+    def __init__(self, *attrs, get=None):
+        self.attrs = attrs
+        self.get = get or (lambda obj, attr=attrs[0]: getattr(obj, attr))
+
+def iso(attr):
+    """Field for a date/datetime column serialised as ISO 8601 (None stays None)"""
+    def get(obj):
+        value = getattr(obj, attr)
+        return value.isoformat() if value else None
+    return Field(attr, get=get)
+
+class SparseFieldsMixin:
+    """
+    to_dict() driven by a FIELDS mapping of output key -> Field, so a
+    subset of keys can be serialised (and loaded; see app.utils.fieldsets)
+    without touching the columns or relationships of the others.
+    """
+    FIELDS = {}
+
+    def to_dict(self, fields=None):
+        spec = self.FIELDS
+        return {key: spec[key].get(self) for key in (spec if fields is None else fields)}
@@ -13,19 +13,29 @@ class ForumPost(db.Model):
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     status = db.Column(db.String(32), default="open")
     views = db.Column(db.Integer, default=0)
+    unique_views = db.Column(db.Integer, default=0)  # HyperLogLog estimate, see ForumPostViewSketch
     is_flagged = db.Column(db.Boolean, default=False)
     flagged_reason = db.Column(db.String(200), nullable=True)
     reply_count = db.Column(db.Integer, default=0)
+    last_reply_at = db.Column(db.DateTime, nullable=True)
     solved = db.Column(db.Boolean, default=False)
     upvotes = db.Column(db.Integer, default=0)
     downvotes = db.Column(db.Integer, default=0)
     edited_at = db.Column(db.DateTime, nullable=True)
     edit_count = db.Column(db.Integer, default=0)
+    hot_score = db.Column(db.Double, default=0)  # DOUBLE: keyset cursors match it exactly; see app/utils/hot_rank.py
     replies = db.relationship('ForumReply', backref='post', lazy='dynamic', cascade='all, delete-orphan')
     votes = db.relationship('ForumVote', backref='post', lazy='dynamic', cascade='all, delete-orphan')
+    view_sketch = db.relationship('ForumPostViewSketch', uselist=False, cascade='all, delete-orphan')
 
-    def to_dict(self):
-        return {
+    __table_args__ = (
+        db.Index('idx_forum_posts_hot', 'hot_score', 'id'),
+        db.Index('idx_forum_posts_last_reply', 'last_reply_at', 'id'),
+        db.Index('idx_forum_posts_category_created', 'category', 'created_at'),
+    )
+
+    def to_dict(self, include_replies=True):
+        data = {
             "id": self.id,
             "user_id": self.user_id,
             "title": self.title,
@@ -35,16 +45,33 @@ class ForumPost(db.Model):
             "created_at": self.created_at.isoformat() if self.created_at else None,
             "status": self.status,
             "views": self.views,
+            "unique_views": self.unique_views or 0,
             "is_flagged": self.is_flagged,
             "flagged_reason": self.flagged_reason,
             "reply_count": self.reply_count,
+            "last_reply_at": self.last_reply_at.isoformat() if self.last_reply_at else None,
             "solved": self.solved,
             "upvotes": self.upvotes,
             "downvotes": self.downvotes,
             "edited_at": self.edited_at.isoformat() if self.edited_at else None,
             "edit_count": self.edit_count,
-            "replies": [reply.to_dict() for reply in self.replies]
+            "hot_score": self.hot_score
         }
+        if include_replies:
+            data["replies"] = [reply.to_dict() for reply in self.replies]
+        return data
+
+    def to_summary_dict(self, reply_stats=None):
+        """List view: reply count and latest reply preview instead of every reply"""
+        data = self.to_dict(include_replies=False)
+        data["author_name"] = self.user.name if self.user else None
+        if reply_stats:
+            data["reply_count"] = reply_stats["reply_count"]
+            data["latest_reply"] = reply_stats["latest_reply"]
+        else:
+            data["reply_count"] = 0
+            data["latest_reply"] = None
+        return data
 
 class ForumReply(db.Model):
     __tablename__ = 'forum_replies'
@@ -61,6 +88,10 @@ class ForumReply(db.Model):
     edited_at = db.Column(db.DateTime, nullable=True)
     edit_count = db.Column(db.Integer, default=0)
 
+    __table_args__ = (
+        db.Index('idx_forum_replies_post_created', 'post_id', 'created_at'),
+    )
+
     def to_dict(self):
         return {
             "id": self.id,
@@ -77,6 +108,15 @@ class ForumReply(db.Model):
             "edit_count": self.edit_count
         }
 
+    def to_context_dict(self, include_post=False):
+        """Reply with its author's name (and its post's title/category); load those eagerly"""
+        data = self.to_dict()
+        data["author_name"] = self.user.name if self.user else None
+        if include_post:
+            data["post_title"] = self.post.title if self.post else "Unknown Post"
+            data["post_category"] = self.post.category if self.post else None
+        return data
+
 class ForumVote(db.Model):
     __tablename__ = 'forum_votes'
     id = db.Column(db.Integer, primary_key=True)
@@ -95,3 +135,10 @@ class ForumVote(db.Model):
             "vote_type": self.vote_type,
             "created_at": self.created_at.isoformat() if self.created_at else None
         }
+
+class ForumPostViewSketch(db.Model):
+    """Serialized HyperLogLog of a post's viewers; forum_posts.unique_views holds its estimate"""
+    __tablename__ = 'forum_post_view_sketches'
+    post_id = db.Column(db.Integer, db.ForeignKey('forum_posts.id', ondelete='CASCADE'), primary_key=True)
+    sketch = db.Column(db.LargeBinary, nullable=False)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
@@ -1,8 +1,9 @@
 # app/models/monitored_crop.py
 from app import db
 from datetime import datetime, date
+from app.models.fields import Field, iso, SparseFieldsMixin
 
-class MonitoredCrop(db.Model):
+class MonitoredCrop(SparseFieldsMixin, db.Model):
     __tablename__ = 'monitored_crops'
     
     id = db.Column(db.Integer, primary_key=True)
@@ -22,21 +23,20 @@ class MonitoredCrop(db.Model):
     health_score = db.Column(db.Float, default=100.0)  # Health percentage
     notes = db.Column(db.Text)  # Additional notes
     
-    def to_dict(self):
-        return {
-            "id": self.id,
-            "name": self.name,
-            "farmName": self.farm_name,
-            "farmId": self.farm_id,
-            "plantingDate": self.planting_date.isoformat() if self.planting_date else None,
-            "status": self.status,
-            "variety": self.variety,
-            "expectedHarvestDate": self.expected_harvest_date.isoformat() if self.expected_harvest_date else None,
-            "healthScore": self.health_score,
-            "notes": self.notes,
-            "createdAt": self.created_at.isoformat() if self.created_at else None,
-            "updatedAt": self.updated_at.isoformat() if self.updated_at else None
-        }
+    FIELDS = {
+        "id": Field('id'),
+        "name": Field('name'),
+        "farmName": Field('farm_name'),
+        "farmId": Field('farm_id'),
+        "plantingDate": iso('planting_date'),
+        "status": Field('status'),
+        "variety": Field('variety'),
+        "expectedHarvestDate": iso('expected_harvest_date'),
+        "healthScore": Field('health_score'),
+        "notes": Field('notes'),
+        "createdAt": iso('created_at'),
+        "updatedAt": iso('updated_at'),
+    }
     
     def days_since_planting(self):
         """Calculate days since planting"""
@@ -1,8 +1,9 @@
 # app/models/transaction.py
 from app import db
 from datetime import datetime, date
+from app.models.fields import Field, iso, SparseFieldsMixin
 
-class FarmLedger(db.Model):
+class FarmLedger(SparseFieldsMixin, db.Model):
     __tablename__ = 'farm_ledger'
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
@@ -13,14 +14,39 @@ class FarmLedger(db.Model):
     transaction_date = db.Column(db.Date, default=date.today)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
 
+    __table_args__ = (
+        db.Index('idx_farm_ledger_type_date', 'user_id', 'transaction_type', 'transaction_date'),
+        db.Index('idx_farm_ledger_user_date', 'user_id', 'transaction_date'),
+    )
+
+    FIELDS = {
+        "id": Field('id'),
+        "amount": Field('amount'),
+        "category": Field('category'),
+        "note": Field('note'),
+        "type": Field('transaction_type'),
+        "date": iso('transaction_date'),
+        "transaction_date": iso('transaction_date'),
+        "created_at": iso('created_at'),
+    }
+
+class FarmLedgerMonthly(db.Model):
+    """Ledger totals per user, month, type and category, maintained on every ledger write"""
+    __tablename__ = 'farm_ledger_monthly'
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id', ondelete='CASCADE'), primary_key=True)
+    year = db.Column(db.SmallInteger, primary_key=True, autoincrement=False)
+    month = db.Column(db.SmallInteger, primary_key=True, autoincrement=False)
+    transaction_type = db.Column(db.String(16), primary_key=True)
+    category = db.Column(db.String(64), primary_key=True)
+    amount = db.Column(db.Numeric(12, 2), default=0, nullable=False)  # Exact: maintained by deltas
+    entry_count = db.Column(db.Integer, default=0, nullable=False)  # Rows at 0 are ignored by readers
+
     def to_dict(self):
         return {
-            "id": self.id,
-            "amount": self.amount,
-            "category": self.category,
-            "note": self.note,
+            "year": self.year,
+            "month": self.month,
             "type": self.transaction_type,
-            "date": self.transaction_date.isoformat() if self.transaction_date else None,
-            "transaction_date": self.transaction_date.isoformat() if self.transaction_date else None,
-            "created_at": self.created_at.isoformat() if self.created_at else None
+            "category": self.category,
+            "amount": float(self.amount or 0),
+            "entry_count": self.entry_count
         }
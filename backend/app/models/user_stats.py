@@ -0,0 +1,30 @@
+# app/models/user_stats.py
+from app import db
+from datetime import datetime
+
+class UserStats(db.Model):
+    """Per-user dashboard counters, kept in step with the source tables on every write"""
+    __tablename__ = 'user_stats'
+    
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id', ondelete='CASCADE'), primary_key=True)
+    farm_count = db.Column(db.Integer, default=0, nullable=False)
+    monitored_crop_count = db.Column(db.Integer, default=0, nullable=False)
+    detection_count = db.Column(db.Integer, default=0, nullable=False)  # disease_detections
+    scan_count = db.Column(db.Integer, default=0, nullable=False)  # disease_scans
+    high_confidence_scan_count = db.Column(db.Integer, default=0, nullable=False)
+    # Money totals are updated by deltas, so exact decimals rather than accumulating float error
+    total_expenses = db.Column(db.Numeric(12, 2), default=0, nullable=False)
+    total_income = db.Column(db.Numeric(12, 2), default=0, nullable=False)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    
+    def to_dict(self):
+        return {
+            "farm_count": self.farm_count,
+            "monitored_crop_count": self.monitored_crop_count,
+            "detection_count": self.detection_count,
+            "scan_count": self.scan_count,
+            "high_confidence_scan_count": self.high_confidence_scan_count,
+            "total_expenses": float(self.total_expenses or 0),
+            "total_income": float(self.total_income or 0),
+            "updated_at": self.updated_at.isoformat() if self.updated_at else None
+        }
@@ -4,54 +4,91 @@ from flask_jwt_extended import jwt_required, get_jwt_identity
 from app.models.farm import Farm, Crop
 from app.models.monitored_crop import MonitoredCrop
 from app.models.disease import DiseaseDetection
-from app.models.transaction import FarmLedger
+from app.models.disease_scan import DiseaseScan
 from sqlalchemy import func
-from datetime import datetime
+from datetime import datetime, date, timedelta
 from app import db, cache
-from flask import request
-
-# Simple in-memory cache for development (replace with Redis in production)
-_cache = {}
+from app.utils.user_stats import get_user_stats
+from app.utils.cache_versions import user_cache_key
+from app.utils.ledger_rollup import totals_by_type, totals_by_category, totals_by_month
+from app.utils.time_buckets import BUCKETS, aggregate, bucket_starts, floor_bucket, next_bucket
+from app.utils.histogram import MAX_BINS, as_percent, histogram, uniform_edges
 
 analytics_bp = Blueprint('analytics', __name__)
 
-def _user_cache_key():
-    try:
-        uid = get_jwt_identity()
-    except Exception:
-        uid = 'anon'
-    qs = request.query_string.decode() if request.query_string else ''
-    return f"{request.path}?uid={uid}&{qs}"
+# Entries are invalidated by version bumps on write, so the TTL only bounds memory use
+CACHE_TIMEOUT = 3600
+
+MAX_MONTHS = 1200  # Longest range /monthly-expenses will expand month by month
+MAX_BUCKETS = 1000  # Longest series /disease-trends will fill
+
+# Default /disease-confidence buckets, in percent
+CONFIDENCE_RANGES = [
+    ("Low (0-50%)", 0, 50),
+    ("Medium (50-75%)", 50, 75),
+    ("High (75-90%)", 75, 90),
+    ("Very High (90-100%)", 90, 100)
+]
+CONFIDENCE_SOURCES = {'detections': DiseaseDetection, 'scans': DiseaseScan}
+
+def _parse_month(value):
+    """'YYYY-MM' -> (year, month)"""
+    year, month = (int(part) for part in value.split('-', 1))
+    if not 1 <= month <= 12 or not 1900 <= year <= 9999:
+        raise ValueError(value)
+    return year, month
+
+def _month_range():
+    """Inclusive (year, month) bounds from the ?start=YYYY-MM&end=YYYY-MM query parameters"""
+    start = request.args.get('start')
+    end = request.args.get('end')
+    start = _parse_month(start) if start else None
+    end = _parse_month(end) if end else None
+    if start and end and start > end:
+        raise ValueError("start is after end")
+    return start, end
+
+def _date_range(default_days):
+    """
+    [start, end) from the ?start=YYYY-MM-DD&end=YYYY-MM-DD query parameters,
+    where end is inclusive in the URL. Defaults to the last `default_days` days.
+    """
+    start = request.args.get('start')
+    end = request.args.get('end')
+    end = date.fromisoformat(end) + timedelta(days=1) if end else date.today() + timedelta(days=1)
+    start = date.fromisoformat(start) if start else end - timedelta(days=default_days)
+    if start >= end:
+        raise ValueError("start is after end")
+    return start, end
 
 @analytics_bp.route('/dashboard', methods=['GET'])
 @jwt_required()
-@cache.cached(timeout=180, key_prefix=_user_cache_key)
 def dashboard():
-    """Optimized dashboard stats with single aggregated query and simple caching"""
+    """Dashboard stats from the user_stats rollup (one primary-key lookup, always current)"""
     user_id = get_jwt_identity()
     
-    # Note: Additional in-function cache not needed when using Flask-Caching
-    
-    # Single optimized query for all basic stats using subqueries
-    farm_count = db.session.query(func.count(Farm.id)).filter_by(user_id=user_id).scalar()
-    crop_count = db.session.query(func.count(MonitoredCrop.id)).filter_by(user_id=user_id).scalar()
-    scans = db.session.query(func.count(DiseaseDetection.id)).filter_by(user_id=user_id).scalar()
-    total_expenses = db.session.query(func.coalesce(func.sum(FarmLedger.amount), 0)).filter_by(
-        user_id=user_id, transaction_type="expense"
-    ).scalar()
+    stats = get_user_stats(user_id)
     
     result = {
-        "farm_count": farm_count,
-        "crop_count": crop_count,
-        "disease_scans": scans,
-        "total_expenses": float(total_expenses or 0)
+        "farm_count": stats.farm_count,
+        "crop_count": stats.monitored_crop_count,
+        "disease_scans": stats.detection_count,
+        "total_expenses": float(stats.total_expenses or 0)
     }
     
     return jsonify(result)
 
+@analytics_bp.route('/cache-stats', methods=['GET'])
+@jwt_required()
+def cache_stats():
+    """Hit counters and per-tier hit ratios of this worker's response cache"""
+    backend = cache.cache
+    stats = backend.stats() if hasattr(backend, 'stats') else {}
+    return jsonify({"backend": type(backend).__name__, **stats})
+
 @analytics_bp.route('/crop-health', methods=['GET'])
 @jwt_required()
-@cache.cached(timeout=120, key_prefix=_user_cache_key)
+@cache.cached(timeout=CACHE_TIMEOUT, key_prefix=user_cache_key('crops'))
 def crop_health():
     """Optimized crop health query with better indexing"""
     user_id = get_jwt_identity()
@@ -72,32 +109,54 @@ def crop_health():
 
 @analytics_bp.route('/financial', methods=['GET'])
 @jwt_required()
-@cache.cached(timeout=60, key_prefix=_user_cache_key)
+@cache.cached(timeout=CACHE_TIMEOUT, key_prefix=user_cache_key('ledger'))
 def financial():
+    """Income and expense totals from the monthly ledger rollup, optionally for a month range"""
     user_id = get_jwt_identity()
-    transactions = FarmLedger.query.filter_by(user_id=user_id).all()
-    expenses = sum(t.amount for t in transactions if t.transaction_type == "expense")
-    income = sum(t.amount for t in transactions if t.transaction_type == "income")
-    return jsonify({"total_expenses": expenses, "total_income": income})
+    try:
+        start, end = _month_range()
+    except ValueError:
+        return jsonify({"error": "start and end must be YYYY-MM, with start <= end"}), 400
+    
+    totals = totals_by_type(user_id, start, end)
+    return jsonify({
+        "total_expenses": round(totals.get('expense', 0.0), 2),
+        "total_income": round(totals.get('income', 0.0), 2)
+    })
 
 @analytics_bp.route('/disease-trends', methods=['GET'])
 @jwt_required()
-@cache.cached(timeout=300, key_prefix=_user_cache_key)
+@cache.cached(timeout=CACHE_TIMEOUT, key_prefix=user_cache_key('detections'))
 def disease_trends():
+    """Detections per day/week/month/year (?bucket=, default month) over the last year or ?start/?end"""
     user_id = get_jwt_identity()
-    from sqlalchemy import extract
-    one_year_ago = func.date(func.now(), '-1 year')
-    trends = DiseaseDetection.query.filter(
-        DiseaseDetection.user_id == user_id,
-    ).with_entities(
-        extract('month', DiseaseDetection.detected_at).label('month'),
-        func.count(DiseaseDetection.id)
-    ).group_by('month').all()
-    return jsonify([{"month": int(month), "count": int(count)} for month, count in trends])
+    bucket = request.args.get('bucket', 'month')
+    if bucket not in BUCKETS:
+        return jsonify({"error": f"bucket must be one of {', '.join(BUCKETS)}"}), 400
+    try:
+        start, end = _date_range(default_days=365)
+    except ValueError:
+        return jsonify({"error": "start and end must be YYYY-MM-DD, with start <= end"}), 400
+    if 'start' not in request.args:
+        # Default to whole buckets: the last twelve months are Jan..Dec, not a partial month
+        start = next_bucket(floor_bucket(start, bucket), bucket)
+    if len(bucket_starts(bucket, start, end)) > MAX_BUCKETS:
+        return jsonify({"error": f"Range is limited to {MAX_BUCKETS} buckets"}), 400
+    
+    trends = aggregate(DiseaseDetection, DiseaseDetection.detected_at, bucket, start, end,
+                       filters=[DiseaseDetection.user_id == user_id])
+    
+    data = []
+    for item in trends:
+        entry = {"period": item['period'].isoformat(), "count": int(item['count'])}
+        if bucket == 'month':
+            entry.update(year=item['period'].year, month=item['period'].month)
+        data.append(entry)
+    return jsonify(data)
 
 @analytics_bp.route('/disease-counts', methods=['GET'])
 @jwt_required()
-@cache.cached(timeout=180, key_prefix=_user_cache_key)
+@cache.cached(timeout=CACHE_TIMEOUT, key_prefix=user_cache_key('detections'))
 def disease_counts():
     """Enhanced grouping of disease detections by disease type with additional metrics"""
     user_id = get_jwt_identity()
@@ -125,56 +184,55 @@ def disease_counts():
 
 @analytics_bp.route('/expense-categories', methods=['GET'])
 @jwt_required()
-@cache.cached(timeout=120, key_prefix=_user_cache_key)
+@cache.cached(timeout=CACHE_TIMEOUT, key_prefix=user_cache_key('ledger'))
 def expense_categories():
-    """Simple grouping of expenses by category"""
+    """Expenses grouped by category, optionally for a month range"""
     user_id = get_jwt_identity()
+    try:
+        start, end = _month_range()
+    except ValueError:
+        return jsonify({"error": "start and end must be YYYY-MM, with start <= end"}), 400
     
-    results = db.session.query(
-        FarmLedger.category,
-        func.sum(FarmLedger.amount)
-    ).filter(
-        FarmLedger.user_id == user_id,
-        FarmLedger.transaction_type == 'expense'
-    ).group_by(FarmLedger.category).all()
+    results = totals_by_category(user_id, 'expense', start, end)
     
     return jsonify([
-        {"category": category, "amount": float(amount)}
+        {"category": category, "amount": round(float(amount or 0), 2)}
         for category, amount in results
     ])
 
 @analytics_bp.route('/monthly-expenses', methods=['GET'])
 @jwt_required()
-@cache.cached(timeout=180, key_prefix=_user_cache_key)
+@cache.cached(timeout=CACHE_TIMEOUT, key_prefix=user_cache_key('ledger'))
 def monthly_expenses():
-    """Optimized monthly expenses query with better performance"""
+    """Expenses per month for the current year, or for any ?start=YYYY-MM&end=YYYY-MM range"""
     user_id = get_jwt_identity()
     current_year = datetime.now().year
+    try:
+        start, end = _month_range()
+    except ValueError:
+        return jsonify({"error": "start and end must be YYYY-MM, with start <= end"}), 400
+    # A lone bound extends to the edge of its own year; no bounds means the current year
+    start = start or (end[0] if end else current_year, 1)
+    end = end or (start[0], 12)
+    if (end[0] - start[0]) * 12 + end[1] - start[1] >= MAX_MONTHS:
+        return jsonify({"error": f"Range is limited to {MAX_MONTHS} months"}), 400
     
-    # Single optimized query with proper indexing
-    results = db.session.query(
-        func.extract('month', FarmLedger.transaction_date).label('month'),
-        func.sum(FarmLedger.amount).label('amount')
-    ).filter(
-        FarmLedger.user_id == user_id,
-        FarmLedger.transaction_type == 'expense',
-        func.extract('year', FarmLedger.transaction_date) == current_year
-    ).group_by('month').all()
+    amounts = totals_by_month(user_id, 'expense', start, end)
     
-    # Create optimized monthly data structure
+    # One entry per month in the range, including months without expenses
     months = ["Jan", "Feb", "Mar", "Apr", "May", "Jun", "Jul", "Aug", "Sep", "Oct", "Nov", "Dec"]
-    monthly_data = {i+1: {"month": months[i], "amount": 0} for i in range(12)}
-    
-    # Fill in actual data where available
-    for month_num, amount in results:
-        if 1 <= int(month_num) <= 12:
-            monthly_data[int(month_num)]["amount"] = float(amount or 0)
+    last_month = date(end[0], end[1], 1)
+    monthly_data = [{
+        "month": months[period.month - 1],
+        "year": period.year,
+        "amount": round(amounts.get((period.year, period.month), 0.0), 2)
+    } for period in bucket_starts('month', date(start[0], start[1], 1), next_bucket(last_month, 'month'))]
     
-    return jsonify(list(monthly_data.values()))
+    return jsonify(monthly_data)
 
 @analytics_bp.route('/disease-severity', methods=['GET'])
 @jwt_required()
-@cache.cached(timeout=300, key_prefix=_user_cache_key)
+@cache.cached(timeout=CACHE_TIMEOUT, key_prefix=user_cache_key('detections'))
 def disease_severity():
     """Disease detections grouped by severity level"""
     user_id = get_jwt_identity()
@@ -194,57 +252,72 @@ def disease_severity():
 
 @analytics_bp.route('/recent-diseases', methods=['GET'])
 @jwt_required()
-@cache.cached(timeout=120, key_prefix=_user_cache_key)
+@cache.cached(timeout=CACHE_TIMEOUT, key_prefix=user_cache_key('detections'))
 def recent_diseases():
     """Most recent disease detections (last 30 days)"""
     user_id = get_jwt_identity()
-    from datetime import datetime, timedelta
     
     thirty_days_ago = datetime.utcnow() - timedelta(days=30)
     
-    results = db.session.query(
-        DiseaseDetection.predicted_disease,
-        func.count(DiseaseDetection.id),
-        func.avg(DiseaseDetection.confidence_score)
-    ).filter(
-        DiseaseDetection.user_id == user_id,
-        DiseaseDetection.detected_at >= thirty_days_ago,
-        DiseaseDetection.predicted_disease.isnot(None)
-    ).group_by(DiseaseDetection.predicted_disease).order_by(func.count(DiseaseDetection.id).desc()).all()
+    results = aggregate(
+        DiseaseDetection, DiseaseDetection.detected_at, None, thirty_days_ago,
+        group_by=[DiseaseDetection.predicted_disease],
+        measures={"count": func.count(DiseaseDetection.id),
+                  "avg_confidence": func.avg(DiseaseDetection.confidence_score)},
+        filters=[DiseaseDetection.user_id == user_id, DiseaseDetection.predicted_disease.isnot(None)]
+    )
+    results.sort(key=lambda item: item['count'], reverse=True)
     
     return jsonify([
         {
-            "disease": disease,
-            "count": int(count),
-            "avg_confidence": round(float(avg_confidence or 0), 2)
+            "disease": item['predicted_disease'],
+            "count": int(item['count']),
+            "avg_confidence": round(float(item['avg_confidence'] or 0), 2)
         }
-        for disease, count, avg_confidence in results
+        for item in results
     ])
 
 @analytics_bp.route('/disease-confidence', methods=['GET'])
 @jwt_required()
-@cache.cached(timeout=300, key_prefix=_user_cache_key)
+@cache.cached(timeout=CACHE_TIMEOUT, key_prefix=user_cache_key('detections', 'scans'))
 def disease_confidence():
-    """Disease detection confidence distribution"""
+    """
+    Confidence score histogram for ?source=detections (default) or scans.
+    Buckets come from ?edges=0,50,75,90,100 or ?bins=N (even 0-100 split),
+    in percent or as 0-1 fractions; stored scores of either scale are
+    normalised to percent.
+    """
     user_id = get_jwt_identity()
+    model = CONFIDENCE_SOURCES.get(request.args.get('source', 'detections'))
+    if model is None:
+        return jsonify({"error": f"source must be one of {', '.join(CONFIDENCE_SOURCES)}"}), 400
     
-    # Group confidence scores into ranges
-    confidence_ranges = [
-        ("Low (0-50%)", 0, 0.5),
-        ("Medium (50-75%)", 0.5, 0.75),
-        ("High (75-90%)", 0.75, 0.9),
-        ("Very High (90-100%)", 0.9, 1.0)
-    ]
-    
-    result_data = []
-    for range_name, min_conf, max_conf in confidence_ranges:
-        count = db.session.query(func.count(DiseaseDetection.id)).filter(
-            DiseaseDetection.user_id == user_id,
-            DiseaseDetection.confidence_score >= min_conf,
-            DiseaseDetection.confidence_score < max_conf if max_conf < 1.0 else DiseaseDetection.confidence_score <= max_conf
-        ).scalar()
+    labels = None
+    try:
+        if request.args.get('edges'):
+            edges = [float(edge) for edge in request.args['edges'].split(',')]
+            if max(edges) <= 1:
+                edges = [edge * 100 for edge in edges]
+        elif request.args.get('bins'):
+            bins = int(request.args['bins'])
+            if not 1 <= bins <= MAX_BINS:
+                raise ValueError(bins)
+            edges = uniform_edges(bins)
+        else:
+            edges = [low for _, low, _ in CONFIDENCE_RANGES] + [CONFIDENCE_RANGES[-1][2]]
+            labels = [name for name, _, _ in CONFIDENCE_RANGES]
         
-        if count > 0:
-            result_data.append({"confidence_range": range_name, "count": int(count)})
+        counts = histogram(model, as_percent(model.confidence_score), edges,
+                           filters=[model.user_id == user_id])
+    except ValueError:
+        return jsonify({"error": f"edges must be increasing numbers and bins between 1 and {MAX_BINS}"}), 400
     
-    return jsonify(result_data)
+    return jsonify([
+        {
+            "confidence_range": labels[i] if labels else f"{edges[i]:g}-{edges[i + 1]:g}%",
+            "min": edges[i],
+            "max": edges[i + 1],
+            "count": count
+        }
+        for i, count in enumerate(counts)
+    ])
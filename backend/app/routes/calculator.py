@@ -4,6 +4,7 @@ from app.models.user import User
 from app.models.calculator_history import CalculatorHistory
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from app import db
+from app.utils.pagination import wants_keyset, keyset_paginate
 
 calculator_bp = Blueprint('calculator', __name__, url_prefix='/calculator')
 
@@ -54,9 +55,20 @@ def get_history():
     user_id = get_jwt_identity()
     
     try:
-        history = CalculatorHistory.query.filter_by(user_id=user_id).order_by(
-            CalculatorHistory.created_at.desc()
-        ).all()
+        query = CalculatorHistory.query.filter_by(user_id=user_id)
+        
+        # Keyset pagination when a cursor is supplied; full history otherwise
+        if wants_keyset():
+            try:
+                history, pagination = keyset_paginate(query, CalculatorHistory.created_at, CalculatorHistory.id)
+            except ValueError as e:
+                return jsonify({"error": str(e)}), 400
+            return jsonify({
+                "history": [item.to_dict() for item in history],
+                "pagination": pagination
+            }), 200
+        
+        history = query.order_by(CalculatorHistory.created_at.desc()).all()
         
         return jsonify({
             "history": [item.to_dict() for item in history]
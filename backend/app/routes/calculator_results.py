@@ -5,6 +5,7 @@ from app.models.calculator_result import CalculatorResult
 from app import db
 from sqlalchemy import desc
 from app.utils.fertilizer_data import calculate_fertilizer
+from app.utils.history import trim_history
 
 calculator_results_bp = Blueprint('calculator_results', __name__)
 
@@ -27,20 +28,10 @@ def save_calculation():
         notes=data.get('notes', '')
     )
     
-    # Count existing calculator results for this user
-    count = CalculatorResult.query.filter_by(user_id=user_id).count()
-    
-    # If more than 10 results exist, delete the oldest one
-    if count >= 10:
-        oldest_result = CalculatorResult.query.filter_by(user_id=user_id).order_by(
-            CalculatorResult.created_at
-        ).first()
-        
-        if oldest_result:
-            db.session.delete(oldest_result)
-    
-    # Save the new result
+    # Save the new result and drop anything beyond the user's history cap
     db.session.add(new_result)
+    db.session.flush()
+    trim_history(CalculatorResult, CalculatorResult.created_at, user_id)
     db.session.commit()
     
     return jsonify({"message": "Calculation saved successfully", "id": new_result.id})
@@ -310,23 +301,11 @@ def save_pesticide_calculation():
             result_data=structured_results
         )
         
-        # Count existing calculator results for this user of this type
-        count = CalculatorResult.query.filter_by(
-            user_id=current_user_id,
-            calculator_type="pesticide"
-        ).count()
-        
-        # If more than 10 results exist, delete the oldest one
-        if count >= 10:
-            oldest_result = CalculatorResult.query.filter_by(
-                user_id=current_user_id,
-                calculator_type="pesticide"
-            ).order_by(CalculatorResult.created_at).first()
-            
-            if oldest_result:
-                db.session.delete(oldest_result)
-        
+        # Save and keep only the newest pesticide results for this user
         db.session.add(calculator_result)
+        db.session.flush()
+        trim_history(CalculatorResult, CalculatorResult.created_at, current_user_id,
+                     calculator_type="pesticide")
         db.session.commit()
         
         return jsonify({
@@ -1,8 +1,9 @@
 from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity, verify_jwt_in_request
-from app import db
+from app import db, cache
 from app.models.crop_predictions import CropRecommendation, CropYieldPrediction
 from app.services.crop_prediction_service import crop_recommendation_service, crop_yield_service
+from app.utils.fieldsets import requested_fields, project
 import logging
 
 logger = logging.getLogger(__name__)
@@ -159,14 +160,18 @@ def get_recommendation_history():
     """Get crop recommendation history for the authenticated user."""
     try:
         user_id = get_jwt_identity()
+        try:
+            fields = requested_fields(CropRecommendation)
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
         
         # Get user's recommendation history
-        recommendations = CropRecommendation.query.filter_by(user_id=user_id)\
+        recommendations = project(CropRecommendation.query, CropRecommendation, fields).filter_by(user_id=user_id)\
                                                  .order_by(CropRecommendation.created_at.desc())\
                                                  .limit(50).all()
         
         return jsonify({
-            "recommendations": [rec.to_dict() for rec in recommendations],
+            "recommendations": [rec.to_dict(fields) for rec in recommendations],
             "total": len(recommendations)
         }), 200
         
@@ -181,14 +186,18 @@ def get_yield_history():
     """Get crop yield prediction history for the authenticated user."""
     try:
         user_id = get_jwt_identity()
+        try:
+            fields = requested_fields(CropYieldPrediction)
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
         
         # Get user's yield prediction history
-        predictions = CropYieldPrediction.query.filter_by(user_id=user_id)\
+        predictions = project(CropYieldPrediction.query, CropYieldPrediction, fields).filter_by(user_id=user_id)\
                                               .order_by(CropYieldPrediction.created_at.desc())\
                                               .limit(50).all()
         
         return jsonify({
-            "predictions": [pred.to_dict() for pred in predictions],
+            "predictions": [pred.to_dict(fields) for pred in predictions],
             "total": len(predictions)
         }), 200
         
@@ -260,6 +269,7 @@ def delete_yield_prediction(prediction_id):
 
 
 @crop_prediction_bp.route('/crop-options', methods=['GET'])
+@cache.cached(timeout=86400, key_prefix='crop-options')
 def get_crop_options():
     """Get available crop options for the yield prediction form."""
     crop_options = ["Rice", "Wheat", "Maize", "Pulses", "Sugarcane", "Cotton", "Oilseeds"]
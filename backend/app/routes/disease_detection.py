@@ -5,8 +5,10 @@ from flask import Blueprint, request, jsonify, current_app
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from werkzeug.utils import secure_filename
 from app import db
-from app.models.disease import DiseaseDetection, DiseaseInfo
+from app.models.disease import DiseaseDetection
+from app.utils.disease_info import get_disease_info
 from app.utils.ml_models import predict_plant_disease
+from app.utils.pagination import wants_keyset, keyset_paginate
 
 disease_bp = Blueprint('disease_detection', __name__)
 
@@ -41,19 +43,19 @@ def detect_disease():
     file.save(path)
 
     result = predict_plant_disease(path)
-    disease_info = DiseaseInfo.query.filter_by(name=result['class']).first()
+    disease_info = get_disease_info(result['class']) or {}
 
     detection = DiseaseDetection(
         user_id=user_id,
         image_path=f'static/uploads/{filename}',
         predicted_disease=result['class'],
-        scientific_name=getattr(disease_info, 'scientific_name', ''),
+        scientific_name=disease_info.get('scientific_name', ''),
         confidence_score=result['confidence'],
-        severity=getattr(disease_info, 'severity_levels', ['unknown'])[0] if disease_info else 'unknown',
+        severity=(disease_info.get('severity_levels') or ['unknown'])[0],
         details={
-            'symptoms': getattr(disease_info, 'symptoms', []),
-            'treatment': getattr(disease_info, 'treatment', []),
-            'prevention': getattr(disease_info, 'prevention', [])
+            'symptoms': disease_info.get('symptoms', []),
+            'treatment': disease_info.get('treatment', []),
+            'prevention': disease_info.get('prevention', [])
         }
     )
     db.session.add(detection)
@@ -65,16 +67,22 @@ def detect_disease():
 @jwt_required()
 def detection_history():
     user_id = get_jwt_identity()
-    records = DiseaseDetection.query.filter_by(user_id=user_id)\
-        .order_by(DiseaseDetection.detected_at.desc()).limit(50).all()
+    query = DiseaseDetection.query.filter_by(user_id=user_id)
+    if wants_keyset():
+        try:
+            records, pagination = keyset_paginate(query, DiseaseDetection.detected_at, DiseaseDetection.id)
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+        return jsonify({"history": [r.to_dict() for r in records], "pagination": pagination})
+    records = query.order_by(DiseaseDetection.detected_at.desc()).limit(50).all()
     return jsonify([r.to_dict() for r in records])
 
 @disease_bp.route('/info/<disease_name>', methods=['GET'])
 def disease_info(disease_name):
-    d = DiseaseInfo.query.filter_by(name=disease_name).first()
+    d = get_disease_info(disease_name)
     if not d:
         return jsonify({"error": "Disease not found"}), 404
-    return jsonify(d.to_dict())
+    return jsonify(d)
 
 @disease_bp.route('/stats', methods=['GET'])
 @jwt_required()
@@ -4,9 +4,12 @@ from flask import Blueprint, request, jsonify, current_app
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from werkzeug.utils import secure_filename
 from app import db
-from app.models.disease import DiseaseDetection, DiseaseInfo
+from app.models.disease import DiseaseDetection
+from app.utils.disease_info import get_disease_info
 from app.utils.ml_models import predict_plant_disease
 from app.utils.language import with_language, translate_response
+from app.utils.pagination import wants_keyset, keyset_paginate
+from app.utils.api_version import wants_v2, versioned_jsonify
 
 disease_bp = Blueprint('disease_detection', __name__)
 
@@ -33,7 +36,7 @@ def detect_disease():
     
     # Extract data from the standard format
     disease_class = result.get('class', 'Unknown')
-    confidence = result.get('confidence', 0.0)
+    confidence = _confidence_percent(result.get('confidence', 0.0))
     symptoms = result.get('symptoms', [])
     treatment = result.get('treatment', [])
     prevention = result.get('prevention', [])
@@ -41,9 +44,9 @@ def detect_disease():
     # Determine confidence level for frontend compatibility
     is_confident = confidence >= 70.0
     
-    disease_info = DiseaseInfo.query.filter_by(name=disease_class).first()
+    disease_info = get_disease_info(disease_class) or {}
 
-    description = getattr(disease_info, 'description', '') if disease_info else ''
+    description = disease_info.get('description') or ''
     # If DB has no description, attempt to use description from model/Gemini result
     if not description:
         description = result.get('description') or ''
@@ -53,9 +56,9 @@ def detect_disease():
         user_id=user_id,
         image_path=f'static/uploads/{filename}',
         predicted_disease=disease_class,
-        scientific_name=getattr(disease_info, 'scientific_name', ''),
+        scientific_name=disease_info.get('scientific_name', ''),
         confidence_score=confidence,
-        severity=getattr(disease_info, 'severity_levels', ['unknown'])[0] if disease_info else 'unknown',
+        severity=(disease_info.get('severity_levels') or ['unknown'])[0],
         details={
             'description': description,
             'cause': cause,
@@ -78,9 +81,15 @@ def detect_disease():
             print(f"Database error: {e}")
     
     # Return the prediction regardless of database success
+    if wants_v2():
+        return versioned_jsonify(translate_response(_compact_payload(
+            detection, disease_class, confidence, is_confident, description, cause,
+            symptoms, treatment, prevention, result
+        )), v2=True)
+
     # Unified + backward-compatible payload so any frontend variant can consume it
-    # Normalize confidence_score to 0-1 for legacy code that multiplies by 100
-    legacy_conf_score = confidence / 100.0 if confidence > 1 else confidence
+    # confidence_score is 0-1 for legacy code that multiplies by 100
+    legacy_conf_score = confidence / 100.0
 
     detection_dict = detection.to_dict()
     if detection_dict.get('details'):
@@ -96,8 +105,8 @@ def detect_disease():
             "confidence": confidence,
             "confidence_score": legacy_conf_score,
             "isConfident": is_confident,
-            "scientific_name": getattr(disease_info, 'scientific_name', ''),
-            "severity": getattr(disease_info, 'severity_levels', ['unknown'])[0] if disease_info else 'unknown',
+            "scientific_name": disease_info.get('scientific_name', ''),
+            "severity": (disease_info.get('severity_levels') or ['unknown'])[0],
             "description": description,
             "cause": cause,
             "symptoms": symptoms,
@@ -109,8 +118,8 @@ def detect_disease():
         "predicted_disease": disease_class,
         "confidence_score": legacy_conf_score,
         "confidence": confidence,
-        "scientific_name": getattr(disease_info, 'scientific_name', ''),
-        "severity": getattr(disease_info, 'severity_levels', ['unknown'])[0] if disease_info else 'unknown',
+        "scientific_name": disease_info.get('scientific_name', ''),
+        "severity": (disease_info.get('severity_levels') or ['unknown'])[0],
         "details": {
             "description": description,
             "cause": cause,
@@ -131,14 +140,55 @@ def detect_disease():
     
     # Translate the response based on language preference
     translated_payload = translate_response(payload)
-    return jsonify(translated_payload)
+    return versioned_jsonify(translated_payload, v2=False)
+
+def _confidence_percent(confidence):
+    """Prediction confidence as 0-100; the local model reports a percentage, other sources may send 0-1"""
+    confidence = float(confidence or 0.0)
+    return confidence * 100 if confidence <= 1 else confidence
+
+def _compact_payload(detection, disease_class, confidence, is_confident, description, cause,
+                     symptoms, treatment, prevention, result):
+    """v2 detection payload: every field once, no legacy aliases, confidence as 0-100"""
+    payload = {
+        "id": detection.id,
+        "disease": disease_class,
+        "scientific_name": detection.scientific_name,
+        "confidence": confidence,
+        "is_confident": is_confident,
+        "severity": detection.severity,
+        "description": description,
+        "cause": cause,
+        "symptoms": symptoms,
+        "treatment": treatment,
+        "prevention": prevention,
+        "image_path": detection.image_path,
+        "detected_at": detection.detected_at.isoformat() if detection.detected_at else None,
+        "source": "api_detection"
+    }
+    if result.get('organic_treatments') or result.get('chemical_treatments'):
+        payload['organic_treatments'] = result.get('organic_treatments', [])
+        payload['chemical_treatments'] = result.get('chemical_treatments', [])
+    return payload
 
 @disease_bp.route('/history', methods=['GET'])
 @jwt_required()
 def detection_history():
     user_id = get_jwt_identity()
-    detections = DiseaseDetection.query.filter_by(user_id=user_id).order_by(
-        DiseaseDetection.created_at.desc()).all()
+    query = DiseaseDetection.query.filter_by(user_id=user_id)
+    
+    # Keyset pagination when a cursor is supplied; full history otherwise
+    if wants_keyset():
+        try:
+            detections, pagination = keyset_paginate(query, DiseaseDetection.detected_at, DiseaseDetection.id)
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+        return jsonify({
+            "history": [detection.to_dict() for detection in detections],
+            "pagination": pagination
+        })
+    
+    detections = query.order_by(DiseaseDetection.detected_at.desc()).all()
     return jsonify({
         "history": [detection.to_dict() for detection in detections]
     })
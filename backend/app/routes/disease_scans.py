@@ -1,10 +1,14 @@
 # app/routes/disease_scans.py
 from flask import Blueprint, request, jsonify, send_file
 from flask_jwt_extended import jwt_required, get_jwt_identity
+from sqlalchemy.orm import undefer
 from werkzeug.utils import secure_filename
 from app import db
 from app.models.disease_scan import DiseaseScan
 from app.models.user import User
+from app.utils.user_stats import adjust_user_stats, get_user_stats
+from app.utils.history import trim_history, register_upload_folder, request_upload_sweep
+from app.utils.fieldsets import requested_fields, project
 import os
 import uuid
 import io
@@ -19,6 +23,9 @@ UPLOAD_FOLDER = 'app/static/uploads/disease_scans'
 ALLOWED_EXTENSIONS = {'png', 'jpg', 'jpeg', 'gif'}
 MAX_FILE_SIZE = 16 * 1024 * 1024  # 16MB
 
+# Files of trimmed scans are removed by the background upload sweeper
+register_upload_folder(UPLOAD_FOLDER, DiseaseScan.image_path)
+
 def allowed_file(filename):
     return '.' in filename and filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
 
@@ -37,13 +44,18 @@ def get_disease_scans():
         # Get limit from query params (default to last 10 scans, max 10)
         requested_limit = request.args.get('limit', 10, type=int)
         limit = min(requested_limit, 10)  # Ensure maximum of 10
+        try:
+            fields = requested_fields(DiseaseScan)
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
         
-        scans = DiseaseScan.query.filter_by(user_id=user_id)\
+        # A ?fields= subset selects only the columns it reads; the image BLOB is deferred on the model
+        scans = project(DiseaseScan.query, DiseaseScan, fields).filter_by(user_id=user_id)\
                                 .order_by(DiseaseScan.scan_timestamp.desc())\
                                 .limit(limit).all()
         
         return jsonify({
-            "scans": [scan.to_dict() for scan in scans],
+            "scans": [scan.to_dict(fields) for scan in scans],
             "total": len(scans)
         }), 200
         
@@ -76,26 +88,6 @@ def create_disease_scan():
         unique_filename = f"{uuid.uuid4().hex}.{file_extension}"
         file_path = os.path.join(UPLOAD_FOLDER, unique_filename)
         
-        # Check if user already has 10 or more scans
-        # If so, delete the oldest one(s) to maintain limit of 10
-        MAX_SCANS_PER_USER = 10
-        existing_scans = DiseaseScan.query.filter_by(user_id=user_id).order_by(DiseaseScan.scan_timestamp).all()
-        scans_to_delete = len(existing_scans) - (MAX_SCANS_PER_USER - 1)  # -1 because we're adding a new one
-        
-        if scans_to_delete > 0:
-            for i in range(scans_to_delete):
-                old_scan = existing_scans[i]
-                
-                # Delete old image file if it exists
-                if old_scan.image_path and os.path.exists(old_scan.image_path):
-                    try:
-                        os.remove(old_scan.image_path)
-                    except Exception as e:
-                        pass  # Silently handle file deletion errors
-                
-                # Delete database record
-                db.session.delete(old_scan)
-        
         # Save file to both filesystem and database
         file.save(file_path)
         
@@ -114,7 +106,19 @@ def create_disease_scan():
         )
         
         db.session.add(scan)
+        db.session.flush()
+        
+        # Keep only the newest scans per user (one DELETE, no rows loaded);
+        # image files of trimmed scans are cleaned up by the upload sweeper
+        trimmed = trim_history(DiseaseScan, DiseaseScan.scan_timestamp, user_id,
+                               tally={'confident': DiseaseScan.is_confident.is_(True)})
+        if trimmed['deleted']:
+            # The bulk DELETE bypasses the ORM listeners that maintain user_stats
+            adjust_user_stats(user_id, scan_count=-trimmed['deleted'],
+                              high_confidence_scan_count=-trimmed['confident'])
         db.session.commit()
+        if trimmed['deleted']:
+            request_upload_sweep()
         
         # Get scan_id for further processing
         scan_id = scan.id
@@ -230,7 +234,7 @@ def get_scan_image(scan_id):
     """Serve the scan image from BLOB data or file"""
     try:
         # Don't require authentication for image access
-        scan = DiseaseScan.query.filter_by(id=scan_id).first()
+        scan = DiseaseScan.query.options(undefer(DiseaseScan.image_data)).filter_by(id=scan_id).first()
         if not scan:
             return jsonify({"error": "Scan not found"}), 404
         
@@ -302,12 +306,13 @@ def get_scan_stats():
     try:
         user_id = get_jwt_identity()
         
-        total_scans = DiseaseScan.query.filter_by(user_id=user_id).count()
+        stats = get_user_stats(user_id)
+        total_scans = stats.scan_count
         recent_scans = DiseaseScan.query.filter_by(user_id=user_id)\
                                        .filter(DiseaseScan.scan_timestamp >= datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0))\
                                        .count()
         
-        high_confidence_scans = DiseaseScan.query.filter_by(user_id=user_id, is_confident=True).count()
+        high_confidence_scans = stats.high_confidence_scan_count
         
         return jsonify({
             "totalScans": total_scans,
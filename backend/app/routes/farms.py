@@ -5,6 +5,7 @@ from app import db
 from app.models.farm import Farm
 from app.models.user import User
 from app.models.farm_note import FarmNote
+from app.utils.fieldsets import requested_fields, project
 from datetime import datetime
 
 farms_bp = Blueprint('farms', __name__)
@@ -20,17 +21,18 @@ def get_farms_no_slash():
 def get_farms():
     """Get all farms for the current user with optimized eager loading"""
     try:
-        from sqlalchemy.orm import joinedload
         user_id = get_jwt_identity()
+        try:
+            fields = requested_fields(Farm)
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
         
-        # Optimized query with eager loading to prevent N+1 queries
-        farms = Farm.query.options(
-            joinedload(Farm.crops),
-            joinedload(Farm.notes)
-        ).filter_by(user_id=user_id).order_by(Farm.created_at.desc()).all()
+        # Only the requested columns are selected; crops/notes are eager loaded
+        # (one query, no N+1) when requested and not loaded at all otherwise
+        farms = project(Farm.query, Farm, fields).filter_by(user_id=user_id).order_by(Farm.created_at.desc()).all()
         
         return jsonify({
-            "farms": [farm.to_dict() for farm in farms]
+            "farms": [farm.to_dict(fields) for farm in farms]
         }), 200
         
     except Exception as e:
@@ -154,18 +156,17 @@ def delete_farm(farm_id):
             return jsonify({"error": "Farm not found"}), 404
         
         # Delete related records to avoid foreign key constraint issues
-        # 1. Delete monitored crops that reference this farm
+        # 1. Monitored crops that reference this farm, in one statement rather than one per row;
+        #    a bulk DELETE skips the ORM events, so the dashboard counter and cache version are updated here
         from app.models.monitored_crop import MonitoredCrop
-        monitored_crops = MonitoredCrop.query.filter_by(farm_id=farm_id).all()
-        for crop in monitored_crops:
-            db.session.delete(crop)
-        
-        # 2. Delete any crops from the embedded Crop model in farm.py
-        if hasattr(farm, 'crops'):
-            for crop in farm.crops:
-                db.session.delete(crop)
-        
-        # 3. Farm notes will be deleted automatically due to cascade='all, delete-orphan'
+        from app.utils.user_stats import adjust_user_stats
+        from app.utils.cache_versions import mark_changed
+        removed = MonitoredCrop.query.filter_by(farm_id=farm_id).delete(synchronize_session=False)
+        if removed:
+            adjust_user_stats(farm.user_id, monitored_crop_count=-removed)
+            mark_changed(farm.user_id, 'crops')
+        
+        # 2. Crops and farm notes are deleted with the farm (cascade='all, delete-orphan')
         
         # Delete the farm
         db.session.delete(farm)
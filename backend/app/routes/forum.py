@@ -1,48 +1,105 @@
 # app/routes/forum.py
 from flask import Blueprint, request, jsonify
-from flask_jwt_extended import jwt_required, get_jwt_identity
+from flask_jwt_extended import jwt_required, get_jwt_identity, verify_jwt_in_request
 from app import db
 from app.models.forum import ForumPost, ForumReply, ForumVote
+from app.utils.pagination import wants_keyset, keyset_paginate
+from app.utils.forum_summary import serialize_post_summaries, reply_context_options, serialize_replies
+from app.services.forum_search_service import forum_search_service
+from app.services.view_counter_service import view_counter_service
+from app.services.similar_posts_service import similar_posts_service
+from app.utils.hot_rank import hot_score, refresh_hot_scores
+from app.utils.forum_counters import increment_reply_count
 from sqlalchemy import func
+from sqlalchemy.orm import joinedload
+from datetime import datetime
 
 forum_bp = Blueprint('forum', __name__)
 
+def _search_results_response(query, category, page, per_page):
+    """
+    Relevance-ranked search page, or None when the query has no indexable
+    words (or FULLTEXT failed transiently) and the caller should fall back
+    to a substring match.
+    """
+    found = forum_search_service.search(query, category=category, page=page, per_page=per_page)
+    if found is None:
+        return None
+    results, total = found
+
+    posts = serialize_post_summaries([post for post, _, _ in results])
+    for summary, (_, score, snippet) in zip(posts, results):
+        summary["score"] = score
+        summary["snippet"] = snippet
+
+    pages = (total + per_page - 1) // per_page if per_page else 0
+    return jsonify({
+        "posts": posts,
+        "pagination": {
+            "total": total,
+            "pages": pages,
+            "page": page,
+            "per_page": per_page,
+            "has_next": page < pages,
+            "has_prev": page > 1
+        }
+    })
+
 @forum_bp.route('/posts', methods=['GET'])
 def get_posts():
     # Get query parameters
     category = request.args.get("category")
     page = request.args.get("page", 1, type=int)
     per_page = request.args.get("per_page", 10, type=int)
-    sort_by = request.args.get("sort_by", "recent")  # Options: recent, replies, views
+    sort_by = request.args.get("sort_by", "recent")  # Options: recent, replies, views, hot, activity
     search = request.args.get("search", "")
     
-    # Build query
-    q = ForumPost.query
+    # Build query (author eagerly joined for the summaries)
+    q = ForumPost.query.options(joinedload(ForumPost.user))
     
     # Apply filters
     if category:
         q = q.filter_by(category=category)
     
-    # Apply search if provided
+    # Full-text search is ranked by relevance and paginated by page number
     if search:
+        response = _search_results_response(search, category, max(page, 1), max(1, min(per_page, 100)))
+        if response is not None:
+            return response
+        
+        # No indexable words (e.g. only stopwords): plain substring match
         search_term = f"%{search}%"
         q = q.filter((ForumPost.title.ilike(search_term)) | 
                      (ForumPost.content.ilike(search_term)))
     
     # Apply sorting
     if sort_by == "replies":
-        q = q.order_by(ForumPost.reply_count.desc())
+        sort_column = ForumPost.reply_count
     elif sort_by == "views":
-        q = q.order_by(ForumPost.views.desc())
+        sort_column = ForumPost.views
+    elif sort_by == "hot":
+        sort_column = ForumPost.hot_score
+    elif sort_by == "activity":
+        sort_column = ForumPost.last_reply_at
     else:  # Default to recent
-        q = q.order_by(ForumPost.created_at.desc())
+        sort_column = ForumPost.created_at
+    
+    # Keyset pagination when a cursor is supplied (no COUNT/OFFSET)
+    if wants_keyset():
+        try:
+            posts, pagination = keyset_paginate(q, sort_column, ForumPost.id)
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+        return jsonify({"posts": serialize_post_summaries(posts), "pagination": pagination})
+    
+    q = q.order_by(sort_column.desc())
     
     # Pagination
     paginated = q.paginate(page=page, per_page=per_page, error_out=False)
     
     # Prepare response
     result = {
-        "posts": [p.to_dict() for p in paginated.items],
+        "posts": serialize_post_summaries(paginated.items),
         "pagination": {
             "total": paginated.total,
             "pages": paginated.pages,
@@ -89,28 +146,51 @@ def post_question():
     sanitized_category = bleach.clean(category, tags=[], strip=True)
     
     # Create the post
+    created_at = datetime.utcnow()
     post = ForumPost(
         user_id=user_id,
         title=title,
         content=content,
         category=category,
-        is_expert_question=data.get('is_expert_question', False)
+        is_expert_question=data.get('is_expert_question', False),
+        created_at=created_at,
+        hot_score=hot_score(0, 0, 0, 0, created_at)
     )
     db.session.add(post)
     db.session.commit()
+    forum_search_service.index_post(post)
+    similar_posts_service.index_post(post)
     return jsonify(post.to_dict()), 201
 
+def _viewer_key():
+    """Identify a viewer for unique view counts: the user if signed in, else IP and user agent"""
+    try:
+        verify_jwt_in_request(optional=True)
+        user_id = get_jwt_identity()
+    except Exception:
+        user_id = None
+    if user_id:
+        return f"user:{user_id}"
+    return f"anon:{request.remote_addr}|{request.headers.get('User-Agent', '')}"
+
 @forum_bp.route('/posts/<int:post_id>', methods=['GET'])
 def get_post(post_id):
-    post = ForumPost.query.get(post_id)
+    post = ForumPost.query.options(joinedload(ForumPost.user)).filter_by(id=post_id).first()
     if not post:
         return jsonify({"error": "Post not found"}), 404
         
-    # Increment view counter
-    post.views += 1
-    db.session.commit()
-    
-    return jsonify(post.to_dict())
+    # Views are buffered and flushed in batches, keeping this GET read-only
+    view_counter_service.record(post_id, viewer=_viewer_key())
+    
+    # Replies come with their authors from one joined query
+    replies = ForumReply.query.options(*reply_context_options())\
+        .filter_by(post_id=post_id).order_by(ForumReply.created_at.asc(), ForumReply.id.asc()).all()
+    
+    data = post.to_dict(include_replies=False)
+    data["author_name"] = post.user.name if post.user else None
+    data["replies"] = serialize_replies(replies)
+    data["views"] = (post.views or 0) + view_counter_service.pending(post_id)
+    return jsonify(data)
 
 @forum_bp.route('/posts/<int:post_id>/replies', methods=['POST'])
 @jwt_required()
@@ -128,13 +208,13 @@ def reply(post_id):
     user_id = get_jwt_identity()
     
     # Check if post exists
-    post = ForumPost.query.get(post_id)
-    if not post:
+    post_owner = db.session.query(ForumPost.user_id).filter_by(id=post_id).first()
+    if not post_owner:
         return jsonify({"error": "Post not found"}), 404
     
     # Prevent users from replying to their own posts
     jwt_user_id = int(user_id) if isinstance(user_id, str) else user_id
-    if post.user_id == jwt_user_id:
+    if post_owner.user_id == jwt_user_id:
         return jsonify({"error": "You cannot reply to your own post"}), 403
     
     # Create the reply
@@ -142,12 +222,14 @@ def reply(post_id):
         user_id=user_id,
         post_id=post_id,
         content=content,
-        is_expert_reply=data.get('is_expert_reply', False)
+        is_expert_reply=data.get('is_expert_reply', False),
+        created_at=datetime.utcnow()
     )
     db.session.add(reply)
     
-    # Update reply count on the post
-    post.reply_count = ForumReply.query.filter_by(post_id=post_id).count() + 1
+    # Atomic reply_count + 1 instead of recounting the thread
+    increment_reply_count(post_id, reply.created_at)
+    refresh_hot_scores([post_id])
     
     db.session.commit()
     return jsonify(reply.to_dict()), 201
@@ -161,12 +243,22 @@ def my_posts():
     page = request.args.get("page", 1, type=int)
     per_page = request.args.get("per_page", 10, type=int)
     
+    q = ForumPost.query.options(joinedload(ForumPost.user)).filter_by(user_id=jwt_user_id)
+    
+    # Keyset pagination when a cursor is supplied (no COUNT/OFFSET)
+    if wants_keyset():
+        try:
+            posts, pagination = keyset_paginate(q, ForumPost.created_at, ForumPost.id)
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+        return jsonify({"posts": serialize_post_summaries(posts), "pagination": pagination})
+    
     # Get paginated results
-    q = ForumPost.query.filter_by(user_id=jwt_user_id).order_by(ForumPost.created_at.desc())
+    q = q.order_by(ForumPost.created_at.desc())
     paginated = q.paginate(page=page, per_page=per_page, error_out=False)
     
     result = {
-        "posts": [p.to_dict() for p in paginated.items],
+        "posts": serialize_post_summaries(paginated.items),
         "pagination": {
             "total": paginated.total,
             "pages": paginated.pages,
@@ -249,7 +341,7 @@ def mark_solved(post_id):
 
 @forum_bp.route('/search', methods=['GET'])
 def search_posts():
-    """Search for posts by keyword"""
+    """Search posts by keyword, best matches first, optionally within a category"""
     query = request.args.get('query', '')
     if not query or len(query) < 3:
         return jsonify({"error": "Search query must be at least 3 characters"}), 400
@@ -257,16 +349,26 @@ def search_posts():
     page = request.args.get("page", 1, type=int)
     per_page = request.args.get("per_page", 10, type=int)
     
+    category = request.args.get("category")
+    
+    response = _search_results_response(query, category, max(page, 1), max(1, min(per_page, 100)))
+    if response is not None:
+        return response
+    
+    # No indexable words: fall back to a substring match, newest first
     search_term = f"%{query}%"
-    q = ForumPost.query.filter(
+    q = ForumPost.query.options(joinedload(ForumPost.user)).filter(
         (ForumPost.title.ilike(search_term)) | 
         (ForumPost.content.ilike(search_term))
-    ).order_by(ForumPost.created_at.desc())
+    )
+    if category:
+        q = q.filter(ForumPost.category == category)
+    q = q.order_by(ForumPost.created_at.desc())
     
     paginated = q.paginate(page=page, per_page=per_page, error_out=False)
     
     result = {
-        "posts": [p.to_dict() for p in paginated.items],
+        "posts": serialize_post_summaries(paginated.items),
         "pagination": {
             "total": paginated.total,
             "pages": paginated.pages,
@@ -278,3 +380,27 @@ def search_posts():
     }
     
     return jsonify(result)
+
+@forum_bp.route('/similar', methods=['GET'])
+def similar_posts():
+    """Suggest existing posts similar to a question being typed"""
+    query = request.args.get('q', '').strip()
+    if len(query) < 3:
+        return jsonify({"posts": []})
+    
+    limit = max(1, min(request.args.get('limit', 5, type=int), 20))
+    exclude_id = request.args.get('exclude', type=int)
+    
+    results = similar_posts_service.similar(query, limit=limit, exclude_id=exclude_id)
+    return jsonify({
+        "posts": [{
+            "id": post.id,
+            "title": post.title,
+            "category": post.category,
+            "status": post.status,
+            "solved": post.solved,
+            "reply_count": post.reply_count,
+            "created_at": post.created_at.isoformat() if post.created_at else None,
+            "score": score
+        } for post, score in results]
+    })
@@ -3,6 +3,12 @@ from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from app import db
 from app.models.forum import ForumPost, ForumReply, ForumVote
+from app.utils.pagination import wants_keyset, keyset_paginate
+from app.services.forum_search_service import forum_search_service
+from app.services.similar_posts_service import similar_posts_service
+from app.utils.hot_rank import refresh_hot_scores
+from app.utils.forum_counters import decrement_reply_count
+from app.utils.forum_summary import reply_context_options, serialize_replies
 from datetime import datetime
 import bleach
 
@@ -18,22 +24,20 @@ def get_my_comments():
     page = request.args.get("page", 1, type=int)
     per_page = request.args.get("per_page", 10, type=int)
     
-    # Get paginated results for user's replies
-    q = ForumReply.query.filter_by(user_id=jwt_user_id).order_by(ForumReply.created_at.desc())
-    paginated = q.paginate(page=page, per_page=per_page, error_out=False)
-    
-    # Add post title and other details to each reply
-    comments_with_context = []
-    for reply in paginated.items:
-        post = ForumPost.query.get(reply.post_id)
-        reply_dict = reply.to_dict()
-        reply_dict['post_title'] = post.title if post else "Unknown Post"
-        reply_dict['post_category'] = post.category if post else None
-        comments_with_context.append(reply_dict)
+    # Post title/category and author name are joined in, not fetched per reply
+    q = ForumReply.query.options(*reply_context_options(include_post=True)).filter_by(user_id=jwt_user_id)
     
-    result = {
-        "comments": comments_with_context,
-        "pagination": {
+    # Keyset pagination when a cursor is supplied (no COUNT/OFFSET)
+    if wants_keyset():
+        try:
+            replies, pagination = keyset_paginate(q, ForumReply.created_at, ForumReply.id)
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+    else:
+        # Get paginated results for user's replies
+        paginated = q.order_by(ForumReply.created_at.desc()).paginate(page=page, per_page=per_page, error_out=False)
+        replies = paginated.items
+        pagination = {
             "total": paginated.total,
             "pages": paginated.pages,
             "page": page,
@@ -41,6 +45,12 @@ def get_my_comments():
             "has_next": paginated.has_next,
             "has_prev": paginated.has_prev
         }
+    
+    comments_with_context = serialize_replies(replies, include_post=True)
+    
+    result = {
+        "comments": comments_with_context,
+        "pagination": pagination
     }
     
     return jsonify(result)
@@ -67,6 +77,8 @@ def delete_post(post_id):
         # Delete the post (cascade will handle replies and votes due to our relationship setup)
         db.session.delete(post)
         db.session.commit()
+        forum_search_service.remove_post(post_id)
+        similar_posts_service.remove_post(post_id)
         
         return jsonify({"message": "Post and all associated replies have been deleted successfully"}), 200
     
@@ -122,6 +134,8 @@ def edit_post(post_id):
         post.edit_count = (post.edit_count or 0) + 1
         
         db.session.commit()
+        forum_search_service.index_post(post)
+        similar_posts_service.index_post(post)
         
         return jsonify({
             "message": "Post updated successfully",
@@ -151,15 +165,15 @@ def delete_reply(reply_id):
         return jsonify({"error": "Invalid user authentication"}), 401
     
     try:
-        # Get the post to update reply count
-        post = ForumPost.query.get(reply.post_id)
+        post_id = reply.post_id
         
         # Delete the reply
         db.session.delete(reply)
+        db.session.flush()
         
-        # Update reply count on the post
-        if post:
-            post.reply_count = max(0, post.reply_count - 1)
+        # Atomic reply_count - 1 on the post
+        decrement_reply_count(post_id)
+        refresh_hot_scores([post_id])
         
         db.session.commit()
         
@@ -222,16 +236,26 @@ def get_post_replies(post_id):
     per_page = request.args.get("per_page", 20, type=int)
     
     # Check if post exists
-    post = ForumPost.query.get(post_id)
-    if not post:
+    if not db.session.query(ForumPost.id).filter_by(id=post_id).first():
         return jsonify({"error": "Post not found"}), 404
     
+    q = ForumReply.query.options(*reply_context_options()).filter_by(post_id=post_id)
+    
+    # Keyset pagination when a cursor is supplied (oldest first, no COUNT/OFFSET)
+    if wants_keyset():
+        try:
+            replies, pagination = keyset_paginate(q, ForumReply.created_at, ForumReply.id,
+                                                  descending=False, default_per_page=20)
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+        return jsonify({"replies": serialize_replies(replies), "pagination": pagination})
+    
     # Get paginated replies
-    q = ForumReply.query.filter_by(post_id=post_id).order_by(ForumReply.created_at.asc())
+    q = q.order_by(ForumReply.created_at.asc())
     paginated = q.paginate(page=page, per_page=per_page, error_out=False)
     
     result = {
-        "replies": [reply.to_dict() for reply in paginated.items],
+        "replies": serialize_replies(paginated.items),
         "pagination": {
             "total": paginated.total,
             "pages": paginated.pages,
@@ -5,6 +5,7 @@ from app import db
 from app.models.monitored_crop import MonitoredCrop
 from app.models.farm import Farm
 from app.models.user import User
+from app.utils.fieldsets import requested_fields, project
 from datetime import datetime, date
 
 monitored_crops_bp = Blueprint('monitored_crops', __name__)
@@ -15,10 +16,15 @@ def get_monitored_crops():
     """Get all monitored crops for the current user"""
     try:
         user_id = get_jwt_identity()
-        crops = MonitoredCrop.query.filter_by(user_id=user_id).order_by(MonitoredCrop.created_at.desc()).all()
+        try:
+            fields = requested_fields(MonitoredCrop)
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+        crops = project(MonitoredCrop.query, MonitoredCrop, fields)\
+            .filter_by(user_id=user_id).order_by(MonitoredCrop.created_at.desc()).all()
         
         return jsonify({
-            "crops": [crop.to_dict() for crop in crops]
+            "crops": [crop.to_dict(fields) for crop in crops]
         }), 200
         
     except Exception as e:
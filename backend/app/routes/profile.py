@@ -5,6 +5,8 @@ from app import db
 from app.models.user import User
 from app.models.farm import Farm, Crop
 from app.models.transaction import FarmLedger
+from app.utils.pagination import wants_keyset, keyset_paginate
+from app.utils.fieldsets import requested_fields, project
 
 profile_bp = Blueprint('profile', __name__)
 
@@ -91,16 +93,32 @@ def get_transactions():
         per_page = max(1, min(per_page, 100))  # clamp to [1, 100]
     except Exception:
         page, per_page = 1, 25
+    try:
+        fields = requested_fields(FarmLedger)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    # Sort columns are always loaded: the keyset cursor is read from the last row
+    base = project(FarmLedger.query, FarmLedger, fields, also=(FarmLedger.transaction_date,))
+
+    # Keyset pagination over (transaction_date, id) when a cursor is supplied
+    if wants_keyset():
+        try:
+            items, pagination = keyset_paginate(base.filter_by(user_id=user_id),
+                                                FarmLedger.transaction_date, FarmLedger.id,
+                                                default_per_page=25)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        return jsonify({'transactions': [t.to_dict(fields) for t in items], **pagination})
 
-    query = FarmLedger.query.filter_by(user_id=user_id).order_by(FarmLedger.transaction_date.desc(), FarmLedger.id.desc())
+    query = base.filter_by(user_id=user_id).order_by(FarmLedger.transaction_date.desc(), FarmLedger.id.desc())
 
     # If client explicitly requests all, maintain backward compatibility
     if request.args.get('all') == 'true':
         items = query.all()
-        return jsonify({'transactions': [t.to_dict() for t in items], 'total': len(items), 'page': 1, 'per_page': len(items)})
+        return jsonify({'transactions': [t.to_dict(fields) for t in items], 'total': len(items), 'page': 1, 'per_page': len(items)})
 
     pagination = query.paginate(page=page, per_page=per_page, error_out=False)
-    items = [t.to_dict() for t in pagination.items]
+    items = [t.to_dict(fields) for t in pagination.items]
     return jsonify({
         'transactions': items,
         'total': pagination.total,
@@ -194,7 +212,11 @@ def update_transaction(transaction_id):
         if 'type' in data:
             transaction.transaction_type = data['type']
         if 'date' in data:
-            transaction.transaction_date = data['date']
+            from datetime import datetime
+            try:
+                transaction.transaction_date = datetime.strptime(data['date'], '%Y-%m-%d').date()
+            except (TypeError, ValueError):
+                return jsonify({'error': 'Invalid date format. Use YYYY-MM-DD'}), 400
         
         db.session.commit()
         
@@ -3,9 +3,15 @@ from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from app import db
 from app.models.forum import ForumPost, ForumVote
+from app.utils.upsert import insert_ignore
+from app.utils.hot_rank import refresh_hot_scores
+from sqlalchemy import delete, update, func
+from datetime import datetime
 
 voting_bp = Blueprint('voting', __name__)
 
+MAX_STATUS_POSTS = 100
+
 @voting_bp.route('/posts/<int:post_id>/vote', methods=['POST'])
 @jwt_required()
 def vote_post(post_id):
@@ -20,72 +26,67 @@ def vote_post(post_id):
     if vote_type not in ['upvote', 'downvote']:
         return jsonify({"error": "Invalid vote type. Must be 'upvote' or 'downvote'"}), 400
     
-    # Check if post exists
-    post = ForumPost.query.get(post_id)
-    if not post:
+    # Check if post exists (id only, the counters are updated in SQL)
+    if not db.session.query(ForumPost.id).filter_by(id=post_id).first():
         return jsonify({"error": "Post not found"}), 404
     
-    # Check if user has already voted on this post
-    existing_vote = ForumVote.query.filter_by(user_id=jwt_user_id, post_id=post_id).first()
+    vote_filter = (ForumVote.user_id == jwt_user_id) & (ForumVote.post_id == post_id)
+    other_type = 'downvote' if vote_type == 'upvote' else 'upvote'
+    deltas = {'upvote': 0, 'downvote': 0}
     
-    if existing_vote:
-        # If same vote type, remove the vote (toggle)
-        if existing_vote.vote_type == vote_type:
-            # Remove the vote
-            if vote_type == 'upvote':
-                post.upvotes = max(0, post.upvotes - 1)
-            else:
-                post.downvotes = max(0, post.downvotes - 1)
-            
-            db.session.delete(existing_vote)
-            db.session.commit()
-            
-            return jsonify({
-                "message": f"{vote_type.capitalize()} removed",
-                "upvotes": post.upvotes,
-                "downvotes": post.downvotes,
-                "user_vote": None
-            }), 200
+    try:
+        # Same vote again removes it (toggle)
+        removed = db.session.execute(
+            delete(ForumVote).where(vote_filter, ForumVote.vote_type == vote_type)
+            .execution_options(synchronize_session=False)
+        ).rowcount
+        if removed:
+            deltas[vote_type] = -1
+            message, user_vote = f"{vote_type.capitalize()} removed", None
         else:
-            # Change vote type
-            if existing_vote.vote_type == 'upvote':
-                post.upvotes = max(0, post.upvotes - 1)
-                post.downvotes += 1
+            # Opposite vote is switched in place
+            changed = db.session.execute(
+                update(ForumVote).where(vote_filter, ForumVote.vote_type == other_type)
+                .values(vote_type=vote_type)
+                .execution_options(synchronize_session=False)
+            ).rowcount
+            if changed:
+                deltas[other_type] = -1
+                deltas[vote_type] = 1
+                message = f"Vote changed to {vote_type}"
             else:
-                post.downvotes = max(0, post.downvotes - 1)
-                post.upvotes += 1
-            
-            existing_vote.vote_type = vote_type
-            db.session.commit()
-            
-            return jsonify({
-                "message": f"Vote changed to {vote_type}",
-                "upvotes": post.upvotes,
-                "downvotes": post.downvotes,
-                "user_vote": vote_type
-            }), 200
-    else:
-        # Create new vote
-        new_vote = ForumVote(
-            user_id=jwt_user_id,
-            post_id=post_id,
-            vote_type=vote_type
-        )
+                # New vote; a concurrent duplicate hits unique_user_post_vote and is ignored
+                inserted = db.session.execute(
+                    insert_ignore(ForumVote, user_id=jwt_user_id, post_id=post_id,
+                                  vote_type=vote_type, created_at=datetime.utcnow())
+                ).rowcount
+                if inserted:
+                    deltas[vote_type] = 1
+                message = f"{vote_type.capitalize()} added"
+            user_vote = vote_type
         
-        if vote_type == 'upvote':
-            post.upvotes += 1
-        else:
-            post.downvotes += 1
-        
-        db.session.add(new_vote)
+        if deltas['upvote'] or deltas['downvote']:
+            db.session.execute(
+                update(ForumPost).where(ForumPost.id == post_id)
+                .values(upvotes=func.coalesce(ForumPost.upvotes, 0) + deltas['upvote'],
+                        downvotes=func.coalesce(ForumPost.downvotes, 0) + deltas['downvote'])
+                .execution_options(synchronize_session=False)
+            )
+            refresh_hot_scores([post_id])
         db.session.commit()
-        
-        return jsonify({
-            "message": f"{vote_type.capitalize()} added",
-            "upvotes": post.upvotes,
-            "downvotes": post.downvotes,
-            "user_vote": vote_type
-        }), 200
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({"error": f"Failed to record vote: {str(e)}"}), 500
+    
+    upvotes, downvotes = db.session.query(ForumPost.upvotes, ForumPost.downvotes)\
+        .filter(ForumPost.id == post_id).one()
+    
+    return jsonify({
+        "message": message,
+        "upvotes": upvotes,
+        "downvotes": downvotes,
+        "user_vote": user_vote
+    }), 200
 
 @voting_bp.route('/posts/<int:post_id>/vote', methods=['GET'])
 @jwt_required()
@@ -107,4 +108,33 @@ def get_vote_status(post_id):
         "upvotes": post.upvotes,
         "downvotes": post.downvotes,
         "user_vote": user_vote.vote_type if user_vote else None
-    }), 200
\ No newline at end of file
+    }), 200
+
+@voting_bp.route('/votes/status', methods=['POST'])
+@jwt_required()
+def get_vote_statuses():
+    """Get the current user's votes for several posts at once"""
+    user_id = get_jwt_identity()
+    jwt_user_id = int(user_id) if isinstance(user_id, str) else user_id
+    
+    data = request.json or {}
+    post_ids = data.get('post_ids')
+    if not isinstance(post_ids, list):
+        return jsonify({"error": "post_ids must be a list"}), 400
+    try:
+        post_ids = list(dict.fromkeys(int(pid) for pid in post_ids))
+    except (TypeError, ValueError):
+        return jsonify({"error": "post_ids must be integers"}), 400
+    if len(post_ids) > MAX_STATUS_POSTS:
+        return jsonify({"error": f"At most {MAX_STATUS_POSTS} post ids per request"}), 400
+    
+    votes = {str(pid): None for pid in post_ids}
+    if post_ids:
+        rows = db.session.query(ForumVote.post_id, ForumVote.vote_type).filter(
+            ForumVote.user_id == jwt_user_id,
+            ForumVote.post_id.in_(post_ids)
+        ).all()
+        for post_id, vote_type in rows:
+            votes[str(post_id)] = vote_type
+    
+    return jsonify({"votes": votes}), 200
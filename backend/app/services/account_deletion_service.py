@@ -0,0 +1,218 @@
+import os
+import uuid
+import logging
+import threading
+from datetime import datetime, timedelta
+from flask import current_app
+from sqlalchemy import select, delete, inspect, tuple_
+from app import db
+from app.models.account_deletion import AccountDeletionJob
+
+logger = logging.getLogger(__name__)
+
+class AccountDeletionService:
+    """Deletes a user's data in the background, one bounded chunk at a time."""
+
+    # A running job that has not reported progress for this long is treated as abandoned
+    STALE_AFTER = timedelta(minutes=10)
+
+    def _steps(self, user_id):
+        """
+        Deletion steps as (label, model, criterion, file path column).
+
+        Ordered so that every row is removed before the rows it references:
+        votes and replies (including other users' on this user's posts) before
+        posts, notes/crops before farms, and everything before the user row.
+        """
+        from app.models.forum import ForumPost, ForumReply, ForumVote, ForumPostViewSketch
+        from app.models.calculator_result import CalculatorResult
+        from app.models.calculator_history import CalculatorHistory
+        from app.models.crop_predictions import CropRecommendation, CropYieldPrediction
+        from app.models.disease_scan import DiseaseScan
+        from app.models.disease import DiseaseDetection
+        from app.models.transaction import FarmLedger, FarmLedgerMonthly
+        from app.models.farm_note import FarmNote
+        from app.models.monitored_crop import MonitoredCrop
+        from app.models.farm import Farm, Crop
+        from app.models.user_stats import UserStats
+
+        own_posts = select(ForumPost.id).where(ForumPost.user_id == user_id)
+        own_farms = select(Farm.id).where(Farm.user_id == user_id)
+
+        return [
+            ('forum_votes', ForumVote, ForumVote.user_id == user_id, None),
+            ('forum_votes', ForumVote, ForumVote.post_id.in_(own_posts), None),
+            ('forum_replies', ForumReply, ForumReply.user_id == user_id, None),
+            ('forum_replies', ForumReply, ForumReply.post_id.in_(own_posts), None),
+            ('forum_post_view_sketches', ForumPostViewSketch, ForumPostViewSketch.post_id.in_(own_posts), None),
+            ('forum_posts', ForumPost, ForumPost.user_id == user_id, None),
+            ('calculator_results', CalculatorResult, CalculatorResult.user_id == user_id, None),
+            ('calculator_history', CalculatorHistory, CalculatorHistory.user_id == user_id, None),
+            ('crop_recommendations', CropRecommendation, CropRecommendation.user_id == user_id, None),
+            ('crop_yield_predictions', CropYieldPrediction, CropYieldPrediction.user_id == user_id, None),
+            ('disease_scans', DiseaseScan, DiseaseScan.user_id == user_id, DiseaseScan.image_path),
+            ('disease_detections', DiseaseDetection, DiseaseDetection.user_id == user_id, DiseaseDetection.image_path),
+            ('farm_ledger', FarmLedger, FarmLedger.user_id == user_id, None),
+            ('farm_ledger_monthly', FarmLedgerMonthly, FarmLedgerMonthly.user_id == user_id, None),
+            ('farm_notes', FarmNote, FarmNote.user_id == user_id, None),
+            ('farm_notes', FarmNote, FarmNote.farm_id.in_(own_farms), None),
+            ('monitored_crops', MonitoredCrop, MonitoredCrop.user_id == user_id, None),
+            ('crops', Crop, Crop.farm_id.in_(own_farms), None),
+            ('farms', Farm, Farm.user_id == user_id, None),
+            ('user_stats', UserStats, UserStats.user_id == user_id, None),
+        ]
+
+    def _forum_posts(self, user_id):
+        """
+        (ids of the user's posts, ids of other users' posts the user replied
+        to or voted on). The chunked deletes skip the ORM, so the counters of
+        the latter and the in-process indexes of the former are fixed here.
+        """
+        from app.models.forum import ForumPost, ForumReply, ForumVote
+
+        own = [post_id for (post_id,) in db.session.execute(select(ForumPost.id).where(ForumPost.user_id == user_id))]
+        own_posts = select(ForumPost.id).where(ForumPost.user_id == user_id)
+        replied = select(ForumReply.post_id).where(ForumReply.user_id == user_id, ForumReply.post_id.not_in(own_posts))
+        voted = select(ForumVote.post_id).where(ForumVote.user_id == user_id, ForumVote.post_id.not_in(own_posts))
+        touched = sorted({post_id for (post_id,) in db.session.execute(replied.union(voted))})
+        return own, touched
+
+    def _recount_posts(self, post_ids):
+        from app.utils.forum_counters import reconcile_reply_counters, reconcile_vote_counters
+        from app.utils.hot_rank import refresh_hot_scores
+
+        reconcile_reply_counters(post_ids=post_ids)
+        reconcile_vote_counters(post_ids=post_ids)
+        refresh_hot_scores(post_ids)
+        db.session.commit()
+
+    def _unindex_posts(self, post_ids):
+        from app.services.forum_search_service import forum_search_service
+        from app.services.similar_posts_service import similar_posts_service
+
+        for post_id in post_ids:
+            forum_search_service.remove_post(post_id)
+            similar_posts_service.remove_post(post_id)
+
+    def get_job(self, job_id):
+        return db.session.get(AccountDeletionJob, job_id)
+
+    def start(self, user_id):
+        """
+        Create a deletion job for the user and run it on a background thread.
+
+        Returns the already active job instead if one is still making progress.
+        """
+        active = AccountDeletionJob.query.filter(
+            AccountDeletionJob.user_id == user_id,
+            AccountDeletionJob.status.in_(['pending', 'running'])
+        ).order_by(AccountDeletionJob.created_at.desc()).first()
+        if active and active.updated_at and datetime.utcnow() - active.updated_at < self.STALE_AFTER:
+            return active
+
+        job = AccountDeletionJob(
+            id=uuid.uuid4().hex,
+            user_id=user_id,
+            status='pending',
+            steps_done=0,
+            steps_total=len(self._steps(user_id)) + 1,  # +1 for the user row itself
+            deleted_rows={}
+        )
+        db.session.add(job)
+        db.session.commit()
+
+        app = current_app._get_current_object()
+        threading.Thread(target=self.run, args=(app, job.id),
+                         name=f'account-deletion-{job.id}', daemon=True).start()
+        return job
+
+    def run(self, app, job_id):
+        """Execute a deletion job; every chunk is committed separately"""
+        with app.app_context():
+            job = self.get_job(job_id)
+            if not job:
+                return
+            user_id = job.user_id
+            chunk_size = app.config.get('ACCOUNT_DELETION_CHUNK_SIZE', 500)
+
+            try:
+                job.status = 'running'
+                db.session.commit()
+                own_posts, touched_posts = self._forum_posts(user_id)
+
+                for label, model, criterion, path_column in self._steps(user_id):
+                    job.current_step = label
+                    db.session.commit()
+                    self._delete_in_chunks(job, label, model, criterion, path_column, chunk_size)
+                    job.steps_done = (job.steps_done or 0) + 1
+                    db.session.commit()
+
+                if touched_posts:
+                    self._recount_posts(touched_posts)
+
+                from app.models.user import User
+                job.current_step = 'users'
+                db.session.execute(delete(User).where(User.id == user_id))
+                job.steps_done = job.steps_total
+                job.current_step = None
+                job.status = 'completed'
+                job.finished_at = datetime.utcnow()
+                db.session.commit()
+                self._unindex_posts(own_posts)
+                logger.info(f"Account deletion {job_id} completed for user {user_id}")
+
+            except Exception as e:
+                db.session.rollback()
+                logger.error(f"Account deletion {job_id} failed for user {user_id}: {e}")
+                job = self.get_job(job_id)
+                if job:
+                    job.status = 'failed'
+                    job.error_message = str(e)
+                    job.finished_at = datetime.utcnow()
+                    db.session.commit()
+
+    def _delete_in_chunks(self, job, label, model, criterion, path_column, chunk_size):
+        """Delete rows matching `criterion` at most `chunk_size` at a time"""
+        pk = list(inspect(model).primary_key)
+        columns = pk if path_column is None else pk + [path_column]
+        # Composite keys (e.g. rollup tables) are matched as row tuples
+        key = pk[0] if len(pk) == 1 else tuple_(*pk)
+
+        while True:
+            # Only ids (and file paths) are read, never BLOB columns
+            rows = db.session.execute(select(*columns).where(criterion).limit(chunk_size)).all()
+            if not rows:
+                break
+
+            ids = [row[0] if len(pk) == 1 else tuple(row[:len(pk)]) for row in rows]
+            db.session.execute(
+                delete(model).where(key.in_(ids)).execution_options(synchronize_session=False)
+            )
+            deleted = dict(job.deleted_rows or {})
+            deleted[label] = deleted.get(label, 0) + len(ids)
+            job.deleted_rows = deleted
+            db.session.commit()
+
+            # Files go only after their rows are gone, so a rollback never orphans a row
+            if path_column is not None:
+                self._remove_files([row[-1] for row in rows if row[-1]])
+
+            if len(rows) < chunk_size:
+                break
+
+    def _remove_files(self, paths):
+        for path in paths:
+            # Stored paths are relative to the app package, sometimes with an 'app/' prefix
+            if path.startswith('app/'):
+                path = path[4:]
+            if not os.path.isabs(path):
+                path = os.path.join(current_app.root_path, path)
+            try:
+                if os.path.exists(path):
+                    os.remove(path)
+            except OSError as e:
+                logger.warning(f"Could not remove file {path}: {e}")
+
+
+# Singleton instance
+account_deletion_service = AccountDeletionService()
@@ -0,0 +1,253 @@
+import re
+import html
+import math
+import heapq
+import logging
+import threading
+from collections import Counter
+from sqlalchemy.exc import OperationalError, ProgrammingError
+from app import db
+from app.models.forum import ForumPost
+
+logger = logging.getLogger(__name__)
+
+TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+TAG_RE = re.compile(r"<[^>]+>")
+
+STOPWORDS = {
+    "a", "an", "and", "are", "as", "at", "be", "but", "by", "for", "from", "has", "have",
+    "how", "i", "in", "is", "it", "its", "my", "of", "on", "or", "so", "that", "the",
+    "this", "to", "was", "what", "when", "which", "why", "will", "with", "you"
+}
+
+# Shortest word MySQL FULLTEXT indexes by default (innodb_ft_min_token_size)
+MYSQL_MIN_TOKEN_SIZE = 3
+# ER_FT_MATCHING_KEY_NOT_FOUND: "Can't find FULLTEXT index matching the column list"
+MYSQL_NO_FULLTEXT_INDEX = 1191
+
+def _mysql_error_code(error):
+    """MySQL error number of a DBAPI error wrapped by SQLAlchemy (None if unknown)"""
+    args = getattr(error.orig, 'args', None)
+    return args[0] if args else None
+
+def tokenize(text):
+    """Lowercased word tokens without stopwords or single characters"""
+    return [t for t in TOKEN_RE.findall((text or "").lower()) if len(t) > 1 and t not in STOPWORDS]
+
+def highlight_snippet(text, terms, width=160):
+    """
+    Plain-text excerpt around the first matching term, HTML-escaped, with
+    every matching term wrapped in <mark>.
+    """
+    plain = " ".join(TAG_RE.sub(" ", text or "").split())
+    if not terms:
+        return html.escape(plain[:width])
+
+    pattern = re.compile(r"\b(" + "|".join(re.escape(t) for t in sorted(terms, key=len, reverse=True)) + r")\b",
+                         re.IGNORECASE)
+    first = pattern.search(plain)
+    start = max(0, first.start() - width // 3) if first else 0
+    excerpt = plain[start:start + width]
+
+    parts = []
+    last = 0
+    for match in pattern.finditer(excerpt):
+        parts.append(html.escape(excerpt[last:match.start()]))
+        parts.append(f"<mark>{html.escape(match.group(0))}</mark>")
+        last = match.end()
+    parts.append(html.escape(excerpt[last:]))
+
+    snippet = "".join(parts)
+    if start > 0:
+        snippet = "..." + snippet
+    if start + width < len(plain):
+        snippet += "..."
+    return snippet
+
+
+class InvertedIndex:
+    """In-memory BM25 index over post titles and contents."""
+
+    K1 = 1.2
+    B = 0.75
+    TITLE_WEIGHT = 2  # Title tokens count this many times
+
+    def __init__(self):
+        self.postings = {}  # term -> {post_id: term frequency}
+        self.doc_terms = {}  # post_id -> Counter, kept so documents can be removed
+        self.doc_len = {}
+        self.doc_category = {}
+        self.total_len = 0
+
+    def _terms(self, title, content):
+        terms = Counter(tokenize(content))
+        for token in tokenize(title):
+            terms[token] += self.TITLE_WEIGHT
+        return terms
+
+    def add(self, post_id, title, content, category):
+        self.remove(post_id)
+        terms = self._terms(title, content)
+        for term, tf in terms.items():
+            self.postings.setdefault(term, {})[post_id] = tf
+        length = sum(terms.values())
+        self.doc_terms[post_id] = terms
+        self.doc_len[post_id] = length
+        self.doc_category[post_id] = category
+        self.total_len += length
+
+    def remove(self, post_id):
+        terms = self.doc_terms.pop(post_id, None)
+        if terms is None:
+            return
+        for term in terms:
+            docs = self.postings.get(term)
+            if docs is not None:
+                docs.pop(post_id, None)
+                if not docs:
+                    del self.postings[term]
+        self.total_len -= self.doc_len.pop(post_id, 0)
+        self.doc_category.pop(post_id, None)
+
+    def search(self, query_terms, category=None, limit=None):
+        """Return ([(post_id, score)] best first, number of matching documents)"""
+        n_docs = len(self.doc_len)
+        if not n_docs or not query_terms:
+            return [], 0
+        avgdl = self.total_len / n_docs
+
+        scores = {}
+        for term in set(query_terms):
+            docs = self.postings.get(term)
+            if not docs:
+                continue
+            idf = math.log(1 + (n_docs - len(docs) + 0.5) / (len(docs) + 0.5))
+            for post_id, tf in docs.items():
+                if category and self.doc_category.get(post_id) != category:
+                    continue
+                norm = self.K1 * (1 - self.B + self.B * self.doc_len[post_id] / avgdl)
+                scores[post_id] = scores.get(post_id, 0.0) + idf * tf * (self.K1 + 1) / (tf + norm)
+
+        ranked = ((score, post_id) for post_id, score in scores.items())
+        if limit is not None:
+            top = heapq.nlargest(limit, ranked)
+        else:
+            top = sorted(ranked, reverse=True)
+        return [(post_id, score) for score, post_id in top], len(scores)
+
+
+class ForumSearchService:
+    """
+    Full-text search over forum posts.
+
+    MySQL uses MATCH ... AGAINST on the FULLTEXT(title, content) index. Other
+    databases (SQLite in development and tests) use an in-process BM25
+    inverted index that is built lazily and updated incrementally as posts
+    are created, edited and deleted.
+    """
+
+    def __init__(self):
+        self._index = None
+        self._lock = threading.Lock()
+        self._mysql_fulltext = True  # Cleared if the FULLTEXT index is missing
+
+    def _use_mysql(self):
+        return self._mysql_fulltext and db.engine.dialect.name == 'mysql'
+
+    def _ensure_index(self):
+        if self._index is not None:
+            return self._index
+        with self._lock:
+            if self._index is None:
+                index = InvertedIndex()
+                rows = db.session.query(ForumPost.id, ForumPost.title, ForumPost.content, ForumPost.category)\
+                    .yield_per(1000)
+                for post_id, title, content, category in rows:
+                    index.add(post_id, title, content, category)
+                self._index = index
+                logger.info(f"Forum search index built with {len(index.doc_len)} posts")
+        return self._index
+
+    def index_post(self, post):
+        """Add or refresh a post after create/edit (no-op until the index is built)"""
+        if self._index is None:
+            return
+        with self._lock:
+            self._index.add(post.id, post.title, post.content, post.category)
+
+    def remove_post(self, post_id):
+        if self._index is None:
+            return
+        with self._lock:
+            self._index.remove(post_id)
+
+    def search(self, query, category=None, page=1, per_page=10):
+        """
+        Rank posts for `query`, best match first.
+
+        Returns (list of (post, score, snippet), total matches), or None when
+        the query has no indexable words, or the FULLTEXT query failed for a
+        transient reason (lock wait, lost connection), so callers can fall
+        back to a substring filter.
+        """
+        terms = tokenize(query)
+        page = max(1, page)
+        offset = (page - 1) * per_page
+
+        if self._use_mysql():
+            if not any(len(t) >= MYSQL_MIN_TOKEN_SIZE for t in terms):
+                return None
+            try:
+                ranked, total = self._search_mysql(query, category, offset, per_page)
+            except (OperationalError, ProgrammingError) as e:
+                db.session.rollback()
+                if _mysql_error_code(e) != MYSQL_NO_FULLTEXT_INDEX:
+                    # Only this request falls back; the in-process index would be stale across workers
+                    logger.warning(f"FULLTEXT search failed, using a substring filter for this request: {e}")
+                    return None
+                logger.warning(f"FULLTEXT index missing, using in-process index: {e}")
+                self._mysql_fulltext = False
+                return self.search(query, category, page, per_page)
+        else:
+            if not terms:
+                return None
+            index = self._ensure_index()
+            with self._lock:
+                ranked, total = index.search(terms, category, limit=offset + per_page)
+            ranked = ranked[offset:offset + per_page]
+
+        return self._load_results(ranked, terms), total
+
+    def _search_mysql(self, query, category, offset, limit):
+        from sqlalchemy.dialects.mysql import match
+
+        score = match(ForumPost.title, ForumPost.content, against=query).in_natural_language_mode()
+        q = db.session.query(ForumPost.id, score.label('score')).filter(score > 0)
+        if category:
+            q = q.filter(ForumPost.category == category)
+        total = q.order_by(None).count()
+        rows = q.order_by(score.desc(), ForumPost.id.desc()).offset(offset).limit(limit).all()
+        return [(post_id, float(s)) for post_id, s in rows], total
+
+    def _load_results(self, ranked, terms):
+        from sqlalchemy.orm import joinedload
+
+        if not ranked:
+            return []
+        ids = [post_id for post_id, _ in ranked]
+        posts = {p.id: p for p in ForumPost.query.options(joinedload(ForumPost.user))
+                 .filter(ForumPost.id.in_(ids)).all()}
+
+        results = []
+        for post_id, score in ranked:
+            post = posts.get(post_id)
+            if post is None:
+                # Deleted outside the forum routes (e.g. bulk account deletion)
+                self.remove_post(post_id)
+                continue
+            results.append((post, round(score, 4), highlight_snippet(post.content, terms)))
+        return results
+
+
+# Singleton instance
+forum_search_service = ForumSearchService()
@@ -0,0 +1,204 @@
+import os
+import re
+import json
+import time
+import random
+import atexit
+import logging
+import threading
+from sqlalchemy import event
+
+logger = logging.getLogger(__name__)
+
+# Latency histogram upper bounds in milliseconds; the last bucket is open-ended
+HISTOGRAM_BOUNDS_MS = [1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500]
+
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r"(?<![\w.])-?\d+(?:\.\d+)?(?:[eE][-+]?\d+)?\b")
+_PARAM = re.compile(r"%\(\w+\)s|%s|:\w+|\?")
+_IN_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)*\s*\)")
+_WHITESPACE = re.compile(r"\s+")
+
+def fingerprint(statement):
+    """Statement with literals and bind parameters replaced, so repeats of one query share a key"""
+    sql = _STRING.sub('?', statement)
+    sql = _PARAM.sub('?', sql)
+    sql = _NUMBER.sub('?', sql)
+    sql = _IN_LIST.sub('(?+)', sql)
+    return _WHITESPACE.sub(' ', sql).strip()
+
+class QueryProfilerService:
+    """
+    Sampled SQL latency recorder.
+
+    A fraction (QUERY_SAMPLE_RATE) of statements is timed between the
+    engine's before/after_cursor_execute events and aggregated per
+    fingerprint into a count, total/max time and a latency histogram.
+    Sampled SELECTs slower than SLOW_QUERY_MS are EXPLAINed later on a
+    separate connection, never inside the request.
+
+    Each process periodically writes its totals to its own JSON file in
+    QUERY_SAMPLES_DIR, which `flask db advise-indexes` reads. With a sample
+    rate of 0 no listeners are attached, so there is no per-query cost.
+    """
+
+    MAX_FINGERPRINTS = 2000  # Distinct statements tracked per process
+    MAX_EXPLAINS = 3  # EXPLAIN captures kept per fingerprint
+
+    def __init__(self):
+        self._stats = {}
+        self._pending_explains = []
+        self._lock = threading.Lock()
+        self._thread = None
+        self._app = None
+        self.sample_rate = 0.0
+        self.slow_ms = 200.0
+
+    def init_app(self, app, engine):
+        self.sample_rate = float(app.config.get('QUERY_SAMPLE_RATE', 0) or 0)
+        self.slow_ms = float(app.config.get('SLOW_QUERY_MS', 200))
+        if self.sample_rate <= 0:
+            return
+        self._app = app
+        event.listen(engine, 'before_cursor_execute', self._before_execute)
+        event.listen(engine, 'after_cursor_execute', self._after_execute)
+        atexit.register(self._flush_at_exit)
+
+    def _before_execute(self, conn, cursor, statement, parameters, context, executemany):
+        if random.random() < self.sample_rate and not conn.info.get('query_profiler_explaining'):
+            context._query_profiler_start = time.perf_counter()
+
+    def _after_execute(self, conn, cursor, statement, parameters, context, executemany):
+        started = getattr(context, '_query_profiler_start', None)
+        if started is None:
+            return
+        self.record(statement, (time.perf_counter() - started) * 1000,
+                    parameters=None if executemany else parameters)
+        self._ensure_started()
+
+    def record(self, statement, elapsed_ms, parameters=None):
+        key = fingerprint(statement)
+        bucket = next((i for i, bound in enumerate(HISTOGRAM_BOUNDS_MS) if elapsed_ms <= bound),
+                      len(HISTOGRAM_BOUNDS_MS))
+        with self._lock:
+            stats = self._stats.get(key)
+            if stats is None:
+                if len(self._stats) >= self.MAX_FINGERPRINTS:
+                    return
+                stats = self._stats[key] = {
+                    'count': 0, 'total_ms': 0.0, 'max_ms': 0.0, 'slow': 0,
+                    'histogram': [0] * (len(HISTOGRAM_BOUNDS_MS) + 1), 'explains': []
+                }
+            stats['count'] += 1
+            stats['total_ms'] += elapsed_ms
+            stats['max_ms'] = max(stats['max_ms'], elapsed_ms)
+            stats['histogram'][bucket] += 1
+            if elapsed_ms >= self.slow_ms:
+                stats['slow'] += 1
+                if (parameters is not None and statement.lstrip()[:6].upper() == 'SELECT'
+                        and len(stats['explains']) + self._queued(key) < self.MAX_EXPLAINS):
+                    self._pending_explains.append((key, statement, parameters, elapsed_ms))
+
+    def _queued(self, key):
+        return sum(1 for pending in self._pending_explains if pending[0] == key)
+
+    def snapshot(self):
+        with self._lock:
+            return {key: dict(stats, histogram=list(stats['histogram']), explains=list(stats['explains']))
+                    for key, stats in self._stats.items()}
+
+    def _ensure_started(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._flush_loop, name='query-profiler', daemon=True)
+                self._thread.start()
+
+    def _flush_loop(self):
+        interval = self._app.config.get('QUERY_SAMPLES_FLUSH_INTERVAL', 60)
+        stop = threading.Event()
+        while not stop.wait(timeout=interval):
+            try:
+                self.flush()
+            except Exception as e:
+                logger.error(f"Query sample flush failed: {e}")
+
+    def _flush_at_exit(self):
+        try:
+            self.flush()
+        except Exception as e:
+            logger.error(f"Final query sample flush failed: {e}")
+
+    def _explain_pending(self):
+        with self._lock:
+            pending, self._pending_explains = self._pending_explains, []
+        if not pending:
+            return
+        from app import db
+        with self._app.app_context():
+            with db.engine.connect() as conn:
+                conn.info['query_profiler_explaining'] = True
+                prefix = 'EXPLAIN QUERY PLAN ' if conn.dialect.name == 'sqlite' else 'EXPLAIN '
+                for key, statement, parameters, elapsed_ms in pending:
+                    try:
+                        result = conn.exec_driver_sql(prefix + statement, parameters)
+                        plan = [dict(row._mapping) for row in result]
+                    except Exception as e:
+                        plan = [{'error': str(e)}]
+                    with self._lock:
+                        stats = self._stats.get(key)
+                        if stats is not None:
+                            stats['explains'].append({'elapsed_ms': round(elapsed_ms, 2), 'plan': plan})
+
+    def flush(self):
+        """Run queued EXPLAINs and write this process's totals to QUERY_SAMPLES_DIR"""
+        if self._app is None:
+            return
+        self._explain_pending()
+        directory = samples_dir(self._app)
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, f'samples-{os.getpid()}.json')
+        tmp_path = f'{path}.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump({'sample_rate': self.sample_rate, 'written_at': time.time(),
+                       'histogram_bounds_ms': HISTOGRAM_BOUNDS_MS,
+                       'statements': self.snapshot()}, f, default=str)
+        os.replace(tmp_path, path)
+
+def samples_dir(app):
+    return app.config.get('QUERY_SAMPLES_DIR') or os.path.join(app.instance_path, 'query_samples')
+
+def load_samples(app):
+    """Merge every process's sample file into {fingerprint: stats}, scaled by its sample rate"""
+    merged = {}
+    directory = samples_dir(app)
+    if not os.path.isdir(directory):
+        return merged
+    for name in sorted(os.listdir(directory)):
+        if not (name.startswith('samples-') and name.endswith('.json')):
+            continue
+        try:
+            with open(os.path.join(directory, name)) as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Skipping unreadable query sample file {name}: {e}")
+            continue
+        scale = 1 / data['sample_rate'] if data.get('sample_rate') else 1
+        for key, stats in data.get('statements', {}).items():
+            total = merged.setdefault(key, {'count': 0, 'total_ms': 0.0, 'max_ms': 0.0, 'slow': 0,
+                                            'estimated_calls': 0.0, 'estimated_total_ms': 0.0,
+                                            'histogram': [0] * len(stats['histogram']), 'explains': []})
+            total['count'] += stats['count']
+            total['total_ms'] += stats['total_ms']
+            total['max_ms'] = max(total['max_ms'], stats['max_ms'])
+            total['slow'] += stats['slow']
+            total['estimated_calls'] += stats['count'] * scale
+            total['estimated_total_ms'] += stats['total_ms'] * scale
+            total['histogram'] = [a + b for a, b in zip(total['histogram'], stats['histogram'])]
+            total['explains'].extend(stats['explains'])
+    return merged
+
+
+# Singleton instance
+query_profiler_service = QueryProfilerService()
@@ -0,0 +1,389 @@
+import os
+import json
+import gzip
+import math
+import time
+import atexit
+import hashlib
+import logging
+import threading
+from array import array
+from itertools import islice
+from collections import Counter
+from datetime import datetime
+import numpy as np
+from flask import current_app
+from sqlalchemy import or_
+from sqlalchemy.orm import load_only
+from app import db
+from app.models.forum import ForumPost
+from app.services.forum_search_service import tokenize
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_VERSION = 1
+
+class SimilarPostsIndex:
+    """
+    In-memory "similar questions" index.
+
+    Candidates come from MinHash-LSH buckets over title words (posts whose
+    titles share enough words land in a common bucket) plus the title
+    postings of the query's rarest words. Candidates are ranked by TF-IDF
+    cosine similarity over title and content.
+    """
+
+    NUM_HASHES = 32
+    BANDS = 16  # 2 rows per band, ~25% title overlap to become a candidate
+    MAX_TERMS = 40  # Content terms kept per post (highest frequency)
+    TITLE_WEIGHT = 2
+    MAX_GROUP = 1000  # Larger buckets/postings are only read when nothing smaller matched
+    MAX_SCORED = 200  # Candidates ranked by cosine similarity per query
+    PRIME = (1 << 31) - 1
+
+    def __init__(self):
+        rng = np.random.RandomState(20240101)
+        self._a = rng.randint(1, self.PRIME, size=self.NUM_HASHES).astype(np.uint64)
+        self._b = rng.randint(0, self.PRIME, size=self.NUM_HASHES).astype(np.uint64)
+        self.vocab = {}  # term -> id
+        self.terms = []  # id -> term
+        self.df = Counter()
+        self.docs = {}  # post_id -> (band keys, title term ids, term ids, term weights)
+        self.buckets = {}  # band key -> set of post ids
+        self.title_postings = {}  # term id -> set of post ids
+        self.max_id = 0
+
+    def _term_id(self, term):
+        term_id = self.vocab.get(term)
+        if term_id is None:
+            term_id = self.vocab[term] = len(self.terms)
+            self.terms.append(term)
+        return term_id
+
+    def _token_hash(self, token):
+        return int.from_bytes(hashlib.blake2b(token.encode(), digest_size=8).digest(), 'big') % self.PRIME
+
+    def band_keys(self, title_tokens):
+        """One bucket key per band of the MinHash signature of the title's word set"""
+        if not title_tokens:
+            return []
+        hashes = np.array([self._token_hash(t) for t in set(title_tokens)], dtype=np.uint64)
+        signature = ((self._a[:, None] * hashes[None, :] + self._b[:, None]) % self.PRIME).min(axis=1)
+        rows = self.NUM_HASHES // self.BANDS
+        return [hash((band,) + tuple(int(v) for v in signature[band * rows:(band + 1) * rows]))
+                for band in range(self.BANDS)]
+
+    def vectorize(self, title, content):
+        """Weighted term counts: title words count TITLE_WEIGHT times"""
+        counts = Counter(tokenize(content))
+        for token in tokenize(title):
+            counts[token] += self.TITLE_WEIGHT
+        return counts
+
+    def prepare(self, title, content):
+        """Tokens, band keys and top terms of a post; reads nothing the index changes"""
+        title_tokens = tokenize(title)
+        return title_tokens, self.band_keys(title_tokens), self.vectorize(title, content).most_common(self.MAX_TERMS)
+
+    def add(self, post_id, title, content):
+        self.add_prepared(post_id, self.prepare(title, content))
+
+    def add_prepared(self, post_id, prepared):
+        title_tokens, keys, top = prepared
+        self.remove(post_id)
+        self._insert(post_id, keys,
+                     sorted({self._term_id(t) for t in title_tokens}),
+                     [self._term_id(t) for t, _ in top],
+                     [float(w) for _, w in top])
+
+    def _insert(self, post_id, keys, title_ids, term_ids, weights):
+        self.docs[post_id] = (array('q', keys), array('I', title_ids), array('I', term_ids), array('f', weights))
+        for key in keys:
+            self.buckets.setdefault(key, set()).add(post_id)
+        for term_id in title_ids:
+            self.title_postings.setdefault(term_id, set()).add(post_id)
+        self.df.update(term_ids)
+        self.max_id = max(self.max_id, post_id)
+
+    def remove(self, post_id):
+        doc = self.docs.pop(post_id, None)
+        if doc is None:
+            return
+        keys, title_ids, term_ids, _ = doc
+        for key in keys:
+            bucket = self.buckets.get(key)
+            if bucket is not None:
+                bucket.discard(post_id)
+                if not bucket:
+                    del self.buckets[key]
+        for term_id in title_ids:
+            posting = self.title_postings.get(term_id)
+            if posting is not None:
+                posting.discard(post_id)
+                if not posting:
+                    del self.title_postings[term_id]
+        self.df.subtract(term_ids)
+
+    def _idf(self, term_id, n_docs):
+        return math.log((n_docs + 1) / (self.df.get(term_id, 0) + 1)) + 1
+
+    def query(self, text, limit=5, exclude_id=None):
+        """Return [(post_id, cosine similarity)] best first"""
+        n_docs = len(self.docs)
+        tokens = tokenize(text)
+        if not n_docs or not tokens:
+            return []
+
+        # Posts sharing more LSH bands have more similar titles; the title
+        # postings of the query's words add posts sharing just one rarer word
+        groups = [self.buckets.get(key, ()) for key in self.band_keys(tokens)]
+        groups += [self.title_postings.get(self.vocab[t], ()) for t in set(tokens) if t in self.vocab]
+        hits = Counter()
+        for group in sorted(groups, key=len):
+            if not group:
+                continue
+            if hits and len(group) > self.MAX_GROUP:
+                break  # Remaining groups are too common to discriminate
+            hits.update(islice(group, self.MAX_GROUP))
+        hits.pop(exclude_id, None)
+        candidates = [post_id for post_id, _ in hits.most_common(self.MAX_SCORED)]
+        if not candidates:
+            return []
+
+        query_vec = {}
+        for term, count in Counter(tokens).items():
+            term_id = self.vocab.get(term)
+            if term_id is not None:
+                query_vec[term_id] = count * self._idf(term_id, n_docs)
+        if not query_vec:
+            return []
+        query_norm = math.sqrt(sum(w * w for w in query_vec.values()))
+
+        idf_cache = {}
+        scored = []
+        for post_id in candidates:
+            _, _, term_ids, weights = self.docs[post_id]
+            dot = 0.0
+            norm = 0.0
+            for term_id, weight in zip(term_ids, weights):
+                idf = idf_cache.get(term_id)
+                if idf is None:
+                    idf = idf_cache[term_id] = self._idf(term_id, n_docs)
+                w = weight * idf
+                norm += w * w
+                q = query_vec.get(term_id)
+                if q is not None:
+                    dot += w * q
+            if dot > 0:
+                scored.append((dot / (math.sqrt(norm) * query_norm), post_id))
+
+        scored.sort(reverse=True)
+        return [(post_id, round(score, 4)) for score, post_id in scored[:limit]]
+
+    def to_snapshot(self):
+        return {
+            "version": SNAPSHOT_VERSION,
+            "max_id": self.max_id,
+            "terms": self.terms,
+            "docs": {str(post_id): [list(keys), list(title_ids), list(term_ids), list(weights)]
+                     for post_id, (keys, title_ids, term_ids, weights) in self.docs.items()}
+        }
+
+    @classmethod
+    def from_snapshot(cls, data):
+        if data.get("version") != SNAPSHOT_VERSION:
+            raise ValueError("Unsupported snapshot version")
+        index = cls()
+        index.terms = list(data["terms"])
+        index.vocab = {term: term_id for term_id, term in enumerate(index.terms)}
+        for post_id, (keys, title_ids, term_ids, weights) in data["docs"].items():
+            index._insert(int(post_id), keys, title_ids, term_ids, weights)
+        index.max_id = max(index.max_id, data.get("max_id", 0))
+        return index
+
+
+class SimilarPostsService:
+    """
+    Serves similar-question suggestions from a SimilarPostsIndex.
+
+    A background thread loads the index from a disk snapshot (or builds it
+    from the database) and swaps it in by reference; until then suggestions
+    are empty. The same thread catches up with other workers' changes every
+    SIMILAR_POSTS_SYNC_INTERVAL seconds and writes snapshots, so requests
+    only take the lock for in-memory work. Posts this worker creates, edits
+    or deletes are applied as they happen.
+    """
+
+    SYNC_BATCH = 1000  # Posts applied per lock hold while syncing
+
+    def __init__(self):
+        self._index = None
+        self._lock = threading.Lock()
+        self._thread = None
+        self._synced_at = None
+        self._saved_at = 0.0
+        self._dirty = False
+
+    def init_app(self, app):
+        """Start loading the index at startup (when SIMILAR_POSTS_BACKGROUND is on)"""
+        self._ensure_started(app)
+
+    @property
+    def ready(self):
+        return self._index is not None
+
+    def _snapshot_path(self, app):
+        return app.config.get('SIMILAR_POSTS_SNAPSHOT') or \
+            os.path.join(app.instance_path, 'similar_posts_index.json.gz')
+
+    def _ensure_started(self, app):
+        if not app.config.get('SIMILAR_POSTS_BACKGROUND', True):
+            return
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._refresh_loop, args=(app,),
+                                                name='similar-posts', daemon=True)
+                self._thread.start()
+                atexit.register(self._save_at_exit, app)
+
+    def _refresh_loop(self, app):
+        while True:
+            try:
+                with app.app_context():
+                    self.refresh(app)
+            except Exception as e:
+                logger.error(f"Similar posts index refresh failed: {e}")
+            time.sleep(app.config.get('SIMILAR_POSTS_SYNC_INTERVAL', 30))
+
+    def refresh(self, app):
+        """
+        Load or build the index on the first call, then apply changes made by
+        other workers and write a snapshot when one is due. Runs on the
+        background thread (or directly, e.g. from tests); needs an app context.
+        """
+        if self._index is None:
+            index, synced_at = self._load_snapshot(app)
+            if index is None:
+                index, synced_at = SimilarPostsIndex(), None
+            started = datetime.utcnow()
+            self._sync(index, synced_at)
+            with self._lock:
+                self._index, self._synced_at, self._dirty = index, started, True
+            self._save(app)
+            return
+
+        started = datetime.utcnow()
+        if self._sync(self._index, self._synced_at):
+            self._dirty = True
+        self._synced_at = started
+        if self._dirty and time.monotonic() - self._saved_at >= app.config.get('SIMILAR_POSTS_SNAPSHOT_INTERVAL', 300):
+            self._save(app)
+
+    def _load_snapshot(self, app):
+        path = self._snapshot_path(app)
+        if not os.path.exists(path):
+            return None, None
+        try:
+            with gzip.open(path, 'rt', encoding='utf-8') as f:
+                data = json.load(f)
+            index = SimilarPostsIndex.from_snapshot(data)
+            logger.info(f"Similar posts index loaded from snapshot with {len(index.docs)} posts")
+            return index, datetime.fromisoformat(data["synced_at"])
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable similar posts snapshot {path}: {e}")
+            return None, None
+
+    def _sync(self, index, synced_at):
+        """
+        Index posts created or edited since `synced_at` (every post when None)
+        and drop deleted ones. Queries and tokenizing run unlocked; the lock
+        is only held while a batch is applied.
+        """
+        q = db.session.query(ForumPost.id, ForumPost.title, ForumPost.content)
+        if synced_at is not None:
+            q = q.filter(or_(ForumPost.id > index.max_id, ForumPost.edited_at >= synced_at))
+        rows = iter(q.yield_per(self.SYNC_BATCH))
+        changed = 0
+        while True:
+            batch = [(post_id, index.prepare(title, content))
+                     for post_id, title, content in islice(rows, self.SYNC_BATCH)]
+            if not batch:
+                break
+            with self._lock:
+                for post_id, prepared in batch:
+                    index.add_prepared(post_id, prepared)
+            changed += len(batch)
+
+        if synced_at is not None and db.session.query(ForumPost.id).count() != len(index.docs):
+            # Deletions made by other workers; posts newer than the id list may
+            # have been added by this worker meanwhile and are kept
+            existing = {post_id for (post_id,) in db.session.query(ForumPost.id).all()}
+            newest = max(existing, default=0)
+            with self._lock:
+                gone = [post_id for post_id in index.docs if post_id not in existing and post_id <= newest]
+                for post_id in gone:
+                    index.remove(post_id)
+            changed += len(gone)
+        return changed
+
+    def _save(self, app):
+        path = self._snapshot_path(app)
+        with self._lock:
+            if not self._dirty and os.path.exists(path):
+                return
+            data = self._index.to_snapshot()
+            data["synced_at"] = self._synced_at.isoformat()
+            self._dirty = False
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = f"{path}.{os.getpid()}.tmp"
+            with gzip.open(tmp_path, 'wt', encoding='utf-8') as f:
+                json.dump(data, f, separators=(',', ':'))
+            os.replace(tmp_path, path)  # Readers never see a partial file
+            self._saved_at = time.monotonic()
+        except OSError as e:
+            self._dirty = True
+            logger.warning(f"Could not write similar posts snapshot {path}: {e}")
+
+    def _save_at_exit(self, app):
+        if self._index is not None and self._dirty:
+            self._save(app)
+
+    def index_post(self, post):
+        """Add or refresh a post after create/edit (no-op until the index is loaded)"""
+        if self._index is None:
+            return
+        prepared = self._index.prepare(post.title, post.content)
+        with self._lock:
+            self._index.add_prepared(post.id, prepared)
+            self._dirty = True
+
+    def remove_post(self, post_id):
+        if self._index is None:
+            return
+        with self._lock:
+            self._index.remove(post_id)
+            self._dirty = True
+
+    def similar(self, text, limit=5, exclude_id=None):
+        """Return [(post, score)] for the posts most similar to `text`; empty until the index is ready"""
+        index = self._index
+        if index is None:
+            self._ensure_started(current_app._get_current_object())
+            return []
+        with self._lock:
+            ranked = index.query(text, limit=limit, exclude_id=exclude_id)
+        if not ranked:
+            return []
+
+        posts = {p.id: p for p in ForumPost.query.options(load_only(
+            ForumPost.id, ForumPost.title, ForumPost.category, ForumPost.created_at,
+            ForumPost.reply_count, ForumPost.solved, ForumPost.status
+        )).filter(ForumPost.id.in_([pid for pid, _ in ranked])).all()}
+        return [(posts[post_id], score) for post_id, score in ranked if post_id in posts]
+
+
+# Singleton instance
+similar_posts_service = SimilarPostsService()
@@ -0,0 +1,236 @@
+import uuid
+import atexit
+import logging
+import threading
+from collections import Counter
+from flask import current_app
+from sqlalchemy import update, case, func
+from app import db
+from app.models.forum import ForumPost, ForumPostViewSketch
+from app.utils.hyperloglog import HyperLogLog
+from app.utils.hot_rank import refresh_hot_scores
+
+logger = logging.getLogger(__name__)
+
+# Deletes the flush lock only while it still holds this worker's token; after
+# an overrun it may already belong to another worker
+_RELEASE_LOCK = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('del', KEYS[1])
+end
+return 0
+"""
+
+class ViewCounterService:
+    """
+    Write-behind buffer for forum post view counts.
+
+    Views are counted in memory and written periodically as one batched
+    UPDATE, so reading a post never takes a row lock. With the redis backend
+    each worker pushes its buffer into a shared hash and whichever worker
+    holds the flush lock drains it, so counts from every worker are applied
+    exactly once.
+
+    Distinct viewers are tracked per post in HyperLogLog sketches that are
+    merged into forum_post_view_sketches on the same schedule. Merging is
+    idempotent, so every worker merges its own sketches directly.
+    """
+
+    PENDING_KEY = 'forum:views:pending'
+    LOCK_KEY = 'forum:views:flush-lock'
+    LOCK_TIMEOUT = 60  # seconds
+    BATCH_SIZE = 500  # Post ids per UPDATE statement
+
+    def __init__(self):
+        self._pending = Counter()
+        self._sketches = {}  # post_id -> HyperLogLog of viewers since the last flush
+        self._lock = threading.Lock()
+        self._thread = None
+        self._redis = None
+
+    def record(self, post_id, count=1, viewer=None):
+        """Count a view (and its viewer, if known); the database is updated on the next flush"""
+        with self._lock:
+            self._pending[post_id] += count
+            if viewer is not None:
+                sketch = self._sketches.get(post_id)
+                if sketch is None:
+                    sketch = self._sketches[post_id] = HyperLogLog()
+                sketch.add(viewer)
+        self._ensure_started()
+
+    def pending(self, post_id):
+        """Views recorded by this worker that are not yet in the database"""
+        with self._lock:
+            return self._pending.get(post_id, 0)
+
+    def _ensure_started(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                app = current_app._get_current_object()
+                self._redis = self._connect_redis(app)
+                self._thread = threading.Thread(target=self._flush_loop, args=(app,),
+                                                name='view-counter', daemon=True)
+                self._thread.start()
+                atexit.register(self._flush_at_exit, app)
+
+    def _connect_redis(self, app):
+        if app.config.get('VIEW_COUNTER_BACKEND', 'memory').lower() != 'redis':
+            return None
+        try:
+            import redis
+            return redis.Redis.from_url(app.config['VIEW_COUNTER_REDIS_URL'])
+        except Exception as e:
+            logger.warning(f"Shared view counter unavailable, counting per process: {e}")
+            return None
+
+    def _flush_loop(self, app):
+        interval = app.config.get('VIEW_COUNTER_FLUSH_INTERVAL', 5)
+        stop = threading.Event()
+        while not stop.wait(timeout=interval):
+            try:
+                with app.app_context():
+                    self.flush()
+            except Exception as e:
+                logger.error(f"View counter flush failed: {e}")
+
+    def _flush_at_exit(self, app):
+        try:
+            with app.app_context():
+                self.flush()
+        except Exception as e:
+            logger.error(f"Final view counter flush failed: {e}")
+
+    def _take_pending(self):
+        with self._lock:
+            counts, self._pending = self._pending, Counter()
+        return counts
+
+    def _restore_pending(self, counts):
+        with self._lock:
+            self._pending.update(counts)
+
+    def flush(self):
+        """Write buffered views to the database; returns the number of posts updated"""
+        counts = self._take_pending()
+        if self._redis is not None:
+            updated = self._flush_shared(counts)
+        else:
+            try:
+                updated = self._apply(counts)
+            except Exception:
+                self._restore_pending(counts)
+                raise
+
+        self._flush_sketches()
+        return updated
+
+    def _flush_sketches(self):
+        """Merge buffered viewer sketches into stored ones and refresh unique_views"""
+        with self._lock:
+            sketches, self._sketches = self._sketches, {}
+        if not sketches:
+            return 0
+
+        try:
+            # Skip posts deleted since they were viewed
+            ids = [post_id for (post_id,) in
+                   db.session.query(ForumPost.id).filter(ForumPost.id.in_(list(sketches))).all()]
+            stored = {row.post_id: row for row in
+                      ForumPostViewSketch.query.filter(ForumPostViewSketch.post_id.in_(ids))
+                      .with_for_update().all()}
+
+            estimates = {}
+            for post_id in ids:
+                merged = sketches[post_id]
+                row = stored.get(post_id)
+                if row is not None:
+                    merged = HyperLogLog.from_bytes(row.sketch).merge(merged)
+                    row.sketch = merged.to_bytes()
+                else:
+                    db.session.add(ForumPostViewSketch(post_id=post_id, sketch=merged.to_bytes()))
+                estimates[post_id] = merged.count()
+
+            if estimates:
+                db.session.execute(
+                    update(ForumPost)
+                    .where(ForumPost.id.in_(list(estimates)))
+                    .values(unique_views=case(estimates, value=ForumPost.id, else_=ForumPost.unique_views))
+                    .execution_options(synchronize_session=False)
+                )
+            db.session.commit()
+            return len(estimates)
+        except Exception:
+            db.session.rollback()
+            with self._lock:
+                for post_id, sketch in sketches.items():
+                    current = self._sketches.get(post_id)
+                    self._sketches[post_id] = sketch.merge(current) if current else sketch
+            raise
+
+    def _flush_shared(self, counts):
+        if counts:
+            try:
+                pipe = self._redis.pipeline()
+                for post_id, count in counts.items():
+                    pipe.hincrby(self.PENDING_KEY, post_id, count)
+                pipe.execute()
+            except Exception:
+                self._restore_pending(counts)
+                raise
+
+        # Only one worker drains the shared hash at a time
+        token = uuid.uuid4().hex
+        if not self._redis.set(self.LOCK_KEY, token, nx=True, ex=self.LOCK_TIMEOUT):
+            return 0
+        try:
+            # Renaming detaches the batch atomically; new views start a fresh hash
+            batch_key = f'{self.PENDING_KEY}:{uuid.uuid4().hex}'
+            try:
+                self._redis.rename(self.PENDING_KEY, batch_key)
+            except Exception:
+                return 0  # Nothing pending
+            shared = Counter({int(k): int(v) for k, v in self._redis.hgetall(batch_key).items()})
+            try:
+                updated = self._apply(shared)
+            except Exception:
+                # Hand the batch back so the next flush retries it
+                pipe = self._redis.pipeline()
+                for post_id, count in shared.items():
+                    pipe.hincrby(self.PENDING_KEY, post_id, count)
+                pipe.execute()
+                raise
+            finally:
+                self._redis.delete(batch_key)
+            return updated
+        finally:
+            self._redis.eval(_RELEASE_LOCK, 1, self.LOCK_KEY, token)
+
+    def _apply(self, counts):
+        """UPDATE forum_posts SET views = views + CASE id WHEN ... END, in batches"""
+        counts = {post_id: n for post_id, n in counts.items() if n}
+        if not counts:
+            return 0
+
+        ids = sorted(counts)
+        try:
+            for start in range(0, len(ids), self.BATCH_SIZE):
+                batch = {post_id: counts[post_id] for post_id in ids[start:start + self.BATCH_SIZE]}
+                db.session.execute(
+                    update(ForumPost)
+                    .where(ForumPost.id.in_(list(batch)))
+                    .values(views=func.coalesce(ForumPost.views, 0) + case(batch, value=ForumPost.id, else_=0))
+                    .execution_options(synchronize_session=False)
+                )
+                refresh_hot_scores(batch)
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
+        return len(ids)
+
+
+# Singleton instance
+view_counter_service = ViewCounterService()
@@ -0,0 +1,19 @@
+# app/utils/api_version.py
+from flask import request, jsonify
+
+V2_MEDIA_TYPE = 'application/vnd.plantcare.v2+json'
+
+def wants_v2():
+    """Compact v2 payloads are opted into with `?v=2` or an explicit Accept: V2_MEDIA_TYPE"""
+    if request.args.get('v') == '2':
+        return True
+    # Only an explicit entry counts; */* must keep getting the default shape
+    return any(value == V2_MEDIA_TYPE and quality > 0 for value, quality in request.accept_mimetypes)
+
+def versioned_jsonify(payload, v2):
+    """jsonify with the v2 media type when v2 was negotiated; the shape depends on Accept either way"""
+    response = jsonify(payload)
+    if v2:
+        response.mimetype = V2_MEDIA_TYPE
+    response.vary.add('Accept')
+    return response
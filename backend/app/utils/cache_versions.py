@@ -0,0 +1,104 @@
+# app/utils/cache_versions.py
+import uuid
+import logging
+from flask import request
+from flask_jwt_extended import get_jwt_identity
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from app import cache, db
+
+logger = logging.getLogger(__name__)
+
+# Tables whose per-user rows feed cached responses, and the resource name each bumps
+RESOURCES = {
+    'farm_ledger': 'ledger',
+    'farms': 'farms',
+    'monitored_crops': 'crops',
+    'disease_detections': 'detections',
+    'disease_scans': 'scans',
+}
+
+_PENDING = 'cache_version_bumps'  # session.info key: {(user_id, resource)} changed since the last commit
+_listeners_registered = False
+
+def _version_key(user_id, resource):
+    return f'ver:{resource}:{user_id}'
+
+def _new_version():
+    # Random rather than incrementing: a version lost to eviction or a restart
+    # can never come back as a value that older cache keys were built with
+    return uuid.uuid4().hex[:12]
+
+def current_versions(user_id, resources):
+    """Current version token of each resource for a user, creating missing ones"""
+    keys = [_version_key(user_id, resource) for resource in resources]
+    versions = cache.get_many(*keys)
+    for i, version in enumerate(versions):
+        if version is None:
+            # add() keeps whichever token another worker stored first
+            cache.add(keys[i], _new_version(), timeout=0)
+            versions[i] = cache.get(keys[i]) or _new_version()
+    return versions
+
+def bump(user_id, *resources):
+    """Invalidate every cached response built from these resources of a user"""
+    for resource in resources:
+        cache.set(_version_key(user_id, resource), _new_version(), timeout=0)
+
+def user_cache_key(*resources):
+    """
+    key_prefix for @cache.cached: path, query string, user and the current
+    version of each resource the response is built from. Writes to those
+    resources change the version, so cached entries never outlive the data
+    and TTLs can be long.
+    """
+    def make_key():
+        try:
+            uid = get_jwt_identity()
+        except Exception:
+            uid = None
+        qs = request.query_string.decode() if request.query_string else ''
+        if uid is None:
+            return f"{request.path}?uid=anon&{qs}"
+        versions = '.'.join(current_versions(uid, resources))
+        return f"{request.path}?uid={uid}&v={versions}&{qs}"
+    return make_key
+
+def _collect_changes(session, flush_context):
+    pending = session.info.setdefault(_PENDING, set())
+    for obj in list(session.new) + list(session.deleted) + \
+            [obj for obj in session.dirty if session.is_modified(obj)]:
+        resource = RESOURCES.get(getattr(obj, '__tablename__', None))
+        user_id = getattr(obj, 'user_id', None)
+        if resource and user_id is not None:
+            pending.add((str(user_id), resource))
+
+def mark_changed(user_id, resource):
+    """Bump a resource on the next commit for rows changed by a bulk statement, which flushes never see"""
+    db.session.info.setdefault(_PENDING, set()).add((str(user_id), resource))
+
+def _bump_committed(session):
+    pending = session.info.pop(_PENDING, None)
+    if not pending:
+        return
+    try:
+        for user_id, resource in pending:
+            bump(user_id, resource)
+    except Exception as e:
+        # The commit already happened; entries expire on their TTL instead
+        logger.warning(f"Cache version bump failed: {e}")
+
+def _discard_changes(session, previous_transaction):
+    # A rolled-back savepoint leaves the outer transaction's changes pending
+    if previous_transaction.parent is None:
+        session.info.pop(_PENDING, None)
+
+def register_cache_version_listeners():
+    """Bump cache versions after commits that changed rows in RESOURCES tables"""
+    global _listeners_registered
+    if _listeners_registered:
+        return
+    _listeners_registered = True
+    event.listen(Session, 'after_flush', _collect_changes)
+    event.listen(Session, 'after_commit', _bump_committed)
+    event.listen(Session, 'after_soft_rollback', _discard_changes)
@@ -0,0 +1,124 @@
+# app/utils/compression.py
+import os
+import gzip
+import logging
+from flask import request
+
+logger = logging.getLogger(__name__)
+
+try:
+    import brotli
+    BROTLI_AVAILABLE = True
+except ImportError:
+    brotli = None
+    BROTLI_AVAILABLE = False
+
+COMPRESSIBLE_MIMETYPES = {
+    'application/json', 'application/javascript', 'text/javascript', 'text/html', 'text/css',
+    'text/plain', 'text/xml', 'application/xml', 'image/svg+xml', 'application/manifest+json',
+}
+# Build outputs worth precompressing; images other than SVG are already compressed
+COMPRESSIBLE_EXTENSIONS = ('.js', '.css', '.html', '.json', '.svg', '.txt', '.map', '.xml', '.ico')
+PRECOMPRESS_MIN_SIZE = 256
+
+def encodings():
+    """Encodings this process can produce, most preferred first"""
+    return ['br', 'gzip'] if BROTLI_AVAILABLE else ['gzip']
+
+def negotiate(available):
+    """Best of `available` encodings for the current request's Accept-Encoding, or None"""
+    accepted = request.accept_encodings
+    best, best_quality = None, 0
+    for encoding in available:
+        quality = accepted[encoding]  # Explicit q-value, or the '*' entry's
+        if quality > best_quality:
+            best, best_quality = encoding, quality
+    return best
+
+def compress(data, encoding, level):
+    if encoding == 'br':
+        return brotli.compress(data, quality=level)
+    return gzip.compress(data, compresslevel=level, mtime=0)
+
+def _add_vary(response):
+    if 'accept-encoding' not in {v.lower() for v in response.vary}:
+        response.vary.add('Accept-Encoding')
+
+def init_app(app):
+    """
+    Compress buffered responses (JSON, HTML, ...) of at least
+    COMPRESS_MIN_SIZE bytes with brotli or gzip, as negotiated from
+    Accept-Encoding. Streamed and file responses are passed through
+    untouched, as are ones that already carry a Content-Encoding (such as
+    precompressed React assets).
+    """
+    if not app.config.get('COMPRESS_ENABLED', True):
+        return
+    min_size = int(app.config.get('COMPRESS_MIN_SIZE', 500))
+    levels = {'gzip': int(app.config.get('COMPRESS_GZIP_LEVEL', 6)),
+              'br': int(app.config.get('COMPRESS_BR_LEVEL', 4))}
+
+    @app.after_request
+    def compress_response(response):
+        if (response.direct_passthrough or response.is_streamed
+                or response.status_code < 200 or response.status_code in (204, 206, 304)
+                or 'Content-Encoding' in response.headers
+                or not (response.mimetype in COMPRESSIBLE_MIMETYPES or response.mimetype.endswith('+json'))
+                or request.method == 'HEAD'):
+            return response
+        data = response.get_data()
+        if len(data) < min_size:
+            return response
+
+        _add_vary(response)
+        encoding = negotiate(encodings())
+        if encoding is None:
+            return response
+        try:
+            compressed = compress(data, encoding, levels[encoding])
+        except Exception as e:
+            logger.warning(f"{encoding} compression failed for {request.path}: {e}")
+            return response
+        if len(compressed) >= len(data):
+            return response
+
+        response.set_data(compressed)  # Also updates Content-Length
+        response.headers['Content-Encoding'] = encoding
+        etag, weak = response.get_etag()
+        if etag and not weak:
+            # The bytes differ from the identity body, so the validator can only be weak
+            response.set_etag(etag, weak=True)
+        return response
+
+def precompress_directory(root, min_size=PRECOMPRESS_MIN_SIZE):
+    """
+    Write .gz (and, with brotli installed, .br) files next to every
+    compressible file under root at maximum compression, skipping variants
+    newer than their source. Returns the number of files written.
+    """
+    written = 0
+    for directory, _, files in os.walk(root):
+        for name in files:
+            if not name.endswith(COMPRESSIBLE_EXTENSIONS):
+                continue
+            path = os.path.join(directory, name)
+            if os.path.getsize(path) < min_size:
+                continue
+            with open(path, 'rb') as f:
+                data = None
+                for encoding, suffix, level in (('gzip', '.gz', 9), ('br', '.br', 11)):
+                    if encoding not in encodings():
+                        continue
+                    target = path + suffix
+                    if os.path.exists(target) and os.path.getmtime(target) >= os.path.getmtime(path):
+                        continue
+                    if data is None:
+                        data = f.read()
+                    compressed = compress(data, encoding, level)
+                    if len(compressed) >= len(data):
+                        continue
+                    with open(target + '.tmp', 'wb') as out:
+                        out.write(compressed)
+                    os.replace(target + '.tmp', target)
+                    written += 1
+    return written
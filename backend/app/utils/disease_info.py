@@ -0,0 +1,9 @@
+# app/utils/disease_info.py
+from app import cache
+from app.models.disease import DiseaseInfo
+
+@cache.memoize(timeout=3600, cache_none=True)
+def get_disease_info(name):
+    """Knowledge-base entry for a disease class as a dict, or None if unknown (cached)"""
+    info = DiseaseInfo.query.filter_by(name=name).first()
+    return info.to_dict() if info else None
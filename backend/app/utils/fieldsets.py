@@ -0,0 +1,45 @@
+# app/utils/fieldsets.py
+from functools import lru_cache
+from flask import request
+from sqlalchemy import inspect
+from sqlalchemy.orm import load_only, joinedload
+
+def requested_fields(model):
+    """
+    Keys listed in `?fields=a,b` for a SparseFieldsMixin model, in request
+    order; None when the parameter is absent or empty (all keys). Raises
+    ValueError naming unknown keys.
+    """
+    raw = request.args.get('fields', '')
+    fields = list(dict.fromkeys(f.strip() for f in raw.split(',') if f.strip()))
+    if not fields:
+        return None
+    unknown = [f for f in fields if f not in model.FIELDS]
+    if unknown:
+        raise ValueError(f"Unknown field(s): {', '.join(unknown)}. Available: {', '.join(model.FIELDS)}")
+    return fields
+
+def project(query, model, fields=None, also=()):
+    """
+    Push the fieldset down into the SELECT: load_only the columns the keys
+    read (plus `also`, e.g. pagination sort columns) and joinedload the
+    relationships they read. Relationships of other keys are never loaded.
+    Without a fieldset only the relationship loads are added; load_only
+    costs more per query than the unread columns it would skip.
+    """
+    fields = tuple(fields) if fields is not None else None
+    return query.options(*_options(model, fields, tuple(column.key for column in also)))
+
+@lru_cache(maxsize=256)
+def _options(model, fields, also):
+    mapper = inspect(model)
+    attrs = {attr for key in (model.FIELDS if fields is None else fields) for attr in model.FIELDS[key].attrs}
+    options = []
+    if fields is not None:
+        attrs |= set(also)
+        # load_only needs at least one column; the primary key is loaded regardless
+        columns = [attr for attr in sorted(attrs) if attr in mapper.column_attrs] or \
+            [mapper.get_property_by_column(mapper.primary_key[0]).key]
+        options.append(load_only(*(getattr(model, attr) for attr in columns)))
+    options += [joinedload(getattr(model, attr)) for attr in sorted(attrs) if attr in mapper.relationships]
+    return tuple(options)
@@ -0,0 +1,96 @@
+# app/utils/forum_counters.py
+from sqlalchemy import update, case, func, select, or_
+from app import db
+from app.models.forum import ForumPost, ForumReply, ForumVote
+
+def increment_reply_count(post_id, replied_at):
+    """reply_count + 1 and last_reply_at in one UPDATE; the caller commits"""
+    db.session.execute(
+        update(ForumPost)
+        .where(ForumPost.id == post_id)
+        .values(reply_count=func.coalesce(ForumPost.reply_count, 0) + 1,
+                last_reply_at=replied_at)
+        .execution_options(synchronize_session=False)
+    )
+
+def decrement_reply_count(post_id):
+    """
+    reply_count - 1 (never below zero) after a reply was deleted, with
+    last_reply_at reset to the newest remaining reply. The caller flushes
+    the delete first and commits afterwards.
+    """
+    newest = select(func.max(ForumReply.created_at))\
+        .where(ForumReply.post_id == post_id).scalar_subquery()
+    db.session.execute(
+        update(ForumPost)
+        .where(ForumPost.id == post_id)
+        .values(reply_count=case((ForumPost.reply_count > 0, ForumPost.reply_count - 1), else_=0),
+                last_reply_at=newest)
+        .execution_options(synchronize_session=False)
+    )
+
+def _post_batches(batch_size, post_ids=None):
+    """WHERE criteria covering every post one id range at a time, or just `post_ids` in chunks"""
+    if post_ids is not None:
+        ids = sorted(set(post_ids))
+        return [ForumPost.id.in_(ids[i:i + batch_size]) for i in range(0, len(ids), batch_size)]
+    first_id, last_id = db.session.query(func.min(ForumPost.id), func.max(ForumPost.id)).one()
+    if first_id is None:
+        return []
+    return [ForumPost.id.between(start, start + batch_size - 1)
+            for start in range(first_id, last_id + 1, batch_size)]
+
+def reconcile_reply_counters(batch_size=1000, post_ids=None):
+    """
+    Recount replies for every post (or only `post_ids`), one id range at a
+    time, and fix posts whose reply_count or last_reply_at drifted (e.g.
+    replies removed by account deletion). Returns the number of posts corrected.
+
+    Each range is a single UPDATE whose values come from correlated
+    subqueries, so the count is taken under the same row locks as the
+    write and a concurrent increment_reply_count() is never overwritten.
+    Run it from one place, `flask reconcile-forum-counters` in cron, not
+    from every worker.
+    """
+    count = select(func.count(ForumReply.id))\
+        .where(ForumReply.post_id == ForumPost.id).scalar_subquery()
+    newest = select(func.max(ForumReply.created_at))\
+        .where(ForumReply.post_id == ForumPost.id).scalar_subquery()
+    fixed = 0
+    for batch in _post_batches(batch_size, post_ids):
+        result = db.session.execute(
+            update(ForumPost)
+            .where(batch,
+                   or_(func.coalesce(ForumPost.reply_count, -1) != count,
+                       ForumPost.last_reply_at.is_distinct_from(newest)))
+            .values(reply_count=count, last_reply_at=newest)
+            .execution_options(synchronize_session=False)
+        )
+        db.session.commit()
+        fixed += result.rowcount
+    return fixed
+
+def reconcile_vote_counters(batch_size=1000, post_ids=None):
+    """
+    Recount upvotes and downvotes from forum_votes for every post (or only
+    `post_ids`), the same way as reconcile_reply_counters. Stored hot scores
+    are not refreshed here. Returns the number of posts corrected.
+    """
+    def votes(vote_type):
+        return select(func.count(ForumVote.id))\
+            .where(ForumVote.post_id == ForumPost.id, ForumVote.vote_type == vote_type).scalar_subquery()
+
+    upvotes, downvotes = votes('upvote'), votes('downvote')
+    fixed = 0
+    for batch in _post_batches(batch_size, post_ids):
+        result = db.session.execute(
+            update(ForumPost)
+            .where(batch,
+                   or_(func.coalesce(ForumPost.upvotes, -1) != upvotes,
+                       func.coalesce(ForumPost.downvotes, -1) != downvotes))
+            .values(upvotes=upvotes, downvotes=downvotes)
+            .execution_options(synchronize_session=False)
+        )
+        db.session.commit()
+        fixed += result.rowcount
+    return fixed
@@ -0,0 +1,72 @@
+# app/utils/forum_summary.py
+from sqlalchemy import func
+from sqlalchemy.orm import joinedload, load_only
+from app import db
+from app.models.forum import ForumPost, ForumReply
+from app.models.user import User
+
+REPLY_PREVIEW_LENGTH = 140
+
+def get_reply_stats(post_ids):
+    """
+    Reply count and latest reply (with author name) per post, in one query.
+
+    Replies are grouped per post; the newest reply id of each group is joined
+    back to read its preview and its author's display name.
+    """
+    if not post_ids:
+        return {}
+
+    grouped = db.session.query(
+        ForumReply.post_id.label('post_id'),
+        func.count(ForumReply.id).label('reply_count'),
+        func.max(ForumReply.id).label('latest_id')
+    ).filter(ForumReply.post_id.in_(post_ids)).group_by(ForumReply.post_id).subquery()
+
+    rows = db.session.query(
+        grouped.c.post_id,
+        grouped.c.reply_count,
+        ForumReply.id,
+        ForumReply.user_id,
+        ForumReply.content,
+        ForumReply.created_at,
+        User.name
+    ).join(ForumReply, ForumReply.id == grouped.c.latest_id)\
+     .outerjoin(User, User.id == ForumReply.user_id).all()
+
+    stats = {}
+    for post_id, reply_count, reply_id, user_id, content, created_at, author_name in rows:
+        preview = content or ''
+        if len(preview) > REPLY_PREVIEW_LENGTH:
+            preview = preview[:REPLY_PREVIEW_LENGTH].rstrip() + '...'
+        stats[post_id] = {
+            "reply_count": int(reply_count),
+            "latest_reply": {
+                "id": reply_id,
+                "user_id": user_id,
+                "author_name": author_name,
+                "preview": preview,
+                "created_at": created_at.isoformat() if created_at else None
+            }
+        }
+    return stats
+
+def serialize_post_summaries(posts):
+    """Serialize a page of posts for list views without embedding replies"""
+    stats = get_reply_stats([post.id for post in posts])
+    return [post.to_summary_dict(stats.get(post.id)) for post in posts]
+
+def reply_context_options(include_post=False):
+    """
+    Loader options that join each reply's author (and post title/category)
+    into the reply query itself, so serializing a page never issues extra
+    per-reply queries.
+    """
+    options = [joinedload(ForumReply.user)]
+    if include_post:
+        options.append(joinedload(ForumReply.post).load_only(ForumPost.id, ForumPost.title, ForumPost.category))
+    return options
+
+def serialize_replies(replies, include_post=False):
+    """Serialize replies loaded with `reply_context_options`"""
+    return [reply.to_context_dict(include_post=include_post) for reply in replies]
@@ -0,0 +1,45 @@
+# app/utils/histogram.py
+import math
+from sqlalchemy import case, func
+from app import db
+
+MAX_BINS = 100
+
+def as_percent(column):
+    """
+    Score as a 0-100 percentage. Older rows store fractions (0-1) and newer
+    ones percentages, so values up to 1 are scaled; a genuine score of 1% or
+    less is indistinguishable from a fraction and reads as up to 100%.
+    """
+    return case((column <= 1, column * 100), else_=column)
+
+def uniform_edges(bins, low=0.0, high=100.0):
+    """bins + 1 evenly spaced edges from low to high"""
+    step = (high - low) / bins
+    return [round(low + step * i, 6) for i in range(bins)] + [high]
+
+def histogram(model, value, edges, filters=()):
+    """
+    Count rows per bucket [edges[i], edges[i+1]) in one grouped query; the
+    last bucket includes its upper edge. Values outside the edges are not
+    counted. Returns one count per bucket, in order.
+    """
+    if len(edges) < 2 or not all(map(math.isfinite, edges)) or any(a >= b for a, b in zip(edges, edges[1:])):
+        raise ValueError("Edges must be at least two strictly increasing values")
+    if len(edges) - 1 > MAX_BINS:
+        raise ValueError(f"At most {MAX_BINS} buckets are supported")
+
+    # CASE maps each value to its bucket index; the first matching WHEN wins
+    whens = [(value < upper, index) for index, upper in enumerate(edges[1:-1])]
+    whens.append((value <= edges[-1], len(edges) - 2))
+    bucket = case(*whens).label('bucket')
+
+    rows = db.session.query(bucket, func.count()).select_from(model).filter(
+        value >= edges[0], value <= edges[-1], *filters
+    ).group_by(bucket).all()
+
+    counts = [0] * (len(edges) - 1)
+    for index, count in rows:
+        if index is not None:
+            counts[int(index)] = int(count)
+    return counts
@@ -0,0 +1,131 @@
+# app/utils/history.py
+import os
+import time
+import logging
+import threading
+from flask import current_app
+from sqlalchemy import select, delete, func, case
+from app import db
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_HISTORY_CAP = 10
+
+# Upload folders swept for orphaned files: (folder, path column)
+_sweep_targets = []
+_sweep_lock = threading.Lock()
+_sweep_event = threading.Event()
+_sweep_thread = None
+
+def get_history_cap(table_name):
+    """Return the configured per-user cap for a history table"""
+    caps = current_app.config.get('HISTORY_CAPS') or {}
+    return int(caps.get(table_name, DEFAULT_HISTORY_CAP))
+
+def trim_history(model, order_column, user_id, cap=None, tally=None, **scope):
+    """
+    Delete a user's rows beyond the newest `cap` with a single DELETE statement.
+
+    The newest row must already be flushed so it counts towards the cap.
+    Extra keyword arguments narrow the history (e.g. calculator_type='pesticide').
+    The keep-set is wrapped in a derived table so MySQL accepts a LIMIT subquery
+    on the table being deleted from, and it is resolved through the
+    (user_id, <order_column>) index.
+
+    `tally` maps names to conditions counted over the rows about to go, for
+    callers keeping counters that the bulk DELETE bypasses. The rows are
+    counted (and locked on MySQL) by one aggregate SELECT first, and the
+    DELETE is skipped when there is nothing to trim.
+
+    Returns the number of rows deleted; with `tally`, a dict of the counts
+    plus 'deleted'.
+    """
+    if cap is None:
+        cap = get_history_cap(model.__tablename__)
+
+    filters = [model.user_id == user_id]
+    filters.extend(getattr(model, column) == value for column, value in scope.items())
+
+    keep = select(model.id).where(*filters)\
+        .order_by(order_column.desc(), model.id.desc())\
+        .limit(cap).subquery('keep')
+    trimmed = [*filters, model.id.not_in(select(keep.c.id))]
+
+    counts = None
+    if tally:
+        columns = [func.count().label('deleted')]
+        columns.extend(func.coalesce(func.sum(case((condition, 1), else_=0)), 0).label(name)
+                       for name, condition in tally.items())
+        counts = {name: int(value or 0) for name, value in
+                  db.session.execute(select(*columns).where(*trimmed).with_for_update()).one()._mapping.items()}
+        if not counts['deleted']:
+            return counts
+
+    stmt = delete(model).where(*trimmed).execution_options(synchronize_session=False)
+    deleted = db.session.execute(stmt).rowcount or 0
+    if counts is None:
+        return deleted
+    counts['deleted'] = deleted
+    return counts
+
+def register_upload_folder(folder, path_column):
+    """Register an upload folder whose files are referenced by `path_column`"""
+    _sweep_targets.append((folder, path_column))
+
+def sweep_orphaned_uploads(grace_seconds=None):
+    """
+    Remove files in registered upload folders that no row references any more.
+
+    Files younger than the grace period are kept so uploads whose row has not
+    been committed yet are never removed. Must run inside an app context.
+    Returns the number of files removed.
+    """
+    if grace_seconds is None:
+        grace_seconds = current_app.config.get('UPLOAD_SWEEP_GRACE_SECONDS', 600)
+    cutoff = time.time() - grace_seconds
+    removed = 0
+
+    for folder, path_column in _sweep_targets:
+        if not os.path.isdir(folder):
+            continue
+
+        # Stored paths may or may not carry the 'app/' prefix, so compare file names
+        rows = db.session.query(path_column).filter(path_column.isnot(None)).yield_per(1000)
+        referenced = {os.path.basename(path) for (path,) in rows}
+
+        for entry in os.scandir(folder):
+            try:
+                if not entry.is_file() or entry.name in referenced:
+                    continue
+                if entry.stat().st_mtime > cutoff:
+                    continue
+                os.remove(entry.path)
+                removed += 1
+            except OSError as e:
+                logger.warning(f"Could not remove orphaned upload {entry.path}: {e}")
+
+    return removed
+
+def _sweep_loop(app):
+    interval = app.config.get('UPLOAD_SWEEP_INTERVAL', 300)
+    while True:
+        _sweep_event.wait(timeout=interval)
+        _sweep_event.clear()
+        try:
+            with app.app_context():
+                removed = sweep_orphaned_uploads()
+            if removed:
+                logger.info(f"Upload sweeper removed {removed} orphaned file(s)")
+        except Exception as e:
+            logger.error(f"Upload sweep failed: {e}")
+
+def request_upload_sweep():
+    """Wake the background sweeper, starting it on first use"""
+    global _sweep_thread
+    with _sweep_lock:
+        if _sweep_thread is None or not _sweep_thread.is_alive():
+            app = current_app._get_current_object()
+            _sweep_thread = threading.Thread(target=_sweep_loop, args=(app,),
+                                             name='upload-sweeper', daemon=True)
+            _sweep_thread.start()
+    _sweep_event.set()
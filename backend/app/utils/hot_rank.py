@@ -0,0 +1,79 @@
+# app/utils/hot_rank.py
+import math
+from datetime import datetime
+from sqlalchemy import update, case
+from app import db
+from app.models.forum import ForumPost, ForumReply, ForumVote
+
+# Engagement weights: a vote counts more than a reply, a reply more than a view
+VOTE_WEIGHT = 3
+REPLY_WEIGHT = 2
+VIEW_WEIGHT = 0.1
+
+# Seconds of age worth one order of magnitude of engagement (12.5 hours)
+DECAY_SECONDS = 45000
+EPOCH = datetime(2024, 1, 1)
+
+def hot_score(upvotes, downvotes, reply_count, views, created_at):
+    """
+    log10 of weighted engagement plus the post's creation time in decay units.
+
+    Age enters as a fixed offset from the creation time rather than as a
+    divisor of the current age, so a score never needs to be recomputed as
+    time passes: newer posts simply start higher. Scores only change when
+    engagement does.
+    """
+    engagement = (VOTE_WEIGHT * ((upvotes or 0) - (downvotes or 0))
+                  + REPLY_WEIGHT * (reply_count or 0)
+                  + VIEW_WEIGHT * (views or 0))
+    order = math.log10(max(abs(engagement), 1))
+    sign = 1 if engagement > 0 else -1 if engagement < 0 else 0
+    seconds = ((created_at or datetime.utcnow()) - EPOCH).total_seconds()
+    return round(sign * order + seconds / DECAY_SECONDS, 7)
+
+def refresh_hot_scores(post_ids):
+    """
+    Recompute stored hot scores for `post_ids` from their current counters
+    with one SELECT and one CASE UPDATE. The caller commits.
+    """
+    post_ids = list(set(post_ids))
+    if not post_ids:
+        return 0
+
+    rows = db.session.query(
+        ForumPost.id, ForumPost.upvotes, ForumPost.downvotes,
+        ForumPost.reply_count, ForumPost.views, ForumPost.created_at
+    ).filter(ForumPost.id.in_(post_ids)).all()
+    if not rows:
+        return 0
+
+    scores = {row.id: hot_score(row.upvotes, row.downvotes, row.reply_count, row.views, row.created_at)
+              for row in rows}
+    db.session.execute(
+        update(ForumPost)
+        .where(ForumPost.id.in_(list(scores)))
+        .values(hot_score=case(scores, value=ForumPost.id, else_=ForumPost.hot_score))
+        .execution_options(synchronize_session=False)
+    )
+    return len(scores)
+
+def recompute_hot_scores(since=None, batch_size=1000):
+    """
+    Rebuild stored scores, for every post or only those active since `since`
+    (created, replied to or voted on). Used after changing the weights and
+    to pick up counters changed outside the forum routes.
+    """
+    if since is None:
+        ids_query = db.session.query(ForumPost.id)
+    else:
+        ids_query = db.session.query(ForumPost.id).filter(ForumPost.created_at >= since).union(
+            db.session.query(ForumReply.post_id).filter(ForumReply.created_at >= since),
+            db.session.query(ForumVote.post_id).filter(ForumVote.created_at >= since)
+        )
+    post_ids = [post_id for (post_id,) in ids_query.all()]
+
+    updated = 0
+    for start in range(0, len(post_ids), batch_size):
+        updated += refresh_hot_scores(post_ids[start:start + batch_size])
+        db.session.commit()
+    return updated
@@ -0,0 +1,84 @@
+# app/utils/hyperloglog.py
+import math
+import zlib
+import hashlib
+
+DEFAULT_PRECISION = 12  # 4096 one-byte registers, ~1.6% standard error
+
+class HyperLogLog:
+    """
+    Cardinality sketch with a fixed 2**p registers.
+
+    Adding the same value twice has no effect, and merging is a register-wise
+    max, so sketches from several workers or flushes can be combined in any
+    order without double counting.
+    """
+
+    def __init__(self, precision=DEFAULT_PRECISION, registers=None):
+        self.p = precision
+        self.m = 1 << precision
+        self.registers = bytearray(registers) if registers is not None else bytearray(self.m)
+        if len(self.registers) != self.m:
+            raise ValueError("Register count does not match precision")
+
+    def add(self, value):
+        x = int.from_bytes(hashlib.blake2b(str(value).encode(), digest_size=8).digest(), 'big')
+        index = x >> (64 - self.p)
+        rest = x & ((1 << (64 - self.p)) - 1)
+        rank = (64 - self.p) - rest.bit_length() + 1  # Position of the leftmost 1-bit
+        if rank > self.registers[index]:
+            self.registers[index] = rank
+
+    def merge(self, other):
+        if other.p != self.p:
+            raise ValueError("Cannot merge sketches with different precision")
+        self.registers = bytearray(max(a, b) for a, b in zip(self.registers, other.registers))
+        return self
+
+    def count(self):
+        """
+        Ertl's improved estimator ("New cardinality estimation algorithms for
+        HyperLogLog sketches", 2017): unbiased from empty to 2**64 without the
+        linear-counting switch, whose hand-over near 2.5 * m overshoots by ~5%
+        """
+        m, q = self.m, 64 - self.p
+        histogram = [0] * (q + 2)
+        for r in self.registers:
+            histogram[r] += 1
+        z = m * _tau(1 - histogram[q + 1] / m)
+        for k in range(q, 0, -1):
+            z = 0.5 * (z + histogram[k])
+        z += m * _sigma(histogram[0] / m)
+        return int(round(m * m / (2 * math.log(2) * z)))
+
+    def to_bytes(self):
+        """Compressed registers; sparse sketches shrink to a few dozen bytes"""
+        return bytes([self.p]) + zlib.compress(bytes(self.registers))
+
+    @classmethod
+    def from_bytes(cls, data):
+        return cls(precision=data[0], registers=zlib.decompress(data[1:]))
+
+def _sigma(x):
+    if x == 1:
+        return math.inf
+    y, z = 1.0, x
+    while True:
+        x *= x
+        previous = z
+        z += x * y
+        y += y
+        if z == previous:
+            return z
+
+def _tau(x):
+    if x == 0 or x == 1:
+        return 0.0
+    y, z = 1.0, 1 - x
+    while True:
+        x = math.sqrt(x)
+        previous = z
+        y *= 0.5
+        z -= (1 - x) ** 2 * y
+        if z == previous:
+            return z / 3
@@ -0,0 +1,152 @@
+# app/utils/index_advisor.py
+import re
+from collections import OrderedDict
+from app import db
+
+MAX_INDEX_COLUMNS = 4
+_SQL_KEYWORDS = {'where', 'on', 'join', 'left', 'right', 'inner', 'outer', 'cross', 'group', 'order', 'limit',
+                 'set', 'using'}
+
+# A keyword after the table name is the next clause, not an alias ("FROM a JOIN b")
+_TABLE_REF = re.compile(r"\b(?:FROM|JOIN)\s+(\w+)(?:\s+(?:AS\s+)?(?!(?:%s)\b)(\w+))?" % '|'.join(sorted(_SQL_KEYWORDS)),
+                        re.IGNORECASE)
+_COLUMN_PREDICATE = re.compile(
+    r"\b(\w+)\.(\w+)\s*(=|!=|<>|>=|<=|>|<|\bIN\b|\bNOT IN\b|\bBETWEEN\b|\bLIKE\b|\bIS\b)\s*(\w+\.\w+)?",
+    re.IGNORECASE)
+_ORDER_BY = re.compile(r"\bORDER BY\s+(.+?)(?:\bLIMIT\b|\bOFFSET\b|\bFOR UPDATE\b|$)", re.IGNORECASE)
+_GROUP_BY = re.compile(r"\bGROUP BY\s+(.+?)(?:\bHAVING\b|\bORDER BY\b|\bLIMIT\b|$)", re.IGNORECASE)
+_QUALIFIED = re.compile(r"\b(\w+)\.(\w+)")
+
+def _aliases(sql):
+    aliases = {}
+    for table, alias in _TABLE_REF.findall(sql):
+        aliases[table] = table
+        if alias:
+            aliases[alias] = table
+    return aliases
+
+def _access_paths(sql):
+    """{table: {'eq': [...], 'range': [...], 'order': [...]}} for the statement's filtered/sorted columns"""
+    aliases = _aliases(sql)
+    paths = {}
+
+    def path(table):
+        return paths.setdefault(table, {'eq': [], 'range': [], 'order': []})
+
+    def add(kind, alias, column):
+        table = aliases.get(alias)
+        if table is not None and column not in path(table)[kind]:
+            path(table)[kind].append(column)
+
+    where = re.split(r"\bWHERE\b", sql, maxsplit=1, flags=re.IGNORECASE)
+    for alias, column, op, other in _COLUMN_PREDICATE.findall(sql):
+        op = op.upper()
+        if op in ('=', 'IN', 'IS'):
+            add('eq', alias, column)
+            if other:  # Join condition: the other side is an equality lookup too
+                other_alias, other_column = other.split('.', 1)
+                add('eq', other_alias, other_column)
+        elif op in ('>', '<', '>=', '<=', 'BETWEEN', 'LIKE') and len(where) > 1:
+            add('range', alias, column)
+
+    for clause in _ORDER_BY.findall(sql) + _GROUP_BY.findall(sql):
+        for alias, column in _QUALIFIED.findall(clause):
+            add('order', alias, column)
+    return paths
+
+def _existing_indexes(table):
+    """Column lists of the primary key, unique constraints and indexes declared on the model table"""
+    columns = []
+    if table.primary_key.columns:
+        columns.append([c.name for c in table.primary_key.columns])
+    for index in table.indexes:
+        columns.append([c.name for c in index.columns])
+    for constraint in table.constraints:
+        if isinstance(constraint, db.UniqueConstraint):
+            columns.append([c.name for c in constraint.columns])
+    return columns
+
+def _unique_keys(table):
+    """Column sets of the primary key, unique constraints and unique indexes"""
+    keys = [{c.name for c in table.primary_key.columns}]
+    keys += [{c.name for c in index.columns} for index in table.indexes if index.unique]
+    keys += [{c.name for c in constraint.columns} for constraint in table.constraints
+             if isinstance(constraint, db.UniqueConstraint)]
+    return [key for key in keys if key]
+
+def _covered(candidate, eq_count, existing):
+    """True when an existing index starts with the candidate's columns (equality columns in any order)"""
+    for columns in existing:
+        if len(columns) < len(candidate):
+            continue
+        if set(columns[:eq_count]) == set(candidate[:eq_count]) and columns[eq_count:len(candidate)] == candidate[eq_count:]:
+            return True
+    return False
+
+def _plan_signal(explains):
+    """'scan' if a captured plan shows a full scan or sort, 'indexed' if it does not, None without plans"""
+    if not explains:
+        return None
+    for explain in explains:
+        for row in explain.get('plan', []):
+            detail = ' '.join(str(v) for v in row.values()).upper()
+            if (str(row.get('type', '')).upper() == 'ALL' or 'FILESORT' in detail or 'TEMPORARY' in detail
+                    or detail.startswith('SCAN') or ' SCAN ' in f' {detail} ' or 'TEMP B-TREE' in detail):
+                return 'scan'
+    return 'indexed'
+
+# Share of a statement's time an index is assumed to save, by plan evidence
+SAVINGS = {'scan': 0.9, None: 0.5, 'indexed': 0.2}
+
+def advise_indexes(samples, min_calls=1):
+    """
+    Suggest composite indexes from sampled statements (see load_samples).
+
+    For each model table a statement touches, the candidate is its equality
+    columns followed by one range column, or else its ORDER/GROUP BY columns.
+    Candidates already served by a declared index are skipped. Impact is the
+    estimated time of the matching statements weighted by how likely an
+    index is to help, judged from captured EXPLAIN plans.
+    """
+    tables = db.metadata.tables
+    total_ms = sum(stats.get('estimated_total_ms', stats['total_ms']) for stats in samples.values()) or 1.0
+    suggestions = OrderedDict()
+
+    for sql, stats in samples.items():
+        if stats['count'] < min_calls or not sql.lstrip().upper().startswith(('SELECT', 'UPDATE', 'DELETE')):
+            continue
+        for table_name, access in _access_paths(sql).items():
+            table = tables.get(table_name)
+            if table is None:
+                continue
+            known = set(table.columns.keys())
+            eq = [c for c in access['eq'] if c in known]
+            tail = [c for c in (access['range'][:1] or access['order']) if c in known and c not in eq]
+            candidate = (eq + tail)[:MAX_INDEX_COLUMNS]
+            if not candidate or candidate == [c.name for c in table.primary_key.columns][:len(candidate)]:
+                continue
+            if any(key <= set(eq) for key in _unique_keys(table)):
+                continue  # Already a single-row lookup
+            if _covered(candidate, min(len(eq), len(candidate)), _existing_indexes(table)):
+                continue
+
+            signal = _plan_signal(stats.get('explains'))
+            statement_ms = stats.get('estimated_total_ms', stats['total_ms'])
+            key = (table_name, tuple(candidate))
+            suggestion = suggestions.setdefault(key, {
+                'table': table_name, 'columns': candidate, 'statements': 0,
+                'estimated_calls': 0.0, 'statement_ms': 0.0, 'estimated_savings_ms': 0.0,
+                'plan': signal, 'example': sql
+            })
+            suggestion['statements'] += 1
+            suggestion['estimated_calls'] += stats.get('estimated_calls', stats['count'])
+            suggestion['statement_ms'] += statement_ms
+            suggestion['estimated_savings_ms'] += statement_ms * SAVINGS[signal]
+            if signal == 'scan':
+                suggestion['plan'] = 'scan'
+
+    results = sorted(suggestions.values(), key=lambda s: s['estimated_savings_ms'], reverse=True)
+    for suggestion in results:
+        suggestion['share_of_sampled_time'] = round(suggestion['estimated_savings_ms'] / total_ms, 4)
+        suggestion['name'] = f"idx_{suggestion['table']}_{'_'.join(suggestion['columns'])}"[:64]
+    return results
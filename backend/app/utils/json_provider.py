@@ -0,0 +1,131 @@
+# app/utils/json_provider.py
+import logging
+from datetime import date, datetime, time, timezone
+from flask.json.provider import DefaultJSONProvider
+
+logger = logging.getLogger(__name__)
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    orjson = None
+    ORJSON_AVAILABLE = False
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# UTF-8 lead bytes of U+0080-U+00FF and of astral characters: backslashreplace
+# writes those as \xXX and \UXXXXXXXX rather than json.dumps' \uXXXX (pairs),
+# and rewriting them costs more than encoding the whole payload with json.
+# Single bytes, so each check is a memchr rather than a regex scan.
+_LATIN1_OR_ASTRAL = (b'\xc2', b'\xc3', b'\xf0', b'\xf1', b'\xf2', b'\xf3', b'\xf4')
+
+# Types that hold no float, checked by identity before the isinstance chain
+_PLAIN_TYPES = frozenset((str, int, bool, type(None), date, datetime))
+
+_DAYS = ('Mon', 'Tue', 'Wed', 'Thu', 'Fri', 'Sat', 'Sun')
+_MONTHS = ('Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun', 'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec')
+
+def _ensure_ascii(data):
+    """
+    UTF-8 JSON bytes with non-ASCII characters escaped exactly as
+    json.dumps(ensure_ascii=True) does, or None when that needs json itself
+    """
+    if not data.isascii():
+        if any(lead in data for lead in _LATIN1_OR_ASTRAL):
+            return None
+        data = data.decode('utf-8').encode('ascii', 'backslashreplace')
+    return data.replace(b'\x7f', b'\\u007f')
+
+def _float_format_differs(obj, default):
+    """
+    Whether obj holds a float orjson writes differently from json.dumps:
+    NaN and infinities (null vs NaN/Infinity) and the ones repr puts in
+    exponent form, under 1e-4 and from 1e16 up (0.00001 vs 1e-05, 1e16 vs 1e+16)
+    """
+    stack = [(obj,)]
+    while stack:
+        for value in stack.pop():
+            if type(value) in _PLAIN_TYPES:
+                continue
+            if isinstance(value, float):
+                if not (value == 0 or 1e-4 <= abs(value) < 1e16):  # NaN fails every comparison
+                    return True
+            elif isinstance(value, dict):
+                stack.append(value.values())
+            elif isinstance(value, (list, tuple)):
+                stack.append(value)
+            elif not isinstance(value, (str, int, date)):
+                stack.append((default(value),))  # Whatever orjson would serialise through default()
+    return False
+
+def _http_date(value):
+    """werkzeug's http_date (naive datetimes are UTC, dates are midnight) without going through email.utils"""
+    if not isinstance(value, datetime):
+        value = datetime.combine(value, time())
+    elif value.tzinfo is not None and value.tzinfo != timezone.utc:
+        value = value.astimezone(timezone.utc)
+    return '%s, %02d %s %04d %02d:%02d:%02d GMT' % (
+        _DAYS[value.weekday()], value.day, _MONTHS[value.month - 1], value.year,
+        value.hour, value.minute, value.second)
+
+class FastJSONProvider(DefaultJSONProvider):
+    """
+    Flask JSON provider serialising responses (jsonify) with orjson when it
+    is installed; dumps() keeps the stdlib encoder.
+
+    Output matches the default provider: sorted keys, ASCII-only escapes,
+    compact separators (indent=2 in debug), and datetimes, dates,
+    Decimals, UUIDs and dataclasses converted the way Flask does. numpy
+    scalars and arrays are converted to Python numbers and lists on both
+    paths. Anything orjson rejects (non-string keys, integers over 64
+    bits) goes through the stdlib encoder, and so does text with Latin-1
+    or astral characters, which json escapes faster than orjson's output
+    can be rewritten, and floats the two format differently: exponent
+    forms (1e-05, 1e+16) and NaN/Infinity, which orjson writes as null.
+    """
+
+    _OPTIONS = 0
+    if ORJSON_AVAILABLE:
+        # Datetimes and dataclasses go through default() so they keep Flask's formats
+        _OPTIONS = orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_PASSTHROUGH_DATACLASS
+
+    @staticmethod
+    def default(o):
+        if isinstance(o, date):
+            return _http_date(o)
+        if np is not None:
+            if isinstance(o, np.generic):
+                return o.item()
+            if isinstance(o, np.ndarray):
+                return o.tolist()
+        return DefaultJSONProvider.default(o)
+
+    def _orjson_dumps(self, obj, indent=False):
+        option = self._OPTIONS
+        if self.sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        if _float_format_differs(obj, self.default):
+            return None  # None: use the stdlib encoder
+        data = orjson.dumps(obj, default=self.default, option=option)
+        return _ensure_ascii(data) if self.ensure_ascii else data
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        indent = (self.compact is None and self._app.debug) or self.compact is False
+        if ORJSON_AVAILABLE:
+            try:
+                data = self._orjson_dumps(obj, indent=indent)
+            except TypeError:
+                data = None
+            if data is not None:
+                return self._app.response_class(data + b'\n', mimetype=self.mimetype)
+        dump_args = {'indent': 2} if indent else {'separators': (',', ':')}
+        return self._app.response_class(
+            f"{super().dumps(obj, default=self.default, **dump_args)}\n", mimetype=self.mimetype
+        )
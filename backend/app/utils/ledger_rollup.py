@@ -0,0 +1,189 @@
+# app/utils/ledger_rollup.py
+import logging
+from datetime import date, datetime
+from sqlalchemy import event, update, delete, select, inspect, func, and_, not_, extract
+from app import db
+from app.models.transaction import FarmLedger, FarmLedgerMonthly
+from app.utils.upsert import insert_ignore
+
+logger = logging.getLogger(__name__)
+
+_listeners_registered = False
+
+def _period(value):
+    """(year, month) of a transaction date (the update route may assign an ISO string)"""
+    if isinstance(value, str):
+        value = date.fromisoformat(value[:10])
+    if isinstance(value, datetime):
+        value = value.date()
+    return value.year, value.month
+
+def _key(user_id, transaction_date, transaction_type, category):
+    """Bucket for a ledger row, or None for undated rows (they belong to no month)"""
+    if transaction_date is None or user_id is None:
+        return None
+    year, month = _period(transaction_date)
+    return int(user_id), year, month, transaction_type or 'expense', category
+
+def _cents(amount):
+    """Ledger amount as applied to a DECIMAL(12,2) bucket"""
+    return round(float(amount or 0), 2)
+
+def _bucket(key):
+    user_id, year, month, transaction_type, category = key
+    return and_(FarmLedgerMonthly.user_id == user_id,
+                FarmLedgerMonthly.year == year,
+                FarmLedgerMonthly.month == month,
+                FarmLedgerMonthly.transaction_type == transaction_type,
+                FarmLedgerMonthly.category == category)
+
+def _apply(connection, key, amount, count):
+    """
+    Add amount/count to one rollup bucket on the flushing connection, creating
+    the bucket if needed. A concurrent insert of the same bucket makes the
+    INSERT a no-op, in which case the UPDATE is retried against that row.
+    """
+    if key is None:
+        return
+    table = FarmLedgerMonthly.__table__
+    increment = update(table).where(_bucket(key)).values(
+        amount=FarmLedgerMonthly.amount + amount,
+        entry_count=FarmLedgerMonthly.entry_count + count
+    )
+    if connection.execute(increment).rowcount:
+        return
+    user_id, year, month, transaction_type, category = key
+    created = connection.execute(insert_ignore(
+        FarmLedgerMonthly, user_id=user_id, year=year, month=month,
+        transaction_type=transaction_type, category=category,
+        amount=amount, entry_count=count
+    ))
+    if not created.rowcount:
+        connection.execute(increment)
+
+def _old_value(target, attr):
+    history = inspect(target).attrs[attr].history
+    if history.deleted:
+        return history.deleted[0]
+    return getattr(target, attr)
+
+def _load_old_value(target, value, oldvalue, initiator):
+    """No-op 'set' listener; registering it with active_history=True is what matters"""
+
+def register_ledger_rollup_listeners():
+    """Keep farm_ledger_monthly in step with ORM inserts, updates and deletes of FarmLedger"""
+    global _listeners_registered
+    if _listeners_registered:
+        return
+    _listeners_registered = True
+
+    # Assigning to an expired attribute (e.g. after a commit) records no old
+    # value unless it is loaded first, and the old bucket needs it
+    for attribute in (FarmLedger.user_id, FarmLedger.transaction_date, FarmLedger.transaction_type,
+                      FarmLedger.category, FarmLedger.amount):
+        event.listen(attribute, 'set', _load_old_value, active_history=True)
+
+    @event.listens_for(FarmLedger, 'after_insert')
+    def ledger_inserted(mapper, connection, target):
+        key = _key(target.user_id, target.transaction_date, target.transaction_type, target.category)
+        _apply(connection, key, _cents(target.amount), 1)
+
+    @event.listens_for(FarmLedger, 'after_update')
+    def ledger_updated(mapper, connection, target):
+        attrs = ('user_id', 'transaction_date', 'transaction_type', 'category', 'amount')
+        old = {attr: _old_value(target, attr) for attr in attrs}
+        old_key = _key(old['user_id'], old['transaction_date'], old['transaction_type'], old['category'])
+        new_key = _key(target.user_id, target.transaction_date, target.transaction_type, target.category)
+        old_amount, new_amount = _cents(old['amount']), _cents(target.amount)
+        if old_key == new_key:
+            if new_amount != old_amount:
+                _apply(connection, new_key, new_amount - old_amount, 0)
+            return
+        _apply(connection, old_key, -old_amount, -1)
+        _apply(connection, new_key, new_amount, 1)
+
+    @event.listens_for(FarmLedger, 'after_delete')
+    def ledger_deleted(mapper, connection, target):
+        key = _key(target.user_id, target.transaction_date, target.transaction_type, target.category)
+        _apply(connection, key, -_cents(target.amount), -1)
+
+def rebuild_ledger_rollups(user_id):
+    """Recompute a user's monthly buckets from farm_ledger; the caller commits"""
+    year = extract('year', FarmLedger.transaction_date)
+    month = extract('month', FarmLedger.transaction_date)
+    source = select(
+        FarmLedger.user_id, year, month,
+        func.coalesce(FarmLedger.transaction_type, 'expense'), FarmLedger.category,
+        func.sum(FarmLedger.amount), func.count(FarmLedger.id)
+    ).where(
+        FarmLedger.user_id == user_id,
+        FarmLedger.transaction_date.isnot(None)
+    ).group_by(FarmLedger.user_id, year, month,
+               func.coalesce(FarmLedger.transaction_type, 'expense'), FarmLedger.category)
+
+    db.session.execute(delete(FarmLedgerMonthly).where(FarmLedgerMonthly.user_id == user_id))
+    db.session.execute(FarmLedgerMonthly.__table__.insert().from_select(
+        ['user_id', 'year', 'month', 'transaction_type', 'category', 'amount', 'entry_count'], source
+    ))
+
+def rebuild_all_ledger_rollups(batch_size=200):
+    """Backfill or repair every user's monthly buckets; returns the number of users processed"""
+    from app.models.user import User
+
+    processed = 0
+    last_id = 0
+    while True:
+        user_ids = [uid for (uid,) in db.session.query(User.id).filter(User.id > last_id)
+                    .order_by(User.id).limit(batch_size).all()]
+        if not user_ids:
+            break
+        for user_id in user_ids:
+            rebuild_ledger_rollups(user_id)
+        db.session.commit()
+        processed += len(user_ids)
+        last_id = user_ids[-1]
+    return processed
+
+def _in_range(start=None, end=None):
+    """
+    Criteria for buckets between two inclusive (year, month) bounds, written
+    as a range on the year column so the primary key index is used.
+    """
+    criteria = [FarmLedgerMonthly.entry_count > 0]
+    if start:
+        criteria += [FarmLedgerMonthly.year >= start[0],
+                     not_(and_(FarmLedgerMonthly.year == start[0], FarmLedgerMonthly.month < start[1]))]
+    if end:
+        criteria += [FarmLedgerMonthly.year <= end[0],
+                     not_(and_(FarmLedgerMonthly.year == end[0], FarmLedgerMonthly.month > end[1]))]
+    return criteria
+
+def totals_by_type(user_id, start=None, end=None):
+    """{transaction_type: amount} over the range"""
+    rows = db.session.query(
+        FarmLedgerMonthly.transaction_type, func.sum(FarmLedgerMonthly.amount)
+    ).filter(
+        FarmLedgerMonthly.user_id == user_id, *_in_range(start, end)
+    ).group_by(FarmLedgerMonthly.transaction_type).all()
+    return {transaction_type: float(amount or 0) for transaction_type, amount in rows}
+
+def totals_by_category(user_id, transaction_type='expense', start=None, end=None):
+    """[(category, amount)] for one transaction type over the range"""
+    return db.session.query(
+        FarmLedgerMonthly.category, func.sum(FarmLedgerMonthly.amount)
+    ).filter(
+        FarmLedgerMonthly.user_id == user_id,
+        FarmLedgerMonthly.transaction_type == transaction_type,
+        *_in_range(start, end)
+    ).group_by(FarmLedgerMonthly.category).all()
+
+def totals_by_month(user_id, transaction_type='expense', start=None, end=None):
+    """{(year, month): amount} for one transaction type over the range (empty months omitted)"""
+    rows = db.session.query(
+        FarmLedgerMonthly.year, FarmLedgerMonthly.month, func.sum(FarmLedgerMonthly.amount)
+    ).filter(
+        FarmLedgerMonthly.user_id == user_id,
+        FarmLedgerMonthly.transaction_type == transaction_type,
+        *_in_range(start, end)
+    ).group_by(FarmLedgerMonthly.year, FarmLedgerMonthly.month).all()
+    return {(int(year), int(month)): float(amount or 0) for year, month, amount in rows}
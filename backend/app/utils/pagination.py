@@ -0,0 +1,119 @@
+# app/utils/pagination.py
+import json
+import base64
+from datetime import datetime, date
+from flask import request
+from sqlalchemy import and_, or_
+
+DEFAULT_PER_PAGE = 10
+MAX_PER_PAGE = 100
+
+def wants_keyset():
+    """Keyset mode is opted into with a `cursor` param (empty for the first page)"""
+    return 'cursor' in request.args
+
+def encode_cursor(values):
+    """Encode sort key values into an opaque, URL-safe cursor"""
+    raw = json.dumps([v.isoformat() if isinstance(v, (datetime, date)) else v for v in values])
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+def decode_cursor(token, columns):
+    """Decode a cursor back into values typed like `columns`; raises ValueError"""
+    try:
+        padded = token + '=' * (-len(token) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()).decode())
+    except Exception:
+        raise ValueError("Invalid cursor")
+    if not isinstance(values, list) or len(values) != len(columns):
+        raise ValueError("Invalid cursor")
+
+    decoded = []
+    for column, value in zip(columns, values):
+        if value is None:
+            decoded.append(None)
+            continue
+        python_type = column.type.python_type
+        try:
+            if python_type is datetime:
+                decoded.append(datetime.fromisoformat(value))
+            elif python_type is date:
+                decoded.append(date.fromisoformat(value))
+            else:
+                decoded.append(python_type(value))
+        except (TypeError, ValueError):
+            raise ValueError("Invalid cursor")
+    return decoded
+
+def _nullable(column):
+    return getattr(getattr(column, 'expression', column), 'nullable', True)
+
+def _after(order_column, id_column, value, last_id, descending):
+    """
+    Rows strictly after (value, last_id) in the listing order, as a range
+    on (order_column, id) so the index can seek to the cursor.
+
+    NULL sorts lowest on MySQL and SQLite, so it comes last in descending
+    order and first in ascending order. After a non-NULL value in
+    descending order the NULL rows are not included here: keyset_paginate
+    reads them with a separate query once the values run out.
+    """
+    if descending:
+        if value is None:
+            return and_(order_column.is_(None), id_column < last_id)
+        return and_(order_column <= value, or_(order_column < value, id_column < last_id))
+    if value is None:
+        return or_(order_column.isnot(None),
+                   and_(order_column.is_(None), id_column > last_id))
+    return and_(order_column >= value, or_(order_column > value, id_column > last_id))
+
+def keyset_paginate(query, order_column, id_column, descending=True, default_per_page=DEFAULT_PER_PAGE):
+    """
+    Paginate `query` by (order_column, id_column) using the request's cursor.
+
+    Unlike `paginate`, no OFFSET is used and COUNT(*) only runs when the
+    client asks for it with `include_total=true`, so deep pages cost the
+    same as the first one. Raises ValueError for a malformed cursor.
+
+    Returns (items, pagination metadata).
+    """
+    per_page = request.args.get('per_page', default_per_page, type=int) or default_per_page
+    per_page = max(1, min(per_page, MAX_PER_PAGE))
+    include_total = request.args.get('include_total', '').lower() == 'true'
+    cursor = request.args.get('cursor') or None
+
+    total = query.order_by(None).count() if include_total else None
+
+    unfiltered = query.order_by(None)
+    null_tail = False
+    if cursor:
+        value, last_id = decode_cursor(cursor, (order_column, id_column))
+        query = query.filter(_after(order_column, id_column, value, last_id, descending))
+        null_tail = descending and value is not None and _nullable(order_column)
+
+    if descending:
+        query = query.order_by(None).order_by(order_column.desc(), id_column.desc())
+    else:
+        query = query.order_by(None).order_by(order_column.asc(), id_column.asc())
+
+    # Fetch one extra row to learn whether another page exists
+    rows = query.limit(per_page + 1).all()
+    if null_tail and len(rows) <= per_page:
+        # Past the last value: continue with the NULL rows, which sort after every value
+        rows += unfiltered.filter(order_column.is_(None)).order_by(id_column.desc())\
+            .limit(per_page + 1 - len(rows)).all()
+    has_next = len(rows) > per_page
+    items = rows[:per_page]
+
+    next_cursor = None
+    if has_next and items:
+        last = items[-1]
+        next_cursor = encode_cursor([getattr(last, order_column.key), getattr(last, id_column.key)])
+
+    meta = {
+        "next_cursor": next_cursor,
+        "has_next": has_next,
+        "per_page": per_page
+    }
+    if include_total:
+        meta["total"] = total
+    return items, meta
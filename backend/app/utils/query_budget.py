@@ -0,0 +1,58 @@
+# app/utils/query_budget.py
+"""
+pytest plugin failing tests whose requests exceed a SQL query budget.
+
+tests/conftest.py registers it (`pytest_plugins`) after setting the
+environment app.config needs; mark tests that drive routes through the
+test client:
+
+    @pytest.mark.query_budget(max_queries=8, max_repeats=2)
+    def test_forum_posts(client):
+        client.get('/api/forum/posts')
+
+Every request made during the test is checked: more than `max_queries`
+statements, or one statement fingerprint run more than `max_repeats`
+times (an N+1 loop), fails the test with the offending statements. The
+app under test needs SQL_INSTRUMENTATION enabled (TestingConfig does).
+"""
+import pytest
+from app.utils.sql_instrumentation import add_observer, remove_observer
+
+DEFAULT_MAX_REPEATS = 5
+
+def pytest_configure(config):
+    config.addinivalue_line(
+        'markers',
+        'query_budget(max_queries=None, max_repeats=5): fail if a request runs more SQL statements than '
+        'max_queries or repeats one statement fingerprint more than max_repeats times'
+    )
+
+def _violations(description, stats, max_queries, max_repeats):
+    problems = []
+    if max_queries is not None and stats.count > max_queries:
+        problems.append(f"{description}: {stats.count} queries (budget {max_queries})")
+    for key, times in stats.repeated(max_repeats):
+        problems.append(f"{description}: {times}x (max {max_repeats}) {key[:300]}")
+    return problems
+
+@pytest.hookimpl(wrapper=True)
+def pytest_runtest_call(item):
+    marker = item.get_closest_marker('query_budget')
+    if marker is None:
+        return (yield)
+
+    max_queries = marker.kwargs.get('max_queries', marker.args[0] if marker.args else None)
+    max_repeats = marker.kwargs.get('max_repeats', DEFAULT_MAX_REPEATS)
+    problems = []
+
+    def check(description, stats):
+        problems.extend(_violations(description, stats, max_queries, max_repeats))
+
+    add_observer(check)
+    try:
+        result = yield
+    finally:
+        remove_observer(check)
+    if problems:
+        pytest.fail("Query budget exceeded:\n  " + "\n  ".join(problems), pytrace=False)
+    return result
@@ -1,5 +1,63 @@
 import os
-from flask import send_from_directory, Flask
+import re
+import mimetypes
+from flask import send_file, Flask
+from app.utils.compression import negotiate
+
+# Build outputs with a content hash in the name (main.3f2a91c8.js) never change
+_HASHED_ASSET = re.compile(r'\.[0-9a-f]{8,}\.(?:chunk\.)?[\w]+$')
+IMMUTABLE_MAX_AGE = 31536000  # One year
+STATIC_MAX_AGE = 3600  # Unhashed files such as manifest.json and favicon.ico
+
+def build_asset_manifest(react_build_path):
+    """
+    {url path: asset} for every file in the React build, with the
+    precompressed .gz/.br variants found next to it. Built once at startup,
+    so serving a request does no filesystem lookups beyond opening the file.
+    """
+    manifest = {}
+    for directory, _, files in os.walk(react_build_path):
+        names = set(files)
+        for name in files:
+            if name.endswith(('.gz', '.br', '.tmp')):
+                continue
+            path = os.path.join(directory, name)
+            url_path = os.path.relpath(path, react_build_path).replace(os.sep, '/')
+            stat = os.stat(path)
+            manifest[url_path] = {
+                'path': path,
+                'mimetype': mimetypes.guess_type(name)[0] or 'application/octet-stream',
+                'variants': {encoding: path + suffix for encoding, suffix in (('br', '.br'), ('gzip', '.gz'))
+                             if name + suffix in names},
+                'etag': f'{stat.st_mtime_ns:x}-{stat.st_size:x}',
+                'max_age': (IMMUTABLE_MAX_AGE if _HASHED_ASSET.search(name)
+                            else 0 if name == 'index.html' else STATIC_MAX_AGE),
+            }
+    return manifest
+
+def send_asset(asset):
+    """Send a manifest entry, using the best precompressed variant the client accepts"""
+    encoding = negotiate(list(asset['variants']))
+    path = asset['variants'][encoding] if encoding else asset['path']
+    response = send_file(path, mimetype=asset['mimetype'], conditional=True,
+                         etag=f"{asset['etag']}-{encoding}" if encoding else asset['etag'])
+    if encoding:
+        response.headers['Content-Encoding'] = encoding
+    if asset['variants']:
+        response.vary.add('Accept-Encoding')
+    if asset['max_age'] == IMMUTABLE_MAX_AGE:
+        response.headers['Cache-Control'] = f'public, max-age={IMMUTABLE_MAX_AGE}, immutable'
+    elif asset['max_age']:
+        response.headers['Cache-Control'] = f"public, max-age={asset['max_age']}"
+    else:
+        # index.html must be revalidated so new deploys pick up the new hashed bundles
+        response.headers['Cache-Control'] = 'no-cache'
+    return response
+
+def default_react_build_path():
+    # Relative to this file, assuming standard project structure
+    current_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    return os.path.join(current_dir, '..', 'frontend', 'build')
 
 def configure_react_serve(app: Flask, react_build_path=None):
     """
@@ -10,10 +68,7 @@ def configure_react_serve(app: Flask, react_build_path=None):
         app: Flask application instance
         react_build_path: Path to the React build directory (if None, will use default path)
     """
-    if not react_build_path:
-        # Default path is relative to this file, assuming standard project structure
-        current_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-        react_build_path = os.path.join(current_dir, '..', 'frontend', 'build')
+    react_build_path = react_build_path or default_react_build_path()
     
     # Normalize path
     react_build_path = os.path.normpath(os.path.abspath(react_build_path))
@@ -44,29 +99,37 @@ def configure_react_serve(app: Flask, react_build_path=None):
             """
         return
     
-    # Serve static files from React build directory
+    # Serve static files from React build directory, looked up in a startup manifest
+    # (run `flask precompress-assets` after a build to add .gz/.br variants)
+    manifest = build_asset_manifest(react_build_path)
+    index = manifest.get('index.html')
+    app.logger.info(f"Serving {len(manifest)} React build file(s) from {react_build_path}")
+
     @app.route('/', defaults={'path': ''})
     @app.route('/<path:path>')
     def serve_react(path):
         # If path is an API endpoint, let Flask handle it
         if path.startswith('api/'):
             return app.view_functions[path]()
-            
-        # Special case for the root path - serve index.html
-        if not path:
-            return send_from_directory(react_build_path, 'index.html')
-            
-        # Try to serve the file directly
-        if os.path.exists(os.path.join(react_build_path, path)):
-            return send_from_directory(react_build_path, path)
-            
-        # For all other routes, serve the index.html for client-side routing
-        return send_from_directory(react_build_path, 'index.html')
-        
+
+        asset = manifest.get(path)
+        if asset is not None:
+            return send_asset(asset)
+
+        # The root path and all other routes get index.html for client-side routing
+        if index is None:
+            return "React build is missing index.html", 404
+        return send_asset(index)
+
     # Also handle favicon specially
     @app.route('/favicon.ico')
     def favicon():
-        return send_from_directory(
-            os.path.join(react_build_path, 'favicon.ico'), 
-            'favicon.ico'
-        )
+        return serve_react('favicon.ico')
+
+    # Flask's own /static route shadows the build's static/ directory (js, css, media)
+    flask_static = app.view_functions.get('static')
+    if flask_static is not None:
+        def static(filename):
+            asset = manifest.get(f'static/{filename}')
+            return send_asset(asset) if asset is not None else flask_static(filename=filename)
+        app.view_functions['static'] = static
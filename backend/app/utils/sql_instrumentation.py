@@ -0,0 +1,118 @@
+# app/utils/sql_instrumentation.py
+import json
+import time
+import logging
+from flask import g, request, has_app_context
+from sqlalchemy import event
+from app.services.query_profiler_service import fingerprint
+
+logger = logging.getLogger(__name__)
+
+_observers = []  # Callables receiving (request description, RequestQueryStats) when a request ends
+
+class RequestQueryStats:
+    """SQL statements issued while handling one request (or inside track_queries)"""
+
+    def __init__(self):
+        self.count = 0
+        self.db_ms = 0.0
+        self.started = time.perf_counter()
+        self._statements = {}  # Raw statement -> executions; fingerprinted lazily
+
+    def add(self, statement, elapsed_ms):
+        self.count += 1
+        self.db_ms += elapsed_ms
+        self._statements[statement] = self._statements.get(statement, 0) + 1
+
+    def fingerprints(self):
+        """{fingerprint: executions}; statements differing only in literals share a fingerprint"""
+        counts = {}
+        for statement, executions in self._statements.items():
+            key = fingerprint(statement)
+            counts[key] = counts.get(key, 0) + executions
+        return counts
+
+    def repeated(self, threshold):
+        """Fingerprints executed more than `threshold` times, most repeated first"""
+        repeats = [(key, n) for key, n in self.fingerprints().items() if n > threshold]
+        return sorted(repeats, key=lambda item: item[1], reverse=True)
+
+    def summary(self, threshold):
+        return {
+            'queries': self.count,
+            'db_ms': round(self.db_ms, 2),
+            'repeated': [{'fingerprint': key, 'count': n} for key, n in self.repeated(threshold)],
+        }
+
+class track_queries:
+    """Context manager collecting the statements run inside it (outside of a request too)"""
+
+    def __enter__(self):
+        self._previous = g.get('sql_stats')
+        self.stats = g.sql_stats = RequestQueryStats()
+        return self.stats
+
+    def __exit__(self, *exc):
+        g.sql_stats = self._previous
+        return False
+
+def add_observer(callback):
+    _observers.append(callback)
+
+def remove_observer(callback):
+    if callback in _observers:
+        _observers.remove(callback)
+
+def _before_execute(conn, cursor, statement, parameters, context, executemany):
+    if has_app_context() and g.get('sql_stats') is not None:
+        context._sql_instrumentation_start = time.perf_counter()
+
+def _after_execute(conn, cursor, statement, parameters, context, executemany):
+    started = getattr(context, '_sql_instrumentation_start', None)
+    if started is None or not has_app_context():
+        return
+    stats = g.get('sql_stats')
+    if stats is not None:
+        stats.add(statement, (time.perf_counter() - started) * 1000)
+
+def init_app(app, engine):
+    """
+    Count SQL statements and DB time per request. Each response gets a
+    Server-Timing header (db time and query count, plus total app time);
+    when SQL_INSTRUMENTATION_LOG is set a JSON summary line is logged per
+    request, and fingerprints repeated more than SQL_REPEAT_THRESHOLD times
+    (the usual N+1 pattern) are logged as warnings.
+    """
+    if not app.config.get('SQL_INSTRUMENTATION', False):
+        return
+    threshold = int(app.config.get('SQL_REPEAT_THRESHOLD', 5))
+    log_requests = app.config.get('SQL_INSTRUMENTATION_LOG', False)
+
+    event.listen(engine, 'before_cursor_execute', _before_execute)
+    event.listen(engine, 'after_cursor_execute', _after_execute)
+
+    @app.before_request
+    def start_query_stats():
+        g.sql_stats = RequestQueryStats()
+
+    @app.after_request
+    def report_query_stats(response):
+        stats = g.get('sql_stats')
+        if stats is None:
+            return response
+        g.sql_stats = None
+        total_ms = (time.perf_counter() - stats.started) * 1000
+        response.headers.add('Server-Timing',
+                             f'db;dur={stats.db_ms:.2f};desc="{stats.count} queries", app;dur={total_ms:.2f}')
+
+        description = f'{request.method} {request.path}'
+        repeated = stats.repeated(threshold)
+        if repeated:
+            worst, times = repeated[0]
+            logger.warning(f"Possible N+1 in {description}: {times}x {worst[:200]}")
+        if log_requests:
+            logger.info(json.dumps(dict(stats.summary(threshold), method=request.method, path=request.path,
+                                        status=response.status_code, app_ms=round(total_ms, 2))))
+        for observer in list(_observers):
+            observer(description, stats)
+        return response
@@ -0,0 +1,316 @@
+# app/utils/tiered_cache.py
+import os
+import time
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from flask_caching.backends.base import BaseCache
+
+logger = logging.getLogger(__name__)
+
+_ENVELOPE = '__tiered__'
+
+class LocalLRU:
+    """Small thread-safe in-process LRU with per-entry expiry"""
+
+    def __init__(self, max_items):
+        self.max_items = max_items
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            item = self._items.get(key)
+            if item is None:
+                return None
+            expires_at, envelope = item
+            if expires_at <= time.time():
+                del self._items[key]
+                return None
+            self._items.move_to_end(key)
+            return envelope
+
+    def set(self, key, envelope, timeout):
+        if self.max_items <= 0 or timeout <= 0:
+            return
+        with self._lock:
+            self._items[key] = (time.time() + timeout, envelope)
+            self._items.move_to_end(key)
+            while len(self._items) > self.max_items:
+                self._items.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._items.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._items.clear()
+
+class FileLocks:
+    """
+    Per-key locks as files created with O_CREAT | O_EXCL, which either
+    creates the file or fails atomically on a local filesystem (a file
+    cache's add() checks and then writes, so two workers can both win it).
+    Each file holds its expiry time; a lock past it was abandoned and is
+    broken by the next worker that wants it.
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, key):
+        return os.path.join(self.directory, hashlib.sha256(key.encode('utf-8')).hexdigest())
+
+    def acquire(self, key, timeout):
+        path = self._path(key)
+        for _ in range(2):
+            try:
+                fd = os.open(path, os.O_CREAT | os.O_EXCL | os.O_WRONLY, 0o644)
+            except FileExistsError:
+                if not self._expired(path):
+                    return False
+                self.release(key)
+                continue
+            try:
+                os.write(fd, str(time.time() + timeout).encode())
+            finally:
+                os.close(fd)
+            return True
+        return False  # Another worker took it again after the break
+
+    @staticmethod
+    def _expired(path):
+        try:
+            with open(path) as f:
+                expires_at = f.read()
+        except FileNotFoundError:
+            return True
+        # Empty while its owner is still writing it; held until then
+        return bool(expires_at) and float(expires_at) <= time.time()
+
+    def release(self, key):
+        try:
+            os.unlink(self._path(key))
+        except FileNotFoundError:
+            pass
+
+class TieredCache(BaseCache):
+    """
+    In-process LRU in front of a shared backend (Redis, or a file cache as a
+    single-host stand-in), for use as a Flask-Caching CACHE_TYPE.
+
+    Entries carry a soft expiry and stay in the shared tier for a further
+    stale period. When an entry is missing or past its soft expiry, the
+    first worker to take the shared per-key lock gets a miss and recomputes
+    it (the following set() releases the lock). Meanwhile other workers
+    keep serving the stale value, or wait briefly for the fresh one when
+    there is none, so an expiring key is only recomputed once. has() is
+    False for a key this thread was asked to recompute, so memoize with
+    cache_none=True still calls the function for it.
+
+    The local tier holds entries for at most `local_timeout` seconds, since
+    other workers cannot invalidate it; keys starting with one of
+    `shared_only_prefixes` (e.g. cache version tokens) bypass it.
+
+    The per-key lock is the shared backend's add() (SET NX on Redis), or,
+    given a `lock_dir`, a FileLocks file there: a file cache's add() is not
+    atomic, so the file tier needs its locks kept on the filesystem.
+    """
+
+    def __init__(self, shared, default_timeout=300, local_max_items=1000, local_timeout=5,
+                 stale_timeout=60, lock_timeout=30, lock_wait=1.0, shared_only_prefixes=(), lock_dir=None):
+        super().__init__(default_timeout=default_timeout)
+        self.shared = shared
+        self.local = LocalLRU(local_max_items)
+        self.local_timeout = local_timeout
+        self.stale_timeout = stale_timeout
+        self.lock_timeout = lock_timeout
+        self.lock_wait = lock_wait
+        self.shared_only_prefixes = tuple(shared_only_prefixes)
+        self.file_locks = FileLocks(lock_dir) if lock_dir else None
+        self._stats = dict.fromkeys(('gets', 'local_hits', 'local_misses', 'shared_hits', 'shared_misses',
+                                     'stale_served', 'lock_waits', 'recomputes'), 0)
+        self._stats_lock = threading.Lock()
+        self._recomputing = threading.local()  # Keys this thread got a recompute miss for
+
+    @classmethod
+    def factory(cls, app, config, args, kwargs):
+        shared_type = config.get('CACHE_SHARED_TYPE', 'filesystem').lower()
+        lock_dir = None
+        if shared_type == 'redis':
+            from flask_caching.backends import RedisCache
+            shared = RedisCache.factory(app, config, [], dict(kwargs))
+        else:
+            from flask_caching.backends import FileSystemCache
+            if not config.get('CACHE_DIR'):
+                config['CACHE_DIR'] = os.path.join(app.instance_path, 'cache')
+            shared = FileSystemCache.factory(app, config, [], dict(kwargs))
+            # Next to the cache directory: the file cache treats anything inside it as an entry
+            lock_dir = os.path.normpath(config['CACHE_DIR']) + '.locks'
+
+        prefixes = config.get('CACHE_SHARED_ONLY_PREFIXES', 'ver:')
+        return cls(
+            shared,
+            default_timeout=kwargs.get('default_timeout', 300),
+            local_max_items=int(config.get('CACHE_LOCAL_MAX_ITEMS', 1000)),
+            local_timeout=float(config.get('CACHE_LOCAL_TIMEOUT', 5)),
+            stale_timeout=float(config.get('CACHE_STALE_TIMEOUT', 60)),
+            lock_timeout=int(config.get('CACHE_LOCK_TIMEOUT', 30)),
+            lock_wait=float(config.get('CACHE_LOCK_WAIT', 1.0)),
+            shared_only_prefixes=[p for p in prefixes.split(',') if p] if isinstance(prefixes, str) else prefixes,
+            lock_dir=lock_dir
+        )
+
+    def _count(self, name):
+        with self._stats_lock:
+            self._stats[name] += 1
+
+    def stats(self):
+        """Hit counters and per-tier hit ratios since the process started"""
+        with self._stats_lock:
+            stats = dict(self._stats)
+
+        def ratio(hits, misses):
+            total = hits + misses
+            return round(hits / total, 4) if total else None
+
+        stats['local_hit_ratio'] = ratio(stats['local_hits'], stats['local_misses'])
+        stats['shared_hit_ratio'] = ratio(stats['shared_hits'], stats['shared_misses'])
+        served = stats['local_hits'] + stats['shared_hits'] + stats['stale_served']
+        stats['overall_hit_ratio'] = ratio(served, stats['gets'] - served)
+        return stats
+
+    def _uses_local(self, key):
+        return not key.startswith(self.shared_only_prefixes)
+
+    @staticmethod
+    def _lock_key(key):
+        return f'lock:{key}'
+
+    def _held(self):
+        held = getattr(self._recomputing, 'keys', None)
+        if held is None:
+            held = self._recomputing.keys = set()
+        return held
+
+    def _start_recompute(self, key):
+        self._count('recomputes')
+        self._held().add(key)
+
+    def _try_lock(self, key):
+        try:
+            if self.file_locks is not None:
+                return self.file_locks.acquire(self._lock_key(key), self.lock_timeout)
+            return bool(self.shared.add(self._lock_key(key), 1, timeout=self.lock_timeout))
+        except Exception as e:
+            logger.warning(f"Cache lock for {key} unavailable: {e}")
+            return True  # Without a lock every worker recomputes, as with a plain cache
+
+    def _release_lock(self, key):
+        if self.file_locks is not None:
+            self.file_locks.release(self._lock_key(key))
+        else:
+            self.shared.delete(self._lock_key(key))
+
+    def _read_shared(self, key):
+        envelope = self.shared.get(key)
+        if isinstance(envelope, tuple) and len(envelope) == 3 and envelope[0] == _ENVELOPE:
+            return envelope
+        return None
+
+    def get(self, key):
+        self._count('gets')
+        self._held().discard(key)  # A recompute that never set() is abandoned
+        now = time.time()
+        use_local = self._uses_local(key)
+        if use_local:
+            envelope = self.local.get(key)
+            if envelope is not None and (envelope[2] is None or envelope[2] > now):
+                self._count('local_hits')
+                return envelope[1]
+            self._count('local_misses')
+
+        envelope = self._read_shared(key)
+        if envelope is not None:
+            _, value, fresh_until = envelope
+            if fresh_until is None or fresh_until > now:
+                self._count('shared_hits')
+                if use_local:
+                    self.local.set(key, envelope, self._local_ttl(fresh_until, now))
+                return value
+            # Stale: one worker refreshes, the rest keep serving the old value
+            if self._try_lock(key):
+                self._start_recompute(key)
+                return None
+            self._count('stale_served')
+            return value
+
+        self._count('shared_misses')
+        if self._try_lock(key):
+            self._start_recompute(key)
+            return None
+
+        # Another worker is computing this key; wait briefly for its result
+        self._count('lock_waits')
+        deadline = now + self.lock_wait
+        while time.time() < deadline:
+            time.sleep(0.025)
+            envelope = self._read_shared(key)
+            if envelope is not None:
+                return envelope[1]
+        return None
+
+    def _local_ttl(self, fresh_until, now):
+        if fresh_until is None:
+            return self.local_timeout
+        return min(self.local_timeout, fresh_until - now)
+
+    def _envelope(self, value, timeout):
+        timeout = self._normalize_timeout(timeout)
+        fresh_until = time.time() + timeout if timeout else None
+        # The shared copy outlives its soft expiry by the stale period
+        shared_timeout = timeout + int(self.stale_timeout) if timeout else 0
+        return (_ENVELOPE, value, fresh_until), shared_timeout
+
+    def set(self, key, value, timeout=None):
+        envelope, shared_timeout = self._envelope(value, timeout)
+        result = self.shared.set(key, envelope, timeout=shared_timeout)
+        if self._uses_local(key):
+            self.local.set(key, envelope, self._local_ttl(envelope[2], time.time()))
+        self._held().discard(key)
+        self._release_lock(key)
+        return result
+
+    def add(self, key, value, timeout=None):
+        envelope, shared_timeout = self._envelope(value, timeout)
+        added = self.shared.add(key, envelope, timeout=shared_timeout)
+        if added:
+            self._held().discard(key)
+            self._release_lock(key)
+        return added
+
+    def delete(self, key):
+        self.local.delete(key)
+        self._held().discard(key)
+        return self.shared.delete(key)
+
+    def has(self, key):
+        """
+        Whether get() returned a cached value: False when it asked this
+        thread to recompute the key, or when the shared entry is missing or
+        stale (memoize then recomputes rather than trusting a None).
+        """
+        if key in self._held():
+            return False
+        envelope = self._read_shared(key)
+        if envelope is None:
+            return False
+        fresh_until = envelope[2]
+        return fresh_until is None or fresh_until > time.time()
+
+    def clear(self):
+        self.local.clear()
+        return self.shared.clear()
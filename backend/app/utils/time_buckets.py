@@ -0,0 +1,135 @@
+# app/utils/time_buckets.py
+from datetime import date, datetime, time, timedelta
+from sqlalchemy import func, cast, Integer, literal
+from app import db
+
+BUCKETS = ('day', 'week', 'month', 'year')
+
+def floor_bucket(value, bucket):
+    """Start of the bucket containing `value` (weeks start on Monday)"""
+    if isinstance(value, datetime):
+        value = value.date()
+    if bucket == 'day':
+        return value
+    if bucket == 'week':
+        return value - timedelta(days=value.weekday())
+    if bucket == 'month':
+        return value.replace(day=1)
+    if bucket == 'year':
+        return value.replace(month=1, day=1)
+    raise ValueError(f"Unknown bucket '{bucket}'")
+
+def next_bucket(start, bucket):
+    """Start of the bucket after the one starting at `start`"""
+    if bucket == 'day':
+        return start + timedelta(days=1)
+    if bucket == 'week':
+        return start + timedelta(days=7)
+    if bucket == 'month':
+        return date(start.year + start.month // 12, start.month % 12 + 1, 1)
+    if bucket == 'year':
+        return date(start.year + 1, 1, 1)
+    raise ValueError(f"Unknown bucket '{bucket}'")
+
+def bucket_starts(bucket, start, end):
+    """Start of every bucket overlapping [start, end)"""
+    if not isinstance(end, datetime):
+        end = datetime.combine(end, time.min)
+    current = floor_bucket(start, bucket)
+    starts = []
+    while datetime.combine(current, time.min) < end:
+        starts.append(current)
+        current = next_bucket(current, bucket)
+    return starts
+
+def bucket_expression(column, bucket):
+    """
+    SQL expression for the 'YYYY-MM-DD' start of the bucket a timestamp falls
+    in. Only used in SELECT/GROUP BY; filtering stays on the raw column.
+    Supports MySQL, SQLite and PostgreSQL; raises ValueError elsewhere.
+    """
+    if bucket not in BUCKETS:
+        raise ValueError(f"Unknown bucket '{bucket}'")
+    dialect = db.engine.dialect.name
+    if dialect == 'mysql':
+        formats = {'day': '%Y-%m-%d', 'week': '%Y-%m-%d', 'month': '%Y-%m-01', 'year': '%Y-01-01'}
+        if bucket == 'week':
+            column = func.subdate(func.date(column), func.weekday(column))
+        return func.date_format(column, formats[bucket])
+    if dialect == 'sqlite':
+        formats = {'day': '%Y-%m-%d', 'week': '%Y-%m-%d', 'month': '%Y-%m-01', 'year': '%Y-01-01'}
+        if bucket == 'week':
+            # strftime('%w') counts from Sunday; shift so Monday is day 0
+            days_since_monday = (cast(func.strftime('%w', column), Integer) + 6) % 7
+            column = func.date(column, func.printf('-%d days', days_since_monday))
+        return func.strftime(formats[bucket], column)
+    if dialect == 'postgresql':
+        return func.to_char(func.date_trunc(literal(bucket), column), 'YYYY-MM-DD')
+    raise ValueError(f"Time buckets support mysql, sqlite and postgresql, not {dialect}")
+
+def _to_date(value):
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    return date.fromisoformat(str(value)[:10])
+
+def aggregate(model, column, bucket, start, end=None, group_by=(), measures=None, filters=(), fill=True):
+    """
+    Aggregate `model` rows with start <= column < end (no upper bound when
+    end is None) into time buckets.
+
+    bucket is one of BUCKETS, or None for a single total over the range.
+    group_by is a list of extra grouping columns and measures maps result
+    names to aggregate expressions (default: a row count). The range is
+    applied to the bare column so an index on it can be used.
+
+    Returns a list of dicts with 'period' (bucket start date, omitted when
+    bucket is None), one key per group_by column and one per measure. With
+    fill, every bucket in the range appears for each group seen, with zero
+    measures where there were no rows.
+    """
+    if bucket and fill and end is None:
+        raise ValueError("Filling buckets needs an end")
+    if measures is None:
+        measures = {'count': func.count()}
+    group_by = list(group_by)
+    group_keys = [col.key for col in group_by]
+
+    period = bucket_expression(column, bucket).label('period') if bucket else None
+    keys = ([period] if period is not None else []) + group_by
+    query = db.session.query(*keys, *(expr.label(name) for name, expr in measures.items()))\
+        .select_from(model).filter(column >= start, *filters)
+    if end is not None:
+        query = query.filter(column < end)
+    if keys:
+        query = query.group_by(*keys)
+
+    rows = []
+    for row in query.all():
+        item = {key: getattr(row, key) for key in group_keys}
+        if period is not None:
+            item['period'] = _to_date(row.period)
+        for name in measures:
+            item[name] = getattr(row, name) or 0
+        rows.append(item)
+
+    if not bucket:
+        return rows
+    if not fill:
+        return sorted(rows, key=lambda r: r['period'])
+
+    # One series per group, each covering every bucket in the range
+    found = {(tuple(r[key] for key in group_keys), r['period']): r for r in rows}
+    if group_keys:
+        groups = list(dict.fromkeys(group for group, _ in found))
+    else:
+        groups = [()]
+    filled = []
+    for group in groups:
+        for period_start in bucket_starts(bucket, start, end):
+            item = found.get((group, period_start))
+            if item is None:
+                item = dict(zip(group_keys, group), period=period_start, **{name: 0 for name in measures})
+            filled.append(item)
+    return filled
@@ -0,0 +1,22 @@
+# app/utils/upsert.py
+from sqlalchemy import insert
+from app import db
+
+def insert_ignore(model, **values):
+    """
+    INSERT that silently skips rows violating a unique key.
+
+    Uses INSERT IGNORE on MySQL and ON CONFLICT DO NOTHING on SQLite and
+    PostgreSQL; the result's rowcount is 0 when the row already existed.
+    Raises ValueError on any other database.
+    """
+    dialect = db.engine.dialect.name
+    if dialect == 'mysql':
+        return insert(model).values(**values).prefix_with('IGNORE')
+    if dialect == 'sqlite':
+        from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+        return sqlite_insert(model).values(**values).on_conflict_do_nothing()
+    if dialect == 'postgresql':
+        from sqlalchemy.dialects.postgresql import insert as pg_insert
+        return pg_insert(model).values(**values).on_conflict_do_nothing()
+    raise ValueError(f"insert_ignore supports mysql, sqlite and postgresql, not {dialect}")
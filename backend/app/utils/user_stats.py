@@ -0,0 +1,185 @@
+# app/utils/user_stats.py
+import logging
+from datetime import datetime
+from sqlalchemy import event, update, inspect, func, case, select
+from app import db
+from app.models.user_stats import UserStats
+from app.utils.upsert import insert_ignore
+
+logger = logging.getLogger(__name__)
+
+_listeners_registered = False
+
+def _ledger_totals(transaction_type, amount):
+    """(expense delta, income delta) contributed by one ledger row, in whole cents"""
+    amount = round(float(amount or 0), 2)
+    if transaction_type == 'income':
+        return 0.0, amount
+    return amount, 0.0
+
+def _adjust(connection, user_id, **deltas):
+    """
+    Apply counter deltas to a user's rollup row on the flushing connection,
+    so the change commits or rolls back with the write that caused it.
+
+    A missing row is left alone: it is built from the source tables on the
+    next read, which already includes this write.
+    """
+    deltas = {k: v for k, v in deltas.items() if v}
+    if user_id is None or not deltas:
+        return
+    values = {column: getattr(UserStats, column) + delta for column, delta in deltas.items()}
+    values['updated_at'] = datetime.utcnow()
+    connection.execute(
+        update(UserStats.__table__).where(UserStats.user_id == int(user_id)).values(**values)
+    )
+
+def adjust_user_stats(user_id, **deltas):
+    """Counter deltas for rows removed by a bulk DELETE, which skips the ORM events; the caller commits"""
+    _adjust(db.session.connection(), user_id, **deltas)
+
+def _old_value(target, attr):
+    """Value of `attr` before the pending change (current value if unchanged)"""
+    history = inspect(target).attrs[attr].history
+    if history.deleted:
+        return history.deleted[0]
+    return getattr(target, attr)
+
+def _load_old_value(target, value, oldvalue, initiator):
+    """No-op 'set' listener; registering it with active_history=True is what matters"""
+
+def register_user_stats_listeners():
+    """Keep user_stats in step with ORM inserts, updates and deletes of the source models"""
+    global _listeners_registered
+    if _listeners_registered:
+        return
+    _listeners_registered = True
+
+    from app.models.farm import Farm
+    from app.models.monitored_crop import MonitoredCrop
+    from app.models.disease import DiseaseDetection
+    from app.models.disease_scan import DiseaseScan
+    from app.models.transaction import FarmLedger
+
+    # Assigning to an expired attribute (e.g. after a commit) records no old
+    # value unless it is loaded first, and the update listeners need it
+    for attribute in (DiseaseScan.is_confident, FarmLedger.amount, FarmLedger.transaction_type):
+        event.listen(attribute, 'set', _load_old_value, active_history=True)
+
+    # Simple row counters
+    for model, column in ((Farm, 'farm_count'),
+                          (MonitoredCrop, 'monitored_crop_count'),
+                          (DiseaseDetection, 'detection_count')):
+        def on_insert(mapper, connection, target, column=column):
+            _adjust(connection, target.user_id, **{column: 1})
+
+        def on_delete(mapper, connection, target, column=column):
+            _adjust(connection, target.user_id, **{column: -1})
+
+        event.listen(model, 'after_insert', on_insert)
+        event.listen(model, 'after_delete', on_delete)
+
+    @event.listens_for(DiseaseScan, 'after_insert')
+    def scan_inserted(mapper, connection, target):
+        _adjust(connection, target.user_id, scan_count=1,
+                high_confidence_scan_count=1 if target.is_confident else 0)
+
+    @event.listens_for(DiseaseScan, 'after_update')
+    def scan_updated(mapper, connection, target):
+        was_confident = bool(_old_value(target, 'is_confident'))
+        if was_confident != bool(target.is_confident):
+            _adjust(connection, target.user_id, high_confidence_scan_count=1 if target.is_confident else -1)
+
+    @event.listens_for(DiseaseScan, 'after_delete')
+    def scan_deleted(mapper, connection, target):
+        _adjust(connection, target.user_id, scan_count=-1,
+                high_confidence_scan_count=-1 if target.is_confident else 0)
+
+    @event.listens_for(FarmLedger, 'after_insert')
+    def ledger_inserted(mapper, connection, target):
+        expense, income = _ledger_totals(target.transaction_type, target.amount)
+        _adjust(connection, target.user_id, total_expenses=expense, total_income=income)
+
+    @event.listens_for(FarmLedger, 'after_update')
+    def ledger_updated(mapper, connection, target):
+        old_expense, old_income = _ledger_totals(_old_value(target, 'transaction_type'),
+                                                 _old_value(target, 'amount'))
+        expense, income = _ledger_totals(target.transaction_type, target.amount)
+        _adjust(connection, target.user_id,
+                total_expenses=expense - old_expense, total_income=income - old_income)
+
+    @event.listens_for(FarmLedger, 'after_delete')
+    def ledger_deleted(mapper, connection, target):
+        expense, income = _ledger_totals(target.transaction_type, target.amount)
+        _adjust(connection, target.user_id, total_expenses=-expense, total_income=-income)
+
+def compute_user_stats(user_id):
+    """Recompute every rollup value for a user from the source tables"""
+    from app.models.farm import Farm
+    from app.models.monitored_crop import MonitoredCrop
+    from app.models.disease import DiseaseDetection
+    from app.models.disease_scan import DiseaseScan
+    from app.models.transaction import FarmLedger
+
+    def count(model, *criteria):
+        return select(func.count()).select_from(model).where(model.user_id == user_id, *criteria).scalar_subquery()
+
+    is_income = FarmLedger.transaction_type == 'income'
+    ledger = db.session.query(
+        func.coalesce(func.sum(case((is_income, 0), else_=FarmLedger.amount)), 0),
+        func.coalesce(func.sum(case((is_income, FarmLedger.amount), else_=0)), 0)
+    ).filter(FarmLedger.user_id == user_id)
+
+    counts = db.session.query(
+        count(Farm), count(MonitoredCrop), count(DiseaseDetection),
+        count(DiseaseScan), count(DiseaseScan, DiseaseScan.is_confident.is_(True))
+    ).one()
+    total_expenses, total_income = ledger.one()
+
+    return {
+        "farm_count": counts[0],
+        "monitored_crop_count": counts[1],
+        "detection_count": counts[2],
+        "scan_count": counts[3],
+        "high_confidence_scan_count": counts[4],
+        "total_expenses": float(total_expenses or 0),
+        "total_income": float(total_income or 0)
+    }
+
+def rebuild_user_stats(user_id):
+    """Overwrite (or create) a user's rollup row from the source tables; the caller commits"""
+    values = compute_user_stats(user_id)
+    stats = db.session.get(UserStats, user_id)
+    if stats is None:
+        db.session.execute(insert_ignore(UserStats, user_id=user_id, updated_at=datetime.utcnow(), **values))
+        stats = db.session.get(UserStats, user_id)
+    for column, value in values.items():
+        setattr(stats, column, value)
+    return stats
+
+def get_user_stats(user_id):
+    """The user's rollup row by primary key, built on first access"""
+    user_id = int(user_id)
+    stats = db.session.get(UserStats, user_id)
+    if stats is None:
+        stats = rebuild_user_stats(user_id)
+        db.session.commit()
+    return stats
+
+def rebuild_all_user_stats(batch_size=200):
+    """Backfill or repair every user's rollup row; returns the number of users processed"""
+    from app.models.user import User
+
+    processed = 0
+    last_id = 0
+    while True:
+        user_ids = [uid for (uid,) in db.session.query(User.id).filter(User.id > last_id)
+                    .order_by(User.id).limit(batch_size).all()]
+        if not user_ids:
+            break
+        for user_id in user_ids:
+            rebuild_user_stats(user_id)
+        db.session.commit()
+        processed += len(user_ids)
+        last_id = user_ids[-1]
+    return processed
@@ -10,7 +10,7 @@
 ║                                                                              ║
 ║  What it does:                                                               ║
 ║  ✅ Creates plantcare_db database with UTF8MB4 encoding                     ║
-║  ✅ Creates all 17 required tables in correct dependency order              ║
+║  ✅ Creates all required tables in correct dependency order                 ║
 ║  ✅ Sets up all 18 foreign key relationships                                ║
 ║  ✅ Adds performance indexes                                                ║
 ║  ✅ Configures cascade delete rules                                         ║
@@ -142,7 +142,7 @@ def create_database(credentials):
         return False
 
 def create_tables(credentials):
-    """Create all 17 tables for PlantCare application."""
+    """Create all tables for PlantCare application."""
     try:
         connection = mysql.connector.connect(
             host=credentials['host'],
@@ -296,7 +296,9 @@ def create_tables(credentials):
                     details JSON,
                     FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE,
                     INDEX idx_user_id (user_id),
-                    INDEX idx_detected_at (detected_at)
+                    INDEX idx_detected_at (detected_at),
+                    INDEX idx_disease_detections_user_date (user_id, detected_at),
+                    INDEX idx_disease_detections_user_disease (user_id, predicted_disease)
                 ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci
                 """,
                 
@@ -324,6 +326,7 @@ def create_tables(credentials):
                     error_message TEXT,
                     FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE,
                     INDEX idx_user_id (user_id),
+                    INDEX idx_user_id_timestamp (user_id, scan_timestamp),
                     INDEX idx_scan_timestamp (scan_timestamp),
                     INDEX idx_status (status)
                 ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci
@@ -341,19 +344,26 @@ def create_tables(credentials):
                     created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
                     status VARCHAR(32) DEFAULT 'open',
                     views INT DEFAULT 0,
+                    unique_views INT DEFAULT 0,
                     is_flagged BOOLEAN DEFAULT FALSE,
                     flagged_reason VARCHAR(200),
                     reply_count INT DEFAULT 0,
+                    last_reply_at DATETIME,
                     solved BOOLEAN DEFAULT FALSE,
                     upvotes INT DEFAULT 0,
                     downvotes INT DEFAULT 0,
                     edited_at DATETIME,
                     edit_count INT DEFAULT 0,
+                    hot_score DOUBLE DEFAULT 0,
                     FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE,
                     INDEX idx_user_id (user_id),
                     INDEX idx_category (category),
+                    INDEX idx_forum_posts_hot (hot_score, id),
+                    INDEX idx_forum_posts_last_reply (last_reply_at, id),
+                    INDEX idx_forum_posts_category_created (category, created_at),
                     INDEX idx_created_at (created_at),
-                    INDEX idx_status (status)
+                    INDEX idx_status (status),
+                    FULLTEXT INDEX ft_forum_posts_title_content (title, content)
                 ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci
                 """,
                 
@@ -376,7 +386,8 @@ def create_tables(credentials):
                     FOREIGN KEY (post_id) REFERENCES forum_posts(id) ON DELETE CASCADE,
                     INDEX idx_user_id (user_id),
                     INDEX idx_post_id (post_id),
-                    INDEX idx_created_at (created_at)
+                    INDEX idx_created_at (created_at),
+                    INDEX idx_forum_replies_post_created (post_id, created_at)
                 ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci
                 """,
                 
@@ -409,7 +420,9 @@ def create_tables(credentials):
                     FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE,
                     INDEX idx_user_id (user_id),
                     INDEX idx_transaction_type (transaction_type),
-                    INDEX idx_transaction_date (transaction_date)
+                    INDEX idx_transaction_date (transaction_date),
+                    INDEX idx_farm_ledger_type_date (user_id, transaction_type, transaction_date),
+                    INDEX idx_farm_ledger_user_date (user_id, transaction_date)
                 ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci
                 """,
                 
@@ -425,6 +438,7 @@ def create_tables(credentials):
                     created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
                     FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE,
                     INDEX idx_user_id (user_id),
+                    INDEX idx_calculator_results_user_created (user_id, created_at),
                     INDEX idx_calculator_type (calculator_type),
                     INDEX idx_created_at (created_at)
                 ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci
@@ -464,7 +478,8 @@ def create_tables(credentials):
                     FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE SET NULL,
                     INDEX idx_user_id (user_id),
                     INDEX idx_predicted_crop (predicted_crop),
-                    INDEX idx_created_at (created_at)
+                    INDEX idx_created_at (created_at),
+                    INDEX idx_crop_recommendations_user_created (user_id, created_at)
                 ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci
                 """,
                 
@@ -485,7 +500,67 @@ def create_tables(credentials):
                     FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE SET NULL,
                     INDEX idx_user_id (user_id),
                     INDEX idx_crop (crop),
-                    INDEX idx_created_at (created_at)
+                    INDEX idx_created_at (created_at),
+                    INDEX idx_crop_yield_predictions_user_created (user_id, created_at)
+                ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci
+                """,
+                
+                # 18. Account deletion jobs - no FK, outlives the deleted user
+                'account_deletion_jobs': """
+                CREATE TABLE IF NOT EXISTS account_deletion_jobs (
+                    id VARCHAR(32) PRIMARY KEY,
+                    user_id INT NOT NULL,
+                    status ENUM('pending', 'running', 'completed', 'failed') NOT NULL DEFAULT 'pending',
+                    current_step VARCHAR(64),
+                    steps_done INT DEFAULT 0,
+                    steps_total INT DEFAULT 0,
+                    deleted_rows JSON,
+                    error_message TEXT,
+                    created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+                    updated_at DATETIME DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+                    finished_at DATETIME,
+                    INDEX idx_user_id (user_id)
+                ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci
+                """,
+                
+                # 19. Forum post view sketches - depends on forum_posts
+                'forum_post_view_sketches': """
+                CREATE TABLE IF NOT EXISTS forum_post_view_sketches (
+                    post_id INT PRIMARY KEY,
+                    sketch BLOB NOT NULL,
+                    updated_at DATETIME DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+                    FOREIGN KEY (post_id) REFERENCES forum_posts(id) ON DELETE CASCADE
+                ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci
+                """,
+                
+                # 20. Per-user dashboard rollup - depends on users
+                'user_stats': """
+                CREATE TABLE IF NOT EXISTS user_stats (
+                    user_id INT PRIMARY KEY,
+                    farm_count INT NOT NULL DEFAULT 0,
+                    monitored_crop_count INT NOT NULL DEFAULT 0,
+                    detection_count INT NOT NULL DEFAULT 0,
+                    scan_count INT NOT NULL DEFAULT 0,
+                    high_confidence_scan_count INT NOT NULL DEFAULT 0,
+                    total_expenses DECIMAL(12,2) NOT NULL DEFAULT 0,
+                    total_income DECIMAL(12,2) NOT NULL DEFAULT 0,
+                    updated_at DATETIME DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+                    FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE
+                ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci
+                """,
+                
+                # 21. Monthly ledger rollup - depends on users
+                'farm_ledger_monthly': """
+                CREATE TABLE IF NOT EXISTS farm_ledger_monthly (
+                    user_id INT NOT NULL,
+                    year SMALLINT NOT NULL,
+                    month SMALLINT NOT NULL,
+                    transaction_type VARCHAR(16) NOT NULL,
+                    category VARCHAR(64) NOT NULL,
+                    amount DECIMAL(12,2) NOT NULL DEFAULT 0,
+                    entry_count INT NOT NULL DEFAULT 0,
+                    PRIMARY KEY (user_id, year, month, transaction_type, category),
+                    FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE
                 ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci
                 """
             }
@@ -499,13 +574,13 @@ def create_tables(credentials):
                 try:
                     cursor.execute(create_query)
                     table_count += 1
-                    print_success(f"Table {table_count}/17: {table_name}")
+                    print_success(f"Table {table_count}/{len(tables)}: {table_name}")
                 except Error as e:
                     print_error(f"Error creating table '{table_name}': {e}")
                     continue
             
             print("=" * 60)
-            print_success(f"Successfully created {table_count}/17 tables")
+            print_success(f"Successfully created {table_count}/{len(tables)} tables")
             
             # Verify tables
             cursor.execute("SHOW TABLES")
@@ -0,0 +1,26 @@
+"""Add indexes for per-user history caps
+
+Revision ID: 7c1d2e9a4b60
+Revises: e55657b9e9d1
+Create Date: 2026-10-19 10:12:31.482310
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '7c1d2e9a4b60'
+down_revision = 'e55657b9e9d1'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('calculator_results', schema=None) as batch_op:
+        batch_op.create_index('idx_calculator_results_user_created', ['user_id', 'created_at'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('calculator_results', schema=None) as batch_op:
+        batch_op.drop_index('idx_calculator_results_user_created')
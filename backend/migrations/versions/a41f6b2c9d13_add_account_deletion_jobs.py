@@ -0,0 +1,42 @@
+"""Add account deletion jobs
+
+Revision ID: a41f6b2c9d13
+Revises: 7c1d2e9a4b60
+Create Date: 2026-10-19 11:03:47.210894
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a41f6b2c9d13'
+down_revision = '7c1d2e9a4b60'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('account_deletion_jobs',
+    sa.Column('id', sa.String(length=32), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('status', sa.Enum('pending', 'running', 'completed', 'failed', name='deletion_status'), nullable=False),
+    sa.Column('current_step', sa.String(length=64), nullable=True),
+    sa.Column('steps_done', sa.Integer(), nullable=True),
+    sa.Column('steps_total', sa.Integer(), nullable=True),
+    sa.Column('deleted_rows', sa.JSON(), nullable=True),
+    sa.Column('error_message', sa.Text(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.Column('finished_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('account_deletion_jobs', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_account_deletion_jobs_user_id'), ['user_id'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('account_deletion_jobs', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_account_deletion_jobs_user_id'))
+
+    op.drop_table('account_deletion_jobs')
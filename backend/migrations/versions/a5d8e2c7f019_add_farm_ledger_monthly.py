@@ -0,0 +1,51 @@
+"""Add farm_ledger_monthly rollup table
+
+Revision ID: a5d8e2c7f019
+Revises: f3c9d1a7e285
+Create Date: 2026-10-19 17:42:11.318406
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a5d8e2c7f019'
+down_revision = 'f3c9d1a7e285'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    rollup = op.create_table('farm_ledger_monthly',
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('year', sa.SmallInteger(), autoincrement=False, nullable=False),
+    sa.Column('month', sa.SmallInteger(), autoincrement=False, nullable=False),
+    sa.Column('transaction_type', sa.String(length=16), nullable=False),
+    sa.Column('category', sa.String(length=64), nullable=False),
+    sa.Column('amount', sa.Numeric(precision=12, scale=2), nullable=False),
+    sa.Column('entry_count', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('user_id', 'year', 'month', 'transaction_type', 'category')
+    )
+
+    # Backfill from the ledger; later writes keep it current
+    ledger = sa.table('farm_ledger',
+                      sa.column('id', sa.Integer), sa.column('user_id', sa.Integer),
+                      sa.column('amount', sa.Float), sa.column('category', sa.String),
+                      sa.column('transaction_type', sa.String), sa.column('transaction_date', sa.Date))
+    year = sa.extract('year', ledger.c.transaction_date)
+    month = sa.extract('month', ledger.c.transaction_date)
+    transaction_type = sa.func.coalesce(ledger.c.transaction_type, 'expense')
+    source = sa.select(
+        ledger.c.user_id, year, month, transaction_type, ledger.c.category,
+        sa.func.sum(ledger.c.amount), sa.func.count(ledger.c.id)
+    ).where(ledger.c.transaction_date.isnot(None))\
+     .group_by(ledger.c.user_id, year, month, transaction_type, ledger.c.category)
+    op.execute(rollup.insert().from_select(
+        ['user_id', 'year', 'month', 'transaction_type', 'category', 'amount', 'entry_count'], source
+    ))
+
+
+def downgrade():
+    op.drop_table('farm_ledger_monthly')
@@ -0,0 +1,38 @@
+"""Add composite indexes for per-user and per-thread access paths
+
+Revision ID: b6f4c1e8d327
+Revises: a5d8e2c7f019
+Create Date: 2026-10-19 18:55:02.640913
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = 'b6f4c1e8d327'
+down_revision = 'a5d8e2c7f019'
+branch_labels = None
+depends_on = None
+
+INDEXES = [
+    ('farm_ledger', 'idx_farm_ledger_type_date', ['user_id', 'transaction_type', 'transaction_date']),
+    ('farm_ledger', 'idx_farm_ledger_user_date', ['user_id', 'transaction_date']),
+    ('disease_detections', 'idx_disease_detections_user_date', ['user_id', 'detected_at']),
+    ('disease_detections', 'idx_disease_detections_user_disease', ['user_id', 'predicted_disease']),
+    ('forum_posts', 'idx_forum_posts_category_created', ['category', 'created_at']),
+    ('forum_replies', 'idx_forum_replies_post_created', ['post_id', 'created_at']),
+    ('crop_recommendations', 'idx_crop_recommendations_user_created', ['user_id', 'created_at']),
+    ('crop_yield_predictions', 'idx_crop_yield_predictions_user_created', ['user_id', 'created_at']),
+]
+
+
+def upgrade():
+    for table, name, columns in INDEXES:
+        with op.batch_alter_table(table, schema=None) as batch_op:
+            batch_op.create_index(name, columns, unique=False)
+
+
+def downgrade():
+    for table, name, columns in reversed(INDEXES):
+        with op.batch_alter_table(table, schema=None) as batch_op:
+            batch_op.drop_index(name)
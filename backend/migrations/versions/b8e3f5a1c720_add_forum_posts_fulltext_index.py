@@ -0,0 +1,32 @@
+"""Add FULLTEXT index for forum post search
+
+Revision ID: b8e3f5a1c720
+Revises: a41f6b2c9d13
+Create Date: 2026-10-19 13:05:47.216904
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b8e3f5a1c720'
+down_revision = 'a41f6b2c9d13'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # FULLTEXT is MySQL-only; other databases use the in-process search index
+    if op.get_bind().dialect.name != 'mysql':
+        return
+    with op.batch_alter_table('forum_posts', schema=None) as batch_op:
+        batch_op.create_index('ft_forum_posts_title_content', ['title', 'content'], unique=False,
+                              mysql_prefix='FULLTEXT')
+
+
+def downgrade():
+    if op.get_bind().dialect.name != 'mysql':
+        return
+    with op.batch_alter_table('forum_posts', schema=None) as batch_op:
+        batch_op.drop_index('ft_forum_posts_title_content')
@@ -0,0 +1,36 @@
+"""Add unique view estimates for forum posts
+
+Revision ID: c2d7a9e4f318
+Revises: b8e3f5a1c720
+Create Date: 2026-10-19 14:21:09.574013
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c2d7a9e4f318'
+down_revision = 'b8e3f5a1c720'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('forum_posts', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('unique_views', sa.Integer(), nullable=True, server_default='0'))
+
+    op.create_table('forum_post_view_sketches',
+    sa.Column('post_id', sa.Integer(), nullable=False),
+    sa.Column('sketch', sa.LargeBinary(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['post_id'], ['forum_posts.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('post_id')
+    )
+
+
+def downgrade():
+    op.drop_table('forum_post_view_sketches')
+
+    with op.batch_alter_table('forum_posts', schema=None) as batch_op:
+        batch_op.drop_column('unique_views')
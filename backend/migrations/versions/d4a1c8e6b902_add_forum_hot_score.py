@@ -0,0 +1,49 @@
+"""Add indexed hot score to forum posts
+
+Revision ID: d4a1c8e6b902
+Revises: c2d7a9e4f318
+Create Date: 2026-10-19 15:02:33.118467
+
+"""
+import math
+from datetime import datetime
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd4a1c8e6b902'
+down_revision = 'c2d7a9e4f318'
+branch_labels = None
+depends_on = None
+
+
+def _hot_score(upvotes, downvotes, reply_count, views, created_at):
+    # Frozen copy of app.utils.hot_rank.hot_score for the backfill
+    engagement = 3 * ((upvotes or 0) - (downvotes or 0)) + 2 * (reply_count or 0) + 0.1 * (views or 0)
+    order = math.log10(max(abs(engagement), 1))
+    sign = 1 if engagement > 0 else -1 if engagement < 0 else 0
+    seconds = ((created_at or datetime.utcnow()) - datetime(2024, 1, 1)).total_seconds()
+    return round(sign * order + seconds / 45000, 7)
+
+
+def upgrade():
+    with op.batch_alter_table('forum_posts', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('hot_score', sa.Double(), nullable=True, server_default='0'))
+        batch_op.create_index('idx_forum_posts_hot', ['hot_score', 'id'], unique=False)
+
+    conn = op.get_bind()
+    posts = sa.table('forum_posts', sa.column('id'), sa.column('upvotes'), sa.column('downvotes'),
+                     sa.column('reply_count'), sa.column('views'), sa.column('created_at'),
+                     sa.column('hot_score'))
+    rows = conn.execute(sa.select(posts.c.id, posts.c.upvotes, posts.c.downvotes, posts.c.reply_count,
+                                  posts.c.views, posts.c.created_at)).fetchall()
+    for row in rows:
+        conn.execute(posts.update().where(posts.c.id == row.id).values(
+            hot_score=_hot_score(row.upvotes, row.downvotes, row.reply_count, row.views, row.created_at)))
+
+
+def downgrade():
+    with op.batch_alter_table('forum_posts', schema=None) as batch_op:
+        batch_op.drop_index('idx_forum_posts_hot')
+        batch_op.drop_column('hot_score')
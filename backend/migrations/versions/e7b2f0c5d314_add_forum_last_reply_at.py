@@ -0,0 +1,34 @@
+"""Add last_reply_at to forum posts and resync reply counts
+
+Revision ID: e7b2f0c5d314
+Revises: d4a1c8e6b902
+Create Date: 2026-10-19 15:48:12.640291
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e7b2f0c5d314'
+down_revision = 'd4a1c8e6b902'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('forum_posts', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('last_reply_at', sa.DateTime(), nullable=True))
+        batch_op.create_index('idx_forum_posts_last_reply', ['last_reply_at', 'id'], unique=False)
+
+    op.execute("""
+        UPDATE forum_posts SET
+            reply_count = (SELECT COUNT(*) FROM forum_replies WHERE forum_replies.post_id = forum_posts.id),
+            last_reply_at = (SELECT MAX(created_at) FROM forum_replies WHERE forum_replies.post_id = forum_posts.id)
+    """)
+
+
+def downgrade():
+    with op.batch_alter_table('forum_posts', schema=None) as batch_op:
+        batch_op.drop_index('idx_forum_posts_last_reply')
+        batch_op.drop_column('last_reply_at')
@@ -0,0 +1,37 @@
+"""Add user_stats rollup table
+
+Revision ID: f3c9d1a7e285
+Revises: e7b2f0c5d314
+Create Date: 2026-10-19 16:30:54.902117
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f3c9d1a7e285'
+down_revision = 'e7b2f0c5d314'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Rows are built lazily on first read; run `flask rebuild-user-stats` to backfill eagerly
+    op.create_table('user_stats',
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('farm_count', sa.Integer(), nullable=False),
+    sa.Column('monitored_crop_count', sa.Integer(), nullable=False),
+    sa.Column('detection_count', sa.Integer(), nullable=False),
+    sa.Column('scan_count', sa.Integer(), nullable=False),
+    sa.Column('high_confidence_scan_count', sa.Integer(), nullable=False),
+    sa.Column('total_expenses', sa.Numeric(precision=12, scale=2), nullable=False),
+    sa.Column('total_income', sa.Numeric(precision=12, scale=2), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('user_id')
+    )
+
+
+def downgrade():
+    op.drop_table('user_stats')
@@ -0,0 +1,71 @@
+# tests/conftest.py
+import os
+import tempfile
+
+# app.config validates these when it is imported; the testing config replaces the database URI
+for _name, _value in (('SECRET_KEY', 'test-secret-key'), ('JWT_SECRET_KEY', 'test-jwt-secret-key-of-at-least-32-bytes'),
+                      ('MYSQL_USER', 'test'), ('MYSQL_PASSWORD', 'test'), ('MYSQL_HOST', 'localhost'),
+                      ('MYSQL_DB', 'test')):
+    os.environ.setdefault(_name, _value)
+# A file rather than :memory: so concurrent tests get real separate connections
+_TMP_DIR = tempfile.mkdtemp(prefix='plantcare-tests-')
+os.environ.setdefault('TEST_DATABASE_URL', 'sqlite:///' + os.path.join(_TMP_DIR, 'test.db'))
+# Uncached responses, so query budgets measure the database work of every request
+os.environ.setdefault('CACHE_TYPE', 'NullCache')
+
+import pytest
+from flask_jwt_extended import create_access_token
+from app import create_app, db
+
+pytest_plugins = ['app.utils.query_budget']
+
+@pytest.fixture(scope='session')
+def app():
+    application = create_app('testing')
+    with application.app_context():
+        import app.models  # noqa: F401 (register every table before create_all)
+        import app.models.calculator_history, app.models.disease_scan, app.models.farm_note  # noqa: F401,E401
+        import app.models.monitored_crop  # noqa: F401
+        db.create_all()
+    yield application
+    from app.services.view_counter_service import view_counter_service
+    with application.app_context():
+        view_counter_service.flush()  # Before the tables go, rather than at interpreter exit
+        db.drop_all()
+        db.engine.dispose()
+
+@pytest.fixture(autouse=True)
+def clean_tables(app):
+    """Every test starts from empty tables"""
+    yield
+    with app.app_context():
+        db.session.remove()
+        for table in reversed(db.metadata.sorted_tables):
+            db.session.execute(table.delete())
+        db.session.commit()
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+@pytest.fixture
+def make_user(app):
+    """make_user(name) -> id of a new user"""
+    from app.models.user import User
+
+    def make(name='grower'):
+        with app.app_context():
+            user = User(email=f'{name}@example.com', name=name)
+            user.set_password('password')
+            db.session.add(user)
+            db.session.commit()
+            return user.id
+    return make
+
+@pytest.fixture
+def auth_headers(app):
+    """auth_headers(user_id) -> Authorization header for that user"""
+    def headers(user_id):
+        with app.app_context():
+            return {'Authorization': f'Bearer {create_access_token(identity=str(user_id))}'}
+    return headers
@@ -0,0 +1,143 @@
+# tests/test_account_deletion.py
+import types
+from datetime import date, datetime, timedelta
+import pytest
+from sqlalchemy import event, func, select, text
+from app import db
+from app.models.calculator_history import CalculatorHistory
+from app.models.calculator_result import CalculatorResult
+from app.models.crop_predictions import CropRecommendation, CropYieldPrediction
+from app.models.disease import DiseaseDetection
+from app.models.disease_scan import DiseaseScan
+from app.models.farm import Crop, Farm
+from app.models.farm_note import FarmNote
+from app.models.forum import ForumPost, ForumPostViewSketch, ForumReply, ForumVote
+from app.models.monitored_crop import MonitoredCrop
+from app.models.transaction import FarmLedger, FarmLedgerMonthly
+from app.models.user import User
+from app.services import account_deletion_service as deletion_module
+from app.services import forum_search_service as search_module
+from app.services import similar_posts_service as similar_module
+from app.utils.hot_rank import hot_score
+from app.utils.hyperloglog import HyperLogLog
+from app.utils.user_stats import get_user_stats
+
+class InlineThread:
+    """Runs the deletion job on the request thread, so the test sees it finish"""
+
+    def __init__(self, target, args, **kwargs):
+        self.target, self.args = target, args
+
+    def start(self):
+        self.target(*self.args)
+
+@pytest.fixture
+def foreign_keys(app):
+    """Enforce foreign keys on SQLite too, as MySQL does"""
+    with app.app_context():
+        engine = db.engine
+
+    def enable(dbapi_connection, record):
+        dbapi_connection.execute('PRAGMA foreign_keys=ON')
+
+    if engine.dialect.name == 'sqlite':
+        event.listen(engine, 'connect', enable)
+        engine.dispose()
+    yield
+    if engine.dialect.name == 'sqlite':
+        event.remove(engine, 'connect', enable)
+        engine.dispose()
+
+@pytest.fixture
+def indexes(app, monkeypatch, tmp_path):
+    """Fresh forum search and similar-posts indexes in place of the singletons"""
+    monkeypatch.setitem(app.config, 'SIMILAR_POSTS_SNAPSHOT', str(tmp_path / 'similar.json.gz'))
+    search, similar = search_module.ForumSearchService(), similar_module.SimilarPostsService()
+    monkeypatch.setattr(search_module, 'forum_search_service', search)
+    monkeypatch.setattr(similar_module, 'similar_posts_service', similar)
+    return search, similar
+
+def seed_account(user_id, neighbour_id):
+    """A bit of everything for user_id, entangled with the neighbour's forum activity"""
+    started = datetime(2026, 3, 1)
+    farm = Farm(user_id=user_id, name='North', location='Punjab', main_crop='rice', size_acres=4)
+    db.session.add(farm)
+    db.session.flush()
+    db.session.add_all([
+        Crop(farm_id=farm.id, name='Rice', planted_date=date(2026, 6, 1)),
+        FarmNote(farm_id=farm.id, user_id=user_id, content='Drain the east plot'),
+        MonitoredCrop(user_id=user_id, farm_id=farm.id, name='Rice', farm_name='North', planting_date=date(2026, 6, 1)),
+        DiseaseScan(user_id=user_id, image_filename='leaf.jpg', image_data=b'\xff\xd8', is_confident=True),
+        DiseaseDetection(user_id=user_id, predicted_disease='Rust', detected_at=started),
+        CalculatorResult(user_id=user_id, calculator_type='fertilizer', input_data={}, result_data={}),
+        CalculatorHistory(user_id=user_id, calculation_type='pesticide', inputs={}, results={}),
+        CropRecommendation(user_id=user_id, nitrogen=1, phosphorus=1, potassium=1, temperature=25, humidity=60,
+                           ph=6.5, rainfall=100, predicted_crop='rice'),
+        CropYieldPrediction(user_id=user_id, crop='rice', season='Kharif', state='Punjab', annual_rainfall=900,
+                            fertilizer=1, pesticide=1, predicted_yield=3),
+    ])
+    db.session.add_all(FarmLedger(user_id=user_id, amount=10 * (i + 1), category='Seeds', transaction_type='expense',
+                                  transaction_date=date(2025 + i // 12, i % 12 + 1, 5)) for i in range(15))
+
+    own = ForumPost(user_id=user_id, title='Yellow leaves on rice', content='Lower leaves turn yellow',
+                    category='disease', created_at=started, reply_count=1, upvotes=1, last_reply_at=started)
+    theirs = ForumPost(user_id=neighbour_id, title='Whitefly on cotton', content='Tiny white insects',
+                       category='pests', created_at=started, reply_count=3, upvotes=2, downvotes=0,
+                       last_reply_at=started + timedelta(hours=3))
+    db.session.add_all([own, theirs])
+    db.session.flush()
+    db.session.add_all([
+        ForumReply(user_id=neighbour_id, post_id=own.id, content='Nitrogen deficiency?', created_at=started),
+        ForumVote(user_id=neighbour_id, post_id=own.id, vote_type='upvote'),
+        ForumPostViewSketch(post_id=own.id, sketch=HyperLogLog().to_bytes()),
+        ForumReply(user_id=neighbour_id, post_id=theirs.id, content='Yellow sticky traps',
+                   created_at=started + timedelta(hours=1)),
+        ForumReply(user_id=user_id, post_id=theirs.id, content='Neem oil works', created_at=started + timedelta(hours=2)),
+        ForumReply(user_id=user_id, post_id=theirs.id, content='Spray at dusk', created_at=started + timedelta(hours=3)),
+        ForumVote(user_id=user_id, post_id=theirs.id, vote_type='upvote'),
+        ForumVote(user_id=neighbour_id, post_id=theirs.id, vote_type='upvote'),
+    ])
+    db.session.commit()
+    get_user_stats(user_id)
+    return own.id, theirs.id
+
+def test_deletion_empties_every_table_and_repairs_the_forum(app, client, make_user, auth_headers, foreign_keys,
+                                                           indexes, monkeypatch):
+    user_id, neighbour_id = make_user('leaving'), make_user('neighbour')
+    search, similar = indexes
+    with app.app_context():
+        own_post, their_post = seed_account(user_id, neighbour_id)
+        similar.refresh(app)
+        assert search.search('yellow leaves')[1] == 1
+        assert db.session.scalar(select(func.count()).select_from(FarmLedgerMonthly)) == 15
+
+    monkeypatch.setattr(deletion_module, 'threading', types.SimpleNamespace(Thread=InlineThread))
+    monkeypatch.setitem(app.config, 'ACCOUNT_DELETION_CHUNK_SIZE', 4)  # Several chunks for the ledger
+    started = client.delete('/api/delete/account', headers=auth_headers(user_id))
+    assert started.status_code == 202
+    status = client.get(started.get_json()['status_url']).get_json()
+    assert status['status'] == 'completed', status['error_message']
+    assert status['progress'] == 100.0 and status['steps_done'] == status['steps_total']
+    assert status['deleted_rows']['farm_ledger'] == 15 and status['deleted_rows']['forum_replies'] == 3
+
+    with app.app_context():
+        for table in db.metadata.sorted_tables:
+            if 'user_id' in table.c and table.name != 'account_deletion_jobs':
+                assert db.session.scalar(select(func.count()).select_from(table)
+                                         .where(table.c.user_id == user_id)) == 0, table.name
+        assert db.session.get(User, user_id) is None and db.session.get(ForumPost, own_post) is None
+        for model in (ForumReply, ForumVote, ForumPostViewSketch):
+            assert model.query.filter_by(post_id=own_post).count() == 0
+        assert Crop.query.count() == 0
+        if db.engine.dialect.name == 'sqlite':
+            assert db.session.execute(text('PRAGMA foreign_key_check')).all() == []
+
+        # The neighbour's post lost two replies and an upvote to the bulk deletes
+        post = db.session.get(ForumPost, their_post)
+        assert (post.reply_count, post.last_reply_at, post.upvotes, post.downvotes) == \
+            (1, datetime(2026, 3, 1, 1), 1, 0)
+        assert post.hot_score == hot_score(1, 0, 1, post.views, post.created_at)
+
+        assert search.search('yellow leaves')[1] == 0
+        assert similar.similar('yellow rice leaves') == []
+        assert [p.id for p, _ in similar.similar('whitefly cotton')] == [their_post]
@@ -0,0 +1,143 @@
+# tests/test_cache_versions.py
+import re
+from datetime import date, datetime
+import pytest
+from flask_caching.backends import SimpleCache
+from sqlalchemy import update
+from app import cache, db
+from app.models.disease import DiseaseDetection
+from app.models.disease_scan import DiseaseScan
+from app.models.farm import Farm
+from app.models.monitored_crop import MonitoredCrop
+from app.models.transaction import FarmLedger
+from app.utils.cache_versions import RESOURCES, current_versions, mark_changed
+
+ROWS = {
+    'farm_ledger': lambda user_id: FarmLedger(user_id=user_id, amount=250, category='Seeds',
+                                              transaction_date=date(2026, 4, 2)),
+    'farms': lambda user_id: Farm(user_id=user_id, name='North', location='Punjab', main_crop='rice', size_acres=3),
+    'monitored_crops': lambda user_id: MonitoredCrop(user_id=user_id, name='Rice', farm_name='North',
+                                                     planting_date=date(2026, 6, 1)),
+    'disease_detections': lambda user_id: DiseaseDetection(user_id=user_id, predicted_disease='Rust',
+                                                           confidence_score=80, detected_at=datetime(2026, 5, 1)),
+    'disease_scans': lambda user_id: DiseaseScan(user_id=user_id, image_filename='leaf.jpg', is_confident=True),
+}
+
+def query_count(response):
+    return int(re.search(r'desc="(\d+) queries"', response.headers['Server-Timing']).group(1))
+
+@pytest.fixture
+def simple_cache(app):
+    """The app's cache on a SimpleCache backend for one test (the suite runs uncached)"""
+    backends = app.extensions['cache']
+    previous, backends[cache] = backends[cache], SimpleCache()
+    try:
+        with app.app_context():
+            yield cache
+    finally:
+        backends[cache] = previous
+
+def version(user_id, table):
+    return current_versions(str(user_id), [RESOURCES[table]])[0]
+
+@pytest.mark.parametrize('table', ROWS)
+def test_committed_inserts_updates_and_deletes_bump_the_version(simple_cache, make_user, table):
+    user_id, other_id = make_user('grower'), make_user('neighbour')
+    others = {name: version(other_id, name) for name in RESOURCES}
+    before = version(user_id, table)
+    assert version(user_id, table) == before  # Stable until something changes
+
+    row = ROWS[table](user_id)
+    db.session.add(row)
+    db.session.commit()
+    inserted = version(user_id, table)
+    assert inserted != before
+
+    changed = {'farm_ledger': ('amount', 300), 'farms': ('name', 'South'), 'monitored_crops': ('name', 'Wheat'),
+               'disease_detections': ('severity', 'high'), 'disease_scans': ('is_confident', False)}[table]
+    setattr(row, *changed)
+    db.session.commit()
+    updated = version(user_id, table)
+    assert updated != inserted
+
+    db.session.delete(row)
+    db.session.commit()
+    assert version(user_id, table) != updated
+    assert {name: version(other_id, name) for name in RESOURCES} == others
+
+def test_rollbacks_leave_the_version_alone(simple_cache, make_user):
+    user_id = make_user()
+    before = version(user_id, 'farm_ledger')
+    db.session.add(ROWS['farm_ledger'](user_id))
+    db.session.flush()
+    db.session.rollback()
+    db.session.commit()  # Nothing left pending to bump
+    assert version(user_id, 'farm_ledger') == before
+
+    # A rolled-back savepoint keeps the outer transaction's changes pending
+    db.session.add(ROWS['farms'](user_id))
+    db.session.flush()
+    farms_before = version(user_id, 'farms')
+    savepoint = db.session.begin_nested()
+    db.session.add(ROWS['farm_ledger'](user_id))
+    db.session.flush()
+    savepoint.rollback()
+    db.session.commit()
+    assert version(user_id, 'farms') != farms_before
+
+def test_bulk_statements_bump_through_mark_changed(simple_cache, make_user):
+    user_id = make_user()
+    db.session.add(ROWS['monitored_crops'](user_id))
+    db.session.commit()
+    before = version(user_id, 'monitored_crops')
+    db.session.execute(update(MonitoredCrop).where(MonitoredCrop.user_id == user_id).values(status='harvested'))
+    db.session.commit()
+    assert version(user_id, 'monitored_crops') == before  # Flushes never saw the bulk UPDATE
+    db.session.execute(update(MonitoredCrop).where(MonitoredCrop.user_id == user_id).values(status='growing'))
+    mark_changed(user_id, 'crops')
+    db.session.commit()
+    assert version(user_id, 'monitored_crops') != before
+
+def test_analytics_are_cached_until_the_data_changes(app, client, simple_cache, make_user, auth_headers):
+    user_id = make_user()
+    headers = auth_headers(user_id)
+
+    def financial():
+        response = client.get('/api/analytics/financial', headers=headers)
+        return response.get_json(), query_count(response)
+
+    assert financial() == ({'total_expenses': 0.0, 'total_income': 0.0}, 1)
+    assert financial()[1] == 0  # Served from the cache
+
+    created = client.post('/api/profile/transactions', headers=headers, json={
+        'amount': 120.5, 'category': 'Seeds', 'type': 'expense', 'date': '2026-04-02'})
+    assert financial() == ({'total_expenses': 120.5, 'total_income': 0.0}, 1)
+
+    transaction_id = created.get_json()['transaction']['id']
+    client.put(f'/api/profile/transactions/{transaction_id}', headers=headers, json={'type': 'income'})
+    assert financial()[0] == {'total_expenses': 0.0, 'total_income': 120.5}
+    client.delete(f'/api/profile/transactions/{transaction_id}', headers=headers)
+    assert financial()[0] == {'total_expenses': 0.0, 'total_income': 0.0}
+    assert financial()[1] == 0
+
+def test_responses_built_from_two_resources_follow_both(app, client, simple_cache, make_user, auth_headers):
+    user_id = make_user()
+    headers = auth_headers(user_id)
+
+    def high_confidence(source):
+        response = client.get('/api/analytics/disease-confidence', headers=headers, query_string={'source': source})
+        return response.get_json()[2]['count'], query_count(response)
+
+    assert high_confidence('scans') == (0, 1) and high_confidence('detections') == (0, 1)
+    assert high_confidence('scans')[1] == high_confidence('detections')[1] == 0
+
+    scan = ROWS['disease_scans'](user_id)
+    scan.confidence_score = 80
+    db.session.add(scan)
+    db.session.commit()
+    assert high_confidence('scans') == (1, 1)
+    assert high_confidence('detections') == (0, 1)  # Keyed on both resources, so recomputed too
+
+    db.session.add(ROWS['disease_detections'](user_id))
+    db.session.commit()
+    assert high_confidence('detections') == (1, 1)
@@ -0,0 +1,98 @@
+# tests/test_compression.py
+import gzip
+import pytest
+from flask import Flask, Response, jsonify, send_file
+from app.utils import compression
+
+BODY = {'posts': [{'id': i, 'title': 'Yellow leaves on rice seedlings', 'replies': i % 5} for i in range(100)]}
+
+@pytest.fixture
+def client(tmp_path):
+    app = Flask(__name__)
+    app.config.update(COMPRESS_MIN_SIZE=500)
+    compression.init_app(app)
+    script = tmp_path / 'app.js'
+    script.write_text('console.log("plantcare");\n' * 100)
+
+    @app.route('/posts')
+    def posts():
+        response = jsonify(BODY)
+        response.set_etag('posts-v1')
+        return response
+
+    @app.route('/small')
+    def small():
+        return jsonify({'ok': True})
+
+    @app.route('/stream')
+    def stream():
+        return Response((f'{{"chunk": {i}}}\n' * 50 for i in range(10)), mimetype='application/json')
+
+    @app.route('/file')
+    def file():
+        return send_file(script, mimetype='application/javascript')
+
+    return app.test_client()
+
+def get(client, path, accept_encoding=None):
+    return client.get(path, headers={'Accept-Encoding': accept_encoding} if accept_encoding is not None else {})
+
+def decode(response):
+    encoding = response.headers.get('Content-Encoding')
+    if encoding == 'br':
+        return compression.brotli.decompress(response.data)
+    return gzip.decompress(response.data) if encoding == 'gzip' else response.data
+
+def jsonify_bytes(client):
+    with client.application.app_context():
+        return jsonify(BODY).get_data()
+
+@pytest.mark.parametrize('accept_encoding, expected', [
+    ('gzip', 'gzip'),
+    ('gzip, deflate', 'gzip'),
+    ('br;q=0.5, gzip;q=0.8', 'gzip'),
+    ('gzip;q=0', None),
+    ('identity', None),
+    ('', None),
+    (None, None),
+], ids=['gzip', 'gzip and deflate', 'higher q wins', 'q=0', 'identity', 'empty', 'no header'])
+def test_accept_encoding_negotiation(client, accept_encoding, expected):
+    response = get(client, '/posts', accept_encoding)
+    assert response.headers.get('Content-Encoding') == expected
+    assert 'Accept-Encoding' in response.headers['Vary']  # Any answer depends on the header
+    assert response.headers['Content-Length'] == str(len(response.data))
+    assert decode(response) == jsonify_bytes(client)
+
+@pytest.mark.skipif(not compression.BROTLI_AVAILABLE, reason='brotli is not installed')
+@pytest.mark.parametrize('accept_encoding, expected', [
+    ('gzip, deflate, br', 'br'),
+    ('*', 'br'),
+    ('br;q=0, gzip', 'gzip'),
+], ids=['br preferred', 'wildcard', 'br refused'])
+def test_brotli_negotiation(client, accept_encoding, expected):
+    response = get(client, '/posts', accept_encoding)
+    assert response.headers['Content-Encoding'] == expected
+    assert decode(response) == jsonify_bytes(client)
+
+def test_bodies_under_the_minimum_size_are_left_alone(client):
+    response = get(client, '/small', 'gzip, br')
+    assert 'Content-Encoding' not in response.headers and 'Vary' not in response.headers
+    assert response.get_json() == {'ok': True}
+
+def test_strong_etag_becomes_weak_when_compressed(client):
+    assert get(client, '/posts', 'gzip').headers['ETag'] == 'W/"posts-v1"'
+    assert get(client, '/posts').headers['ETag'] == '"posts-v1"'
+
+@pytest.mark.parametrize('path', ['/stream', '/file'], ids=['streamed', 'direct passthrough'])
+def test_streamed_and_file_responses_are_untouched(client, path):
+    response = get(client, path, 'gzip, br')
+    assert 'Content-Encoding' not in response.headers
+    assert 'Accept-Encoding' not in response.headers.get('Vary', '')
+    assert not response.data.startswith(b'\x1f\x8b')
+
+def test_disabled_by_config():
+    app = Flask(__name__)
+    app.config.update(COMPRESS_ENABLED=False)
+    compression.init_app(app)
+    app.route('/posts')(lambda: jsonify(BODY))
+    assert 'Content-Encoding' not in app.test_client().get('/posts', headers={'Accept-Encoding': 'gzip'}).headers
@@ -0,0 +1,62 @@
+# tests/test_disease_detection.py
+import io
+import pytest
+from app.routes import disease_detection_no_jwt
+from app.utils.api_version import V2_MEDIA_TYPE
+
+PREDICTION = {'class': 'Tomato___Early_blight', 'symptoms': ['Brown rings on older leaves'],
+              'treatment': ['Copper fungicide'], 'prevention': ['Rotate crops'], 'description': 'Fungal leaf spot'}
+
+V2_KEYS = {'id', 'disease', 'scientific_name', 'confidence', 'is_confident', 'severity', 'description', 'cause',
+           'symptoms', 'treatment', 'prevention', 'image_path', 'detected_at', 'source'}
+
+@pytest.fixture
+def detect(app, client, monkeypatch, tmp_path):
+    """detect(confidence, query_string, headers) -> response, with the model stubbed and uploads in tmp_path"""
+    monkeypatch.setattr(app, 'root_path', str(tmp_path))
+
+    def run(confidence=87.5, query_string=None, headers=None):
+        monkeypatch.setattr(disease_detection_no_jwt, 'predict_plant_disease',
+                            lambda path: {**PREDICTION, 'confidence': confidence})
+        return client.post('/api/disease/detect', query_string=query_string, headers=headers,
+                           data={'image': (io.BytesIO(b'\xff\xd8\xff'), 'leaf.jpg')})
+    return run
+
+@pytest.mark.parametrize('query_string, headers', [
+    ({'v': '2'}, None),
+    (None, {'Accept': V2_MEDIA_TYPE}),
+    (None, {'Accept': f'application/json;q=0.5, {V2_MEDIA_TYPE}'}),
+], ids=['query parameter', 'accept', 'accept among others'])
+def test_v2_is_compact_with_the_vendor_type(detect, query_string, headers):
+    response = detect(query_string=query_string, headers=headers)
+    assert response.status_code == 200
+    assert response.mimetype == V2_MEDIA_TYPE and 'Accept' in response.vary
+    body = response.get_json(force=True)
+    assert set(body) == V2_KEYS
+    assert (body['disease'], body['confidence'], body['is_confident']) == ('Tomato___Early_blight', 87.5, True)
+    assert body['image_path'] == 'static/uploads/leaf.jpg' and body['id'] is not None
+
+@pytest.mark.parametrize('headers', [None, {'Accept': '*/*'}, {'Accept': 'application/json'},
+                                     {'Accept': f'{V2_MEDIA_TYPE};q=0, */*'}],
+                         ids=['no accept', 'wildcard', 'json', 'v2 refused'])
+def test_legacy_shape_by_default(detect, headers):
+    response = detect(headers=headers)
+    assert response.mimetype == 'application/json' and 'Accept' in response.vary
+    body = response.get_json()
+    assert body['result']['disease'] == body['predicted_disease'] == 'Tomato___Early_blight'
+    assert (body['confidence'], body['confidence_score']) == (87.5, 0.875)
+    assert body['detection']['details']['isConfident'] is True
+
+@pytest.mark.parametrize('confidence', [0.42, 42, 42.0], ids=['fraction', 'int percent', 'percent'])
+def test_confidence_is_a_percentage_in_both_shapes(detect, confidence):
+    compact = detect(confidence, query_string={'v': '2'}).get_json(force=True)
+    legacy = detect(confidence).get_json()
+    assert compact['confidence'] == legacy['confidence'] == legacy['result']['confidence'] == 42.0
+    assert legacy['confidence_score'] == legacy['result']['confidence_score'] == 0.42
+    assert compact['is_confident'] is legacy['result']['isConfident'] is False
+
+def test_high_fractional_confidence_counts_as_confident(detect):
+    assert detect(0.93, query_string={'v': '2'}).get_json(force=True)['is_confident'] is True
+
+def test_missing_image_is_rejected(client):
+    assert client.post('/api/disease/detect', data={}).status_code == 400
@@ -0,0 +1,173 @@
+# tests/test_explain.py
+"""
+The hot per-user and per-thread queries must be served by their composite
+indexes: no full scan, and no filesort where the index already gives the
+order. The MySQL plans are the ones that matter and need TEST_DATABASE_URL
+pointing at a scratch MySQL database; SQLite's query plans are checked too.
+"""
+from datetime import date, datetime, timedelta
+import pytest
+from sqlalchemy import func, select, text
+from app import db
+from app.models.crop_predictions import CropRecommendation, CropYieldPrediction
+from app.models.disease import DiseaseDetection
+from app.models.forum import ForumPost, ForumReply
+from app.models.transaction import FarmLedger
+from app.models.user import User
+from app.utils.pagination import _after
+
+USERS = 20
+ROWS_PER_USER = 12
+CATEGORIES = ['disease', 'pests', 'soil', 'irrigation', 'market']
+
+# name: (statement, table, index it must use, whether the index must also give the order)
+HOT_QUERIES = {
+    'ledger list': (
+        select(FarmLedger.id, FarmLedger.amount).where(FarmLedger.user_id == 1)
+        .order_by(FarmLedger.transaction_date.desc(), FarmLedger.id.desc()).limit(25),
+        'farm_ledger', 'idx_farm_ledger_user_date', True),
+    'ledger type totals': (
+        select(func.sum(FarmLedger.amount)).where(
+            FarmLedger.user_id == 1, FarmLedger.transaction_type == 'expense',
+            FarmLedger.transaction_date >= date(2026, 1, 1), FarmLedger.transaction_date < date(2026, 7, 1)),
+        'farm_ledger', 'idx_farm_ledger_type_date', False),
+    'detection history': (
+        select(DiseaseDetection.id).where(DiseaseDetection.user_id == 1)
+        .order_by(DiseaseDetection.detected_at.desc(), DiseaseDetection.id.desc()).limit(50),
+        'disease_detections', 'idx_disease_detections_user_date', True),
+    'disease counts': (
+        select(DiseaseDetection.predicted_disease, func.count(DiseaseDetection.id)).where(
+            DiseaseDetection.user_id == 1, DiseaseDetection.predicted_disease.isnot(None))
+        .group_by(DiseaseDetection.predicted_disease),
+        'disease_detections', 'idx_disease_detections_user_disease', False),
+    'posts by category': (
+        select(ForumPost.id, ForumPost.title).where(ForumPost.category == 'soil')
+        .order_by(ForumPost.created_at.desc(), ForumPost.id.desc()).limit(10),
+        'forum_posts', 'idx_forum_posts_category_created', True),
+    'replies by post': (
+        select(ForumReply.id, ForumReply.content).where(ForumReply.post_id == 3)
+        .order_by(ForumReply.created_at.asc(), ForumReply.id.asc()).limit(20),
+        'forum_replies', 'idx_forum_replies_post_created', True),
+    'recommendation history': (
+        select(CropRecommendation.id).where(CropRecommendation.user_id == 1)
+        .order_by(CropRecommendation.created_at.desc()).limit(50),
+        'crop_recommendations', 'idx_crop_recommendations_user_created', True),
+    'yield history': (
+        select(CropYieldPrediction.id).where(CropYieldPrediction.user_id == 1)
+        .order_by(CropYieldPrediction.created_at.desc()).limit(50),
+        'crop_yield_predictions', 'idx_crop_yield_predictions_user_created', True),
+}
+
+# Keyset pages past the first: the cursor predicate must be a range on the index, not a scan
+# name: (statement, table, index, the range SQLite's plan must show)
+CURSOR_QUERIES = {
+    'ledger after cursor': (
+        select(FarmLedger.id).where(FarmLedger.user_id == 1, _after(FarmLedger.transaction_date, FarmLedger.id,
+                                                                    date(2026, 1, 6), 40, True))
+        .order_by(FarmLedger.transaction_date.desc(), FarmLedger.id.desc()).limit(26),
+        'farm_ledger', 'idx_farm_ledger_user_date', 'user_id=? AND transaction_date<?'),
+    'ledger null tail': (
+        select(FarmLedger.id).where(FarmLedger.user_id == 1, FarmLedger.transaction_date.is_(None))
+        .order_by(FarmLedger.id.desc()).limit(26),
+        'farm_ledger', 'idx_farm_ledger_user_date', 'user_id=? AND transaction_date=?'),
+    'detections after cursor': (
+        select(DiseaseDetection.id).where(DiseaseDetection.user_id == 1, _after(
+            DiseaseDetection.detected_at, DiseaseDetection.id, datetime(2026, 1, 6, 1), 40, True))
+        .order_by(DiseaseDetection.detected_at.desc(), DiseaseDetection.id.desc()).limit(26),
+        'disease_detections', 'idx_disease_detections_user_date', 'user_id=? AND detected_at<?'),
+    'replies after cursor': (
+        select(ForumReply.id).where(ForumReply.post_id == 3, _after(ForumReply.created_at, ForumReply.id,
+                                                                    datetime(2026, 1, 1, 3, 1), 9, False))
+        .order_by(ForumReply.created_at.asc(), ForumReply.id.asc()).limit(21),
+        'forum_replies', 'idx_forum_replies_post_created', 'post_id=? AND created_at>?'),
+}
+
+def dialect():
+    return db.engine.dialect.name
+
+def literal_sql(statement):
+    return str(statement.compile(dialect=db.engine.dialect, compile_kwargs={'literal_binds': True}))
+
+@pytest.fixture
+def seeded(app):
+    """USERS users with ROWS_PER_USER rows in each table, so no single user or thread is most of a table"""
+    started = datetime(2026, 1, 1)
+    with app.app_context():
+        def insert(model, rows):
+            db.session.execute(model.__table__.insert(), rows)
+
+        insert(User, [{'id': u, 'email': f'grower{u}@example.com', 'name': f'grower{u}', 'password_hash': '-'}
+                      for u in range(1, USERS + 1)])
+        per_user = [(u, i, started + timedelta(days=i, hours=u)) for u in range(1, USERS + 1)
+                    for i in range(ROWS_PER_USER)]
+        insert(FarmLedger, [{'user_id': u, 'amount': 10 + i, 'category': 'Seeds',
+                             'transaction_type': 'income' if i % 3 == 0 else 'expense',
+                             'transaction_date': at.date(), 'created_at': at} for u, i, at in per_user])
+        insert(DiseaseDetection, [{'user_id': u, 'predicted_disease': f'Disease {i % 4}', 'confidence_score': 80,
+                                   'detected_at': at} for u, i, at in per_user])
+        insert(CropRecommendation, [{'user_id': u, 'nitrogen': 1, 'phosphorus': 1, 'potassium': 1, 'temperature': 25,
+                                     'humidity': 60, 'ph': 6.5, 'rainfall': 100, 'predicted_crop': 'rice',
+                                     'created_at': at} for u, i, at in per_user])
+        insert(CropYieldPrediction, [{'user_id': u, 'crop': 'rice', 'season': 'Kharif', 'state': 'Punjab',
+                                      'annual_rainfall': 900, 'fertilizer': 1, 'pesticide': 1,
+                                      'predicted_yield': 3, 'created_at': at} for u, i, at in per_user])
+        insert(ForumPost, [{'id': p, 'user_id': p % USERS + 1, 'title': f'Question {p}', 'content': '-',
+                            'category': CATEGORIES[p % len(CATEGORIES)], 'created_at': started + timedelta(hours=p)}
+                           for p in range(1, USERS * 3 + 1)])
+        insert(ForumReply, [{'user_id': r % USERS + 1, 'post_id': p, 'content': f'Reply {r}',
+                             'created_at': started + timedelta(hours=p, minutes=r)}
+                            for p in range(1, USERS * 3 + 1) for r in range(4)])
+        db.session.commit()
+        if dialect() == 'mysql':
+            for table in ('users', 'farm_ledger', 'disease_detections', 'crop_recommendations',
+                          'crop_yield_predictions', 'forum_posts', 'forum_replies'):
+                db.session.execute(text(f'ANALYZE TABLE {table}')).all()
+        yield
+
+@pytest.mark.parametrize('name', HOT_QUERIES)
+def test_mysql_plan_uses_the_composite_index(app, seeded, name):
+    statement, table, index, ordered = HOT_QUERIES[name]
+    with app.app_context():
+        if dialect() != 'mysql':
+            pytest.skip('EXPLAIN checks need TEST_DATABASE_URL pointing at MySQL')
+        plan = [dict(row._mapping) for row in db.session.execute(text('EXPLAIN ' + literal_sql(statement)))]
+    [row] = [row for row in plan if row['table'] == table]
+    extra = row.get('Extra') or ''
+    assert row['type'] != 'ALL', f'{name}: full scan of {table}: {plan}'
+    assert row['key'] == index, f'{name}: expected {index}, got {row["key"]}: {plan}'
+    if ordered:
+        assert 'Using filesort' not in extra, f'{name}: filesort: {plan}'
+
+@pytest.mark.parametrize('name', HOT_QUERIES)
+def test_sqlite_plan_uses_the_composite_index(app, seeded, name):
+    statement, table, index, ordered = HOT_QUERIES[name]
+    with app.app_context():
+        if dialect() != 'sqlite':
+            pytest.skip('SQLite query plans only')
+        details = [row[3] for row in db.session.execute(text('EXPLAIN QUERY PLAN ' + literal_sql(statement)))]
+    assert any(f'INDEX {index} ' in detail for detail in details), f'{name}: expected {index}: {details}'
+    assert not any(detail == f'SCAN {table}' for detail in details), f'{name}: full scan: {details}'
+    if ordered:
+        assert not any('TEMP B-TREE' in detail for detail in details), f'{name}: sort: {details}'
+
+@pytest.mark.parametrize('name', CURSOR_QUERIES)
+def test_mysql_cursor_plan_is_an_index_range(app, seeded, name):
+    statement, table, index, _ = CURSOR_QUERIES[name]
+    with app.app_context():
+        if dialect() != 'mysql':
+            pytest.skip('EXPLAIN checks need TEST_DATABASE_URL pointing at MySQL')
+        plan = [dict(row._mapping) for row in db.session.execute(text('EXPLAIN ' + literal_sql(statement)))]
+    [row] = [row for row in plan if row['table'] == table]
+    assert row['type'] in ('range', 'ref'), f'{name}: not a seek: {plan}'
+    assert row['key'] == index, f'{name}: expected {index}, got {row["key"]}: {plan}'
+    assert 'Using filesort' not in (row.get('Extra') or ''), f'{name}: filesort: {plan}'
+
+@pytest.mark.parametrize('name', CURSOR_QUERIES)
+def test_sqlite_cursor_plan_is_an_index_range(app, seeded, name):
+    statement, table, index, seek = CURSOR_QUERIES[name]
+    with app.app_context():
+        if dialect() != 'sqlite':
+            pytest.skip('SQLite query plans only')
+        details = [row[3] for row in db.session.execute(text('EXPLAIN QUERY PLAN ' + literal_sql(statement)))]
+    assert any(f'INDEX {index} ({seek}' in detail for detail in details), f'{name}: expected {seek}: {details}'
+    assert not any('TEMP B-TREE' in detail for detail in details), f'{name}: sort: {details}'
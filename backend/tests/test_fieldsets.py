@@ -0,0 +1,65 @@
+# tests/test_fieldsets.py
+from datetime import date
+import pytest
+from app import db
+from app.models.disease_scan import DiseaseScan
+from app.models.farm import Farm, Crop
+from app.models.monitored_crop import MonitoredCrop
+from app.utils.fieldsets import project
+from app.utils.sql_instrumentation import track_queries
+
+def selects(stats, table):
+    return [s for s in stats.fingerprints() if s.lower().startswith('select') and f'from {table}' in s.lower()]
+
+@pytest.fixture
+def user_id(app, make_user):
+    user_id = make_user()
+    with app.app_context():
+        farm = Farm(name='River plot', main_crop='rice', size_acres=2, user_id=user_id)
+        db.session.add(farm)
+        db.session.flush()
+        db.session.add(Crop(name='Basmati', farm_id=farm.id))
+        db.session.add(MonitoredCrop(name='Basmati', farm_name=farm.name, farm_id=farm.id,
+                                     planting_date=date(2026, 6, 1), user_id=user_id, notes='Transplanted'))
+        db.session.add(DiseaseScan(user_id=user_id, image_filename='leaf.jpg', image_data=b'\xff\xd8' * 1000,
+                                   image_mimetype='image/jpeg', status='completed'))
+        db.session.commit()
+    return user_id
+
+def test_default_fieldset_only_adds_relationship_loads(app, user_id):
+    with app.app_context():
+        assert project(MonitoredCrop.query, MonitoredCrop)._with_options == ()
+        with track_queries() as stats:
+            [farm] = project(Farm.query, Farm).filter_by(user_id=user_id).all()
+            assert [crop.name for crop in farm.crops] == ['Basmati'] and farm.notes == []
+    assert stats.count == 1  # crops and notes are joined into the one SELECT
+
+def test_sparse_fieldset_response(client, user_id, auth_headers):
+    response = client.get('/api/farms?fields=id,name', headers=auth_headers(user_id))
+    assert response.status_code == 200
+    assert [sorted(farm) for farm in response.get_json()['farms']] == [['id', 'name']]
+
+def test_sparse_fieldset_select_list(app, user_id):
+    with app.app_context(), track_queries() as stats:
+        crops = project(MonitoredCrop.query, MonitoredCrop, ['name']).filter_by(user_id=user_id).all()
+        assert [crop.to_dict(['name']) for crop in crops] == [{'name': 'Basmati'}]
+    [select] = selects(stats, 'monitored_crops')
+    assert 'monitored_crops.notes' not in select and 'monitored_crops.name' in select
+
+def test_scan_list_never_selects_the_image_blob(client, user_id, auth_headers):
+    response = client.get('/api/disease-scans/scans', headers=auth_headers(user_id))
+    assert response.status_code == 200
+    [scan] = response.get_json()['scans']
+    image = client.get(scan['image'])
+    assert image.status_code == 200 and image.data == b'\xff\xd8' * 1000
+
+def test_scan_query_defers_the_blob(app, user_id):
+    with app.app_context(), track_queries() as stats:
+        project(DiseaseScan.query, DiseaseScan).filter_by(user_id=user_id).all()
+    [select] = selects(stats, 'disease_scans')
+    assert 'image_data' not in select
+
+def test_unknown_field_is_rejected(client, user_id, auth_headers):
+    response = client.get('/api/farms?fields=id,acreage', headers=auth_headers(user_id))
+    assert response.status_code == 400
+    assert 'acreage' in response.get_json()['error']
@@ -0,0 +1,64 @@
+# tests/test_forum_counters.py
+from datetime import datetime
+from app import db
+from app.models.forum import ForumPost, ForumReply, ForumVote
+from app.utils.forum_counters import reconcile_reply_counters, reconcile_vote_counters
+from app.utils.sql_instrumentation import track_queries
+
+def test_reconcile_fixes_only_drifted_posts(app, make_user):
+    user_id = make_user()
+    newest = datetime(2026, 5, 1, 12, 0)
+    with app.app_context():
+        drifted = ForumPost(user_id=user_id, title='Wilting beans', content='Leaves droop by noon',
+                            reply_count=7, last_reply_at=None)
+        correct = ForumPost(user_id=user_id, title='Soil pH for tea', content='Which range works best',
+                            reply_count=1, last_reply_at=newest)
+        empty = ForumPost(user_id=user_id, title='Mulch options', content='Straw or plastic film',
+                          reply_count=2, last_reply_at=newest)
+        db.session.add_all([drifted, correct, empty])
+        db.session.flush()
+        db.session.add_all([
+            ForumReply(user_id=user_id, post_id=drifted.id, content='Water earlier', created_at=newest),
+            ForumReply(user_id=user_id, post_id=drifted.id, content='Check roots', created_at=datetime(2026, 4, 1)),
+            ForumReply(user_id=user_id, post_id=correct.id, content='4.5 to 5.5', created_at=newest),
+        ])
+        db.session.commit()
+        ids = drifted.id, correct.id, empty.id
+
+        assert reconcile_reply_counters(batch_size=2) == 2
+        db.session.expire_all()
+        posts = [db.session.get(ForumPost, post_id) for post_id in ids]
+        assert [(p.reply_count, p.last_reply_at) for p in posts] == [(2, newest), (1, newest), (0, None)]
+        assert reconcile_reply_counters() == 0
+
+def test_reconcile_counts_in_the_update_statement(app, make_user):
+    user_id = make_user()
+    with app.app_context():
+        db.session.add(ForumPost(user_id=user_id, title='Rust on wheat', content='Orange pustules', reply_count=3))
+        db.session.commit()
+        with track_queries() as stats:
+            assert reconcile_reply_counters() == 1
+    statements = list(stats.fingerprints())
+    # No read-then-write: the recount is a correlated subquery inside the UPDATE itself
+    updates = [s for s in statements if s.lower().startswith('update')]
+    assert len(updates) == 1 and 'select count(forum_replies.id)' in updates[0].lower()
+    assert not [s for s in statements if 'group by' in s.lower()]
+
+def test_vote_recount_can_be_limited_to_some_posts(app, make_user):
+    user_id, other_id = make_user('grower'), make_user('neighbour')
+    with app.app_context():
+        posts = [ForumPost(user_id=user_id, title=f'Question {i}', content='-', upvotes=5, downvotes=5)
+                 for i in range(3)]
+        db.session.add_all(posts)
+        db.session.flush()
+        db.session.add_all([ForumVote(user_id=user_id, post_id=posts[0].id, vote_type='upvote'),
+                            ForumVote(user_id=other_id, post_id=posts[0].id, vote_type='downvote'),
+                            ForumVote(user_id=other_id, post_id=posts[1].id, vote_type='upvote')])
+        db.session.commit()
+        ids = [post.id for post in posts]
+
+        assert reconcile_vote_counters(post_ids=ids[:2]) == 2
+        db.session.expire_all()
+        posts = [db.session.get(ForumPost, post_id) for post_id in ids]
+        assert [(p.upvotes, p.downvotes) for p in posts] == [(1, 1), (1, 0), (5, 5)]
+        assert reconcile_vote_counters(batch_size=2) == 1
@@ -0,0 +1,57 @@
+# tests/test_forum_replies.py
+"""Reply listings join their context in; the statement count must not grow with the page size"""
+import re
+from datetime import datetime, timedelta
+import pytest
+from app import db
+from app.models.forum import ForumPost, ForumReply
+
+POSTS = 10
+REPLIES_PER_POST = 6
+
+@pytest.fixture
+def forum(app, make_user):
+    """POSTS posts, each with REPLIES_PER_POST replies by one replier"""
+    author, replier = make_user('author'), make_user('replier')
+    started = datetime(2026, 2, 1)
+    with app.app_context():
+        post_ids = []
+        for i in range(POSTS):
+            post = ForumPost(user_id=author, title=f'Wilting chilli {i}', content='After heavy rain',
+                             category='disease', created_at=started + timedelta(hours=i))
+            db.session.add(post)
+            db.session.flush()
+            db.session.add_all(ForumReply(user_id=replier, post_id=post.id, content=f'Reply {j}',
+                                          created_at=started + timedelta(hours=i, minutes=j + 1))
+                               for j in range(REPLIES_PER_POST))
+            post_ids.append(post.id)
+        db.session.commit()
+    return {'author': author, 'replier': replier, 'post_ids': post_ids}
+
+def query_count(response):
+    """Statements the request ran, from its Server-Timing header"""
+    return int(re.search(r'desc="(\d+) queries"', response.headers['Server-Timing']).group(1))
+
+@pytest.mark.parametrize('params', ['', '&cursor='])
+def test_my_comments_query_count_is_independent_of_page_size(client, forum, auth_headers, params):
+    headers = auth_headers(forum['replier'])
+    small = client.get(f'/api/forum/my-comments?per_page=5{params}', headers=headers)
+    large = client.get(f'/api/forum/my-comments?per_page=50{params}', headers=headers)
+    assert len(small.get_json()['comments']) == 5 and len(large.get_json()['comments']) == 50
+    assert query_count(small) == query_count(large) <= 2
+    comment = large.get_json()['comments'][0]
+    assert comment['post_title'] == f'Wilting chilli {POSTS - 1}' and comment['author_name'] == 'replier'
+
+@pytest.mark.parametrize('params', ['', '&cursor='])
+def test_post_replies_query_count_is_independent_of_page_size(client, forum, params):
+    url = f"/api/forum/posts/{forum['post_ids'][0]}/replies"
+    small = client.get(f'{url}?per_page=2{params}')
+    large = client.get(f'{url}?per_page={REPLIES_PER_POST}{params}')
+    assert len(small.get_json()['replies']) == 2 and len(large.get_json()['replies']) == REPLIES_PER_POST
+    assert query_count(small) == query_count(large) <= 3
+    assert {reply['author_name'] for reply in large.get_json()['replies']} == {'replier'}
+
+def test_post_replies_of_a_missing_post(client, forum):
+    response = client.get(f"/api/forum/posts/{forum['post_ids'][-1] + 1}/replies")
+    assert response.status_code == 404
+    assert query_count(response) == 1
@@ -0,0 +1,87 @@
+# tests/test_forum_search.py
+import random
+import statistics
+import time
+import pytest
+from sqlalchemy.exc import OperationalError
+from app import db
+from app.models.forum import ForumPost
+from app.routes import forum
+from app.services.forum_search_service import ForumSearchService
+
+class MySQLError(Exception):
+    """Stands in for a pymysql error: args are (errno, message)"""
+
+@pytest.fixture
+def search(app, make_user, monkeypatch):
+    user_id = make_user()
+    with app.app_context():
+        db.session.add(ForumPost(user_id=user_id, title='Yellow leaves on rice', content='Leaves turn yellow',
+                                 category='disease'))
+        db.session.commit()
+        service = ForumSearchService()
+        monkeypatch.setattr(service, '_use_mysql', lambda: service._mysql_fulltext)
+        yield service
+
+def failing_fulltext(errno, message):
+    def run(*args):
+        raise OperationalError('SELECT ... MATCH', {}, MySQLError(errno, message))
+    return run
+
+def test_transient_fulltext_error_falls_back_for_that_request_only(search, monkeypatch):
+    monkeypatch.setattr(search, '_search_mysql', failing_fulltext(1205, 'Lock wait timeout exceeded'))
+    assert search.search('yellow leaves') is None  # Caller uses its substring filter
+    assert search._mysql_fulltext is True
+    assert search._index is None  # No per-worker index that other workers' writes never reach
+
+def test_missing_fulltext_index_switches_to_in_process_index(search, monkeypatch):
+    monkeypatch.setattr(search, '_search_mysql',
+                        failing_fulltext(1191, "Can't find FULLTEXT index matching the column list"))
+    results, total = search.search('yellow leaves')
+    assert total == 1 and results[0][0].title == 'Yellow leaves on rice'
+    assert search._mysql_fulltext is False
+
+@pytest.mark.benchmark
+def test_search_latency_over_a_hundred_thousand_posts(app, client, make_user, monkeypatch):
+    """Opt-in (pytest -m benchmark): index build time and /api/forum/posts?search= latency over 100k posts"""
+    posts, chunk = 100_000, 10_000
+    rng = random.Random(30)
+    crops = ['rice', 'wheat', 'cotton', 'tomato', 'potato', 'maize', 'mustard', 'sugarcane', 'chilli', 'onion']
+    problems = ['yellow leaves', 'leaf spots', 'whitefly', 'aphids', 'late blight', 'rust', 'wilting', 'stem borer',
+                'powdery mildew', 'root rot', 'nitrogen deficiency', 'low yield']
+    filler = ('after rain the field near the canal shows this on older plants since last week what spray dose '
+              'should I use and when is the best time to irrigate or apply fertilizer urea potash neem oil').split()
+    user_id = make_user()
+    with app.app_context():
+        for first in range(0, posts, chunk):
+            db.session.execute(ForumPost.__table__.insert(), [{
+                'user_id': user_id, 'category': rng.choice(['disease', 'pests', 'irrigation', 'general']),
+                'title': f'{rng.choice(problems).capitalize()} on {rng.choice(crops)} {i}',
+                'content': ' '.join(rng.choices(filler, k=40) + [rng.choice(problems), rng.choice(crops)]),
+            } for i in range(first, first + chunk)])
+        db.session.commit()
+
+    service = ForumSearchService()
+    monkeypatch.setattr(forum, 'forum_search_service', service)
+    with app.app_context():
+        started = time.perf_counter()
+        service.search('rice')
+        build = time.perf_counter() - started
+
+    queries = [('yellow leaves rice', None, 1), ('whitefly cotton', 'pests', 1), ('late blight potato', None, 3),
+               ('neem oil', None, 1), ('powdery mildew chilli spray dose', 'disease', 1), ('sugarcane', None, 10)]
+    timings = {}
+    for query, category, page in queries:
+        params = {'search': query, 'page': page, 'per_page': 20, **({'category': category} if category else {})}
+        runs = []
+        for _ in range(5):
+            started = time.perf_counter()
+            response = client.get('/api/forum/posts', query_string=params)
+            runs.append(time.perf_counter() - started)
+        assert response.status_code == 200 and response.get_json()['posts']
+        timings[query] = statistics.median(runs)
+
+    print(f"\n{posts} posts: index built in {build:.2f} s")
+    for query, seconds in timings.items():
+        print(f"  {query!r}: {seconds * 1000:.1f} ms")
+    assert max(timings.values()) < 0.5
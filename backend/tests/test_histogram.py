@@ -0,0 +1,59 @@
+# tests/test_histogram.py
+import pytest
+from app import db
+from app.models.disease import DiseaseDetection
+from app.models.disease_scan import DiseaseScan
+from app.utils.histogram import MAX_BINS, as_percent, histogram, uniform_edges
+from app.utils.sql_instrumentation import track_queries
+
+# Older rows store fractions, newer ones percentages
+SCORES = [0.2, 45.0, 0.5, 60.0, 74.9, 0.8, 89.0, 0.95, 100.0]
+
+@pytest.fixture
+def user_id(app, make_user):
+    user_id, other_id = make_user('grower'), make_user('neighbour')
+    with app.app_context():
+        db.session.add_all(DiseaseDetection(user_id=user_id, predicted_disease='Early blight', confidence_score=score)
+                           for score in SCORES)
+        db.session.add(DiseaseDetection(user_id=other_id, predicted_disease='Rust', confidence_score=99.0))
+        db.session.add(DiseaseScan(user_id=user_id, image_filename='leaf.jpg', confidence_score=0.55))
+        db.session.commit()
+    return user_id
+
+def test_any_number_of_buckets_is_one_statement(app, user_id):
+    with app.app_context():
+        score = as_percent(DiseaseDetection.confidence_score)
+        mine = [DiseaseDetection.user_id == user_id]
+        with track_queries() as stats:
+            assert histogram(DiseaseDetection, score, [0, 50, 75, 90, 100], mine) == [2, 3, 2, 2]
+        assert stats.count == 1
+        with track_queries() as stats:
+            assert sum(histogram(DiseaseDetection, score, uniform_edges(MAX_BINS), mine)) == len(SCORES)
+        assert stats.count == 1
+
+def test_values_outside_the_edges_are_not_counted(app, user_id):
+    with app.app_context():
+        assert histogram(DiseaseDetection, as_percent(DiseaseDetection.confidence_score), [50, 75, 90],
+                         [DiseaseDetection.user_id == user_id]) == [3, 2]  # 20, 45, 95 and 100 fall outside
+
+@pytest.mark.parametrize('edges', [[50], [0, 50, 50, 100], [0, float('nan')], uniform_edges(MAX_BINS + 1)])
+def test_bad_edges_are_rejected(app, edges):
+    with app.app_context(), pytest.raises(ValueError):
+        histogram(DiseaseDetection, DiseaseDetection.confidence_score, edges)
+
+@pytest.mark.query_budget(max_queries=1)
+def test_disease_confidence_endpoint(client, user_id, auth_headers):
+    headers = auth_headers(user_id)
+    default = client.get('/api/analytics/disease-confidence', headers=headers).get_json()
+    assert [(bucket['confidence_range'], bucket['count']) for bucket in default] == [
+        ('Low (0-50%)', 2), ('Medium (50-75%)', 3), ('High (75-90%)', 2), ('Very High (90-100%)', 2)]
+
+    fractions = client.get('/api/analytics/disease-confidence?edges=0,0.5,1', headers=headers).get_json()
+    assert [bucket['count'] for bucket in fractions] == [2, 7]
+    bins = client.get('/api/analytics/disease-confidence?bins=10&source=scans', headers=headers).get_json()
+    assert len(bins) == 10 and bins[5] == {'confidence_range': '50-60%', 'min': 50, 'max': 60, 'count': 1}
+
+def test_disease_confidence_rejects_bad_parameters(client, user_id, auth_headers):
+    headers = auth_headers(user_id)
+    for params in ('source=crops', 'bins=0', f'bins={MAX_BINS + 1}', 'edges=90,50', 'edges=a,b'):
+        assert client.get(f'/api/analytics/disease-confidence?{params}', headers=headers).status_code == 400
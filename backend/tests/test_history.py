@@ -0,0 +1,74 @@
+# tests/test_history.py
+from datetime import datetime, timedelta
+import pytest
+from app import db
+from app.models.calculator_result import CalculatorResult
+from app.models.disease_scan import DiseaseScan
+from app.utils.history import trim_history
+from app.utils.sql_instrumentation import track_queries
+
+def save(client, headers, calculator_type='fertilizer'):
+    return client.post('/api/calculator-results/save', headers=headers, json={
+        'calculator_type': calculator_type, 'input_data': {'crop': 'rice'}, 'result_data': {'urea_kg': 12},
+    })
+
+def saved_ids(app, user_id, **scope):
+    with app.app_context():
+        return [row.id for row in CalculatorResult.query.filter_by(user_id=user_id, **scope)
+                .order_by(CalculatorResult.id)]
+
+@pytest.mark.query_budget(max_queries=3, max_repeats=1)  # INSERT, trim DELETE, refresh for the id
+def test_calculator_save_keeps_the_cap(app, client, make_user, auth_headers):
+    user_id = make_user()
+    headers = auth_headers(user_id)
+    app.config['HISTORY_CAPS'] = {**app.config['HISTORY_CAPS'], 'calculator_results': 3}
+    try:
+        ids = [save(client, headers).get_json()['id'] for _ in range(5)]
+    finally:
+        app.config['HISTORY_CAPS'] = {**app.config['HISTORY_CAPS'], 'calculator_results': 10}
+    assert saved_ids(app, user_id) == ids[-3:]
+
+def test_trim_is_one_statement_however_long_the_history(app, make_user):
+    user_id = make_user()
+    with app.app_context():
+        started = datetime(2026, 1, 1)
+        db.session.add_all(DiseaseScan(user_id=user_id, image_filename=f'leaf{i}.jpg', image_data=b'\xff' * 100,
+                                       scan_timestamp=started + timedelta(minutes=i)) for i in range(40))
+        db.session.flush()
+        with track_queries() as stats:
+            assert trim_history(DiseaseScan, DiseaseScan.scan_timestamp, user_id, cap=10) == 30
+        assert stats.count == 1  # No SELECT of the existing rows (or their BLOBs) first
+        kept = [scan.image_filename for scan in DiseaseScan.query.order_by(DiseaseScan.scan_timestamp)]
+        assert kept == [f'leaf{i}.jpg' for i in range(30, 40)]
+        db.session.commit()
+
+def test_trim_scope_and_other_users_are_untouched(app, make_user):
+    user_id, other_id = make_user('grower'), make_user('neighbour')
+    with app.app_context():
+        for owner, calculator_type in [(user_id, 'pesticide')] * 4 + [(user_id, 'fertilizer')] * 2 + \
+                [(other_id, 'pesticide')] * 4:
+            db.session.add(CalculatorResult(user_id=owner, calculator_type=calculator_type,
+                                            input_data={}, result_data={}))
+        db.session.flush()
+        assert trim_history(CalculatorResult, CalculatorResult.created_at, user_id, cap=1,
+                            calculator_type='pesticide') == 3
+        db.session.commit()
+    assert len(saved_ids(app, user_id, calculator_type='pesticide')) == 1
+    assert len(saved_ids(app, user_id, calculator_type='fertilizer')) == 2
+    assert len(saved_ids(app, other_id)) == 4
+
+def test_trim_tally_counts_the_deleted_rows(app, make_user):
+    user_id = make_user()
+    with app.app_context():
+        started = datetime(2026, 1, 1)
+        db.session.add_all(DiseaseScan(user_id=user_id, image_filename=f'leaf{i}.jpg', is_confident=i % 3 == 0,
+                                       scan_timestamp=started + timedelta(minutes=i)) for i in range(12))
+        db.session.flush()
+        confident = {'confident': DiseaseScan.is_confident.is_(True)}
+        with track_queries() as stats:
+            assert trim_history(DiseaseScan, DiseaseScan.scan_timestamp, user_id, cap=10, tally=confident) == \
+                {'deleted': 2, 'confident': 1}
+            assert trim_history(DiseaseScan, DiseaseScan.scan_timestamp, user_id, cap=10, tally=confident) == \
+                {'deleted': 0, 'confident': 0}
+        assert stats.count == 3  # Nothing to trim the second time, so no DELETE
+        db.session.commit()
@@ -0,0 +1,40 @@
+# tests/test_hyperloglog.py
+import pytest
+from app.utils.hyperloglog import DEFAULT_PRECISION, HyperLogLog
+
+STANDARD_ERROR = 1.04 / (1 << DEFAULT_PRECISION) ** 0.5  # ~1.6%
+
+def sketch(viewers):
+    hll = HyperLogLog()
+    for viewer in viewers:
+        hll.add(viewer)
+    return hll
+
+@pytest.mark.parametrize('cardinality', [10, 1000, 100000])
+def test_estimate_is_within_three_standard_errors(cardinality):
+    # Every viewer is seen twice, as a logged-in id would be across page loads
+    viewers = [f'user:{i}' for i in range(cardinality)] * 2
+    estimate = sketch(viewers).count()
+    assert abs(estimate - cardinality) <= max(1, 3 * STANDARD_ERROR * cardinality), estimate
+
+def test_merge_matches_a_single_sketch_over_the_union():
+    first, second = sketch(f'ip:{i}' for i in range(0, 6000)), sketch(f'ip:{i}' for i in range(4000, 10000))
+    union = sketch(f'ip:{i}' for i in range(10000))
+    assert first.merge(second).registers == union.registers
+    assert abs(union.count() - 10000) <= 3 * STANDARD_ERROR * 10000
+    with pytest.raises(ValueError):
+        union.merge(HyperLogLog(precision=10))
+
+def test_bytes_round_trip():
+    original = sketch(range(5000))
+    restored = HyperLogLog.from_bytes(original.to_bytes())
+    assert (restored.p, restored.registers, restored.count()) == (original.p, original.registers, original.count())
+    assert HyperLogLog.from_bytes(HyperLogLog().to_bytes()).count() == 0
+    with pytest.raises(ValueError):
+        HyperLogLog(registers=bytes(10))
+
+def test_serialized_size_is_bounded():
+    # Registers are one byte each, so even a saturated sketch stays near 2**p bytes
+    full = sketch(range(200000)).to_bytes()
+    assert len(full) <= (1 << DEFAULT_PRECISION) + 64
+    assert len(sketch(['user:1', 'user:2']).to_bytes()) < 100
@@ -0,0 +1,77 @@
+# tests/test_index_advisor.py
+import json
+import pytest
+from app.services.query_profiler_service import QueryProfilerService, fingerprint, load_samples
+from app.utils.index_advisor import advise_indexes
+
+UNINDEXED = "SELECT forum_posts.id FROM forum_posts WHERE forum_posts.status = ? ORDER BY forum_posts.views DESC"
+INDEXED = ("SELECT forum_replies.id FROM forum_replies WHERE forum_replies.post_id = ? "
+           "ORDER BY forum_replies.created_at")
+JOINED = ("SELECT forum_posts.id FROM forum_posts JOIN forum_replies AS r ON r.post_id = forum_posts.id "
+          "WHERE r.is_accepted = ? AND forum_posts.views >= ?")
+
+def stats(count, total_ms, explains=()):
+    return {'count': count, 'total_ms': total_ms, 'explains': list(explains)}
+
+@pytest.fixture
+def samples_dir(app, tmp_path, monkeypatch):
+    monkeypatch.setitem(app.config, 'QUERY_SAMPLES_DIR', str(tmp_path))
+    return tmp_path
+
+def test_fingerprint_collapses_literals_and_in_lists():
+    assert fingerprint("SELECT * FROM farms WHERE user_id = 42 AND name = 'O''Brien farm'\n  AND id IN (1, 2, 3)") == \
+        "SELECT * FROM farms WHERE user_id = ? AND name = ? AND id IN (?+)"
+    assert fingerprint("SELECT * FROM farms WHERE id IN (%(id_1)s, %(id_2)s)") == \
+        fingerprint("SELECT * FROM farms WHERE id IN (?)")
+
+def test_suggests_equality_then_sort_columns_and_skips_covered_queries(app):
+    with app.app_context():
+        suggestions = advise_indexes({UNINDEXED: stats(50, 400.0), INDEXED: stats(500, 900.0),
+                                      'INSERT INTO forum_posts (status) VALUES (?)': stats(900, 5000.0)})
+    assert [(s['table'], s['columns']) for s in suggestions] == [('forum_posts', ['status', 'views'])]
+    assert suggestions[0]['name'] == 'idx_forum_posts_status_views'
+
+def test_join_aliases_resolve_to_their_tables(app):
+    with app.app_context():
+        suggestions = advise_indexes({JOINED: stats(10, 100.0)})
+    # forum_posts is looked up by its primary key, so only the joined table gets a suggestion
+    assert [(s['table'], s['columns']) for s in suggestions] == [('forum_replies', ['post_id', 'is_accepted'])]
+
+def test_unique_lookups_are_not_indexed_again(app):
+    with app.app_context():
+        assert advise_indexes({"SELECT users.id FROM users WHERE users.email = ? AND users.role = ?": stats(9, 90.0),
+                               "SELECT users.id FROM users WHERE users.id = ? AND users.role = ?": stats(9, 90.0)}) == []
+
+def test_plan_evidence_ranks_full_scans_first(app):
+    scan = {'plan': [{'id': 2, 'parent': 0, 'notused': 0, 'detail': 'SCAN forum_replies'}]}
+    indexed = {'plan': [{'id': 2, 'parent': 0, 'notused': 0, 'detail': 'SEARCH forum_posts USING INDEX x (id=?)'}]}
+    statuses = "SELECT forum_posts.id FROM forum_posts WHERE forum_posts.status = ?"
+    helpful = "SELECT forum_replies.id FROM forum_replies WHERE forum_replies.helpful_count = ?"
+    with app.app_context():
+        suggestions = advise_indexes({statuses: stats(10, 300.0, [indexed]), helpful: stats(10, 200.0, [scan])},
+                                     min_calls=5)
+        assert [(s['columns'], s['plan']) for s in suggestions] == [(['helpful_count'], 'scan'),
+                                                                     (['status'], 'indexed')]
+        assert advise_indexes({statuses: stats(4, 300.0)}, min_calls=5) == []
+
+def test_samples_are_merged_and_scaled_by_sample_rate(app, samples_dir):
+    for pid, rate, count in ((1, 0.5, 3), (2, 1.0, 4)):
+        statements = {UNINDEXED: {'count': count, 'total_ms': count * 2.0, 'max_ms': 3.0, 'slow': 1,
+                                  'histogram': [0, count, 0], 'explains': []}}
+        (samples_dir / f'samples-{pid}.json').write_text(json.dumps({'sample_rate': rate, 'statements': statements}))
+    (samples_dir / 'samples-3.json').write_text('{truncated')
+    merged = load_samples(app)[UNINDEXED]
+    assert (merged['count'], merged['estimated_calls'], merged['estimated_total_ms']) == (7, 10.0, 20.0)
+    assert merged['histogram'] == [0, 7, 0]
+
+def test_slow_samples_are_explained_and_advised(app, samples_dir):
+    profiler = QueryProfilerService()
+    profiler._app, profiler.sample_rate, profiler.slow_ms = app, 1.0, 10.0
+    profiler.record(UNINDEXED, 25.0, parameters=('open',))
+    profiler.record(UNINDEXED, 2.0, parameters=('open',))
+    profiler.flush()
+    merged = load_samples(app)
+    assert merged[fingerprint(UNINDEXED)]['slow'] == 1
+    with app.app_context():
+        [suggestion] = advise_indexes(merged)
+    assert suggestion['columns'] == ['status', 'views'] and suggestion['plan'] == 'scan'
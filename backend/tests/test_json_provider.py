@@ -0,0 +1,104 @@
+# tests/test_json_provider.py
+import time
+import uuid
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta, timezone
+from zoneinfo import ZoneInfo
+from decimal import Decimal
+import pytest
+from flask import Flask
+from flask.json.provider import DefaultJSONProvider
+from app.utils import json_provider
+from app.utils.json_provider import FastJSONProvider
+
+np = pytest.importorskip('numpy')
+
+@dataclass
+class Reading:
+    sensor: str
+    taken_at: datetime
+
+PAYLOADS = {
+    'nested': {'b': [1, 2.5, None, True], 'a': {'z': 'last', 'y': []}, 'count': 2 ** 63 - 1},
+    'dates': {'at': datetime(2026, 10, 19, 6, 30, tzinfo=timezone.utc), 'naive': datetime(2026, 1, 2, 3, 4, 5, 999999),
+              'day': date(2026, 2, 28), 'ist': datetime(2026, 3, 1, 2, 0, tzinfo=timezone(timedelta(hours=5, minutes=30))),
+              'zone': datetime(2026, 7, 1, 12, tzinfo=ZoneInfo('UTC')), 'early': date(999, 12, 31)},
+    'decimal and uuid': {'amount': Decimal('1234.50'), 'id': uuid.UUID('12345678-1234-5678-1234-567812345678')},
+    'dataclass': {'reading': Reading('soil-3', datetime(2026, 5, 1))},
+    'devanagari': {'title': 'टमाटर की पत्तियों पर धब्बे', 'price': '€ 12', 'bom': '\ufeff'},
+    'latin-1': {'farmer': 'José', 'note': 'naïve', 'nbsp': 'a\xa0b'},
+    'astral and control': {'emoji': '🌾🍅', 'raw': 'tab\tnewline\nnull\x00del\x7fend', 'quote': 'say "hi"'},
+    'escaped backslashes': {'path': 'C:\\farms\\é', 'literal': '\\xe9 and \\U0001f33e are text', 'mixed': '\\é\\\\ü'},
+    'non-string keys': {1: 'one', 2: 'two'},
+    'huge int': {'big': 2 ** 70},
+    'float formats': {'small': [1e-05, 1.5e-05, 2.5e-06, 0.0001, 0.00012, -7e-05], 'large': [1e15, 1e16, -1.2e17, 1e308],
+                      'plain': [0.1, 1 / 3, 12345.678, 1.0, -0.0], 'in text': 'ratio 1e5 at 0.00001'},
+    'non-finite': {'nan': float('nan'), 'inf': [float('inf'), -float('inf')], 'missing': None},
+}
+
+def render(provider_class, payload, debug=False):
+    app = Flask(__name__)
+    app.debug = debug
+    app.json = provider_class(app)
+    with app.app_context():
+        return app.json.response(payload).get_data()
+
+@pytest.mark.parametrize('name', PAYLOADS)
+@pytest.mark.parametrize('debug', [False, True], ids=['compact', 'indented'])
+def test_output_matches_the_default_provider(name, debug):
+    assert render(FastJSONProvider, PAYLOADS[name], debug) == render(DefaultJSONProvider, PAYLOADS[name], debug)
+
+def test_matches_without_orjson(monkeypatch):
+    monkeypatch.setattr(json_provider, 'ORJSON_AVAILABLE', False)
+    for payload in PAYLOADS.values():
+        assert render(FastJSONProvider, payload) == render(DefaultJSONProvider, payload)
+
+@pytest.mark.parametrize('payload, expected', [
+    ({'confidence': np.float32(0.75), 'class_index': np.int64(3), 'scores': np.array([[0.5, 0.25]]),
+      'ok': np.bool_(True)}, {'confidence': 0.75, 'class_index': 3, 'scores': [[0.5, 0.25]], 'ok': True}),
+    ({'confidence': np.float32('inf'), 'scores': np.array([0.5, np.nan, 1e-06]), 'missing': None},
+     {'confidence': float('inf'), 'scores': [0.5, float('nan'), 1e-06], 'missing': None}),
+], ids=['finite', 'non-finite'])
+def test_numpy_values_are_converted(payload, expected):
+    assert render(FastJSONProvider, payload) == render(DefaultJSONProvider, expected)
+
+@pytest.mark.skipif(not json_provider.ORJSON_AVAILABLE, reason='orjson is not installed')
+@pytest.mark.parametrize('payload', [{'value': 1e-6}, {'value': 1e16}, {'value': float('nan')},
+                                     {'values': [None, float('-inf')]}], ids=['tiny', 'huge', 'nan', 'infinity'])
+def test_differently_formatted_floats_take_the_stdlib_path(payload):
+    app = Flask(__name__)
+    app.json = FastJSONProvider(app)
+    assert app.json._orjson_dumps(payload) is None
+    assert app.json._orjson_dumps({'value': 0.5, 'missing': None}) == b'{"missing":null,"value":0.5}'
+
+@pytest.mark.benchmark
+@pytest.mark.skipif(not json_provider.ORJSON_AVAILABLE, reason='orjson is not installed')
+def test_faster_than_the_default_provider_on_a_forum_page():
+    """Small benchmark: a forum list page, 50 posts with 8 replies each (emoji would take the stdlib path)"""
+    posts = [{'id': i, 'title': f'गेहूं में पीला रतुआ {i}', 'created_at': datetime(2026, 3, 1, i % 24),
+              'upvotes': i, 'score': i / 7, 'replies': [{'id': j, 'content': 'प्रोपिकोनाज़ोल का छिड़काव करें ' * 4,
+                                                        'created_at': datetime(2026, 3, 2)} for j in range(8)]}
+             for i in range(50)]
+    payload = {'posts': posts, 'pagination': {'page': 1, 'per_page': 50, 'total': 500}}
+
+    def best_of(provider_class, runs=5):
+        app = Flask(__name__)
+        app.json = provider_class(app)
+        with app.app_context():
+            timings = []
+            for _ in range(runs):
+                started = time.perf_counter()
+                app.json.response(payload)
+                timings.append(time.perf_counter() - started)
+        return min(timings)
+
+    fast, default = best_of(FastJSONProvider), best_of(DefaultJSONProvider)
+    print(f"\nforum page: orjson {fast * 1000:.2f} ms, stdlib {default * 1000:.2f} ms")
+    assert fast < default
+
+def test_forum_page_matches_the_default_provider():
+    posts = [{'id': i, 'title': f'गेहूं में पीला रतुआ {i}', 'created_at': datetime(2026, 3, 1, i % 24), 'score': i / 7,
+              'replies': [{'id': j, 'content': 'प्रोपिकोनाज़ोल का छिड़काव करें', 'created_at': datetime(2026, 3, 2)}
+                          for j in range(8)]} for i in range(50)]
+    payload = {'posts': posts, 'pagination': {'page': 1, 'per_page': 50, 'total': 500}}
+    assert render(FastJSONProvider, payload) == render(DefaultJSONProvider, payload)
@@ -0,0 +1,153 @@
+# tests/test_ledger_rollup.py
+import random
+import time
+from datetime import date
+import pytest
+from sqlalchemy import extract, func
+from app import db
+from app.models.transaction import FarmLedger, FarmLedgerMonthly
+from app.utils.ledger_rollup import rebuild_ledger_rollups, totals_by_category, totals_by_month, totals_by_type
+
+CATEGORIES = ['Seeds', 'Fertilizer', 'Labour', 'Harvest sale']
+
+def buckets(user_id):
+    """{(year, month, type, category): (amount, entries)} as maintained by the listeners"""
+    rows = FarmLedgerMonthly.query.filter(FarmLedgerMonthly.user_id == user_id, FarmLedgerMonthly.entry_count > 0)
+    return {(r.year, r.month, r.transaction_type, r.category): (float(r.amount), r.entry_count) for r in rows}
+
+def rebuilt(user_id):
+    """The buckets recomputed from farm_ledger, leaving the maintained ones in place"""
+    rebuild_ledger_rollups(user_id)
+    result = buckets(user_id)
+    db.session.rollback()
+    return result
+
+def direct_sums(user_id, group_by, start=None, end=None, **filters):
+    """SUM(amount) straight from farm_ledger over inclusive (year, month) bounds"""
+    query = db.session.query(*group_by, func.sum(FarmLedger.amount)).filter_by(user_id=user_id, **filters)
+    if start:
+        query = query.filter(FarmLedger.transaction_date >= date(*start, 1))
+    if end:
+        query = query.filter(FarmLedger.transaction_date < date(end[0] + end[1] // 12, end[1] % 12 + 1, 1))
+    return {tuple(row[:-1]): pytest.approx(row[-1]) for row in query.group_by(*group_by)}
+
+@pytest.fixture
+def ledger(app, make_user):
+    """Two users with 300 and 20 ledger rows over Nov 2023 - Mar 2026, added through the ORM"""
+    user_id, other_id = make_user('grower'), make_user('neighbour')
+    rng = random.Random(39)
+    with app.app_context():
+        for owner, count in ((user_id, 300), (other_id, 20)):
+            db.session.add_all(FarmLedger(
+                user_id=owner, amount=round(rng.uniform(1, 5000), 2), category=rng.choice(CATEGORIES),
+                transaction_type='income' if i % 4 == 0 else 'expense',
+                transaction_date=date(2023 + (10 + i % 29) // 12, (10 + i % 29) % 12 + 1, 1 + i % 28)
+            ) for i in range(count))
+        db.session.commit()
+    return user_id, other_id
+
+@pytest.mark.parametrize('start, end', [
+    (None, None), ((2024, 1), (2024, 12)), ((2023, 12), (2025, 2)), ((2025, 6), None), (None, (2024, 3)),
+    ((2026, 3), (2026, 3)), ((2027, 1), None),
+])
+def test_range_reads_match_a_direct_sum(app, ledger, start, end):
+    user_id, _ = ledger
+    year, month = extract('year', FarmLedger.transaction_date), extract('month', FarmLedger.transaction_date)
+    with app.app_context():
+        by_type = direct_sums(user_id, [FarmLedger.transaction_type], start, end)
+        assert totals_by_type(user_id, start, end) == {key[0]: value for key, value in by_type.items()}
+        by_category = direct_sums(user_id, [FarmLedger.category], start, end, transaction_type='expense')
+        assert {category: float(amount) for category, amount in totals_by_category(user_id, 'expense', start, end)} \
+            == {key[0]: value for key, value in by_category.items()}
+        assert totals_by_month(user_id, 'income', start, end) == {
+            (int(y), int(m)): value for (y, m), value in
+            direct_sums(user_id, [year, month], start, end, transaction_type='income').items()}
+
+def test_route_writes_keep_the_buckets_in_step(app, client, ledger, auth_headers):
+    user_id, other_id = ledger
+    headers = auth_headers(user_id)
+    created = client.post('/api/profile/transactions', headers=headers, json={
+        'amount': 120.5, 'category': 'Seeds', 'type': 'expense', 'date': '2025-05-10'})
+    transaction_id = created.get_json()['transaction']['id']
+    with app.app_context():
+        assert buckets(user_id) == rebuilt(user_id)
+        neighbour = buckets(other_id)
+
+    assert client.put(f'/api/profile/transactions/{transaction_id}', headers=headers,
+                      json={'date': '31/12/2024'}).status_code == 400
+    for change in ({'amount': 99.99}, {'type': 'income'}, {'category': 'Labour'}, {'date': '2024-12-31'},
+                   {'amount': 10, 'type': 'expense', 'category': 'Fertilizer', 'date': '2026-01-01'}):
+        assert client.put(f'/api/profile/transactions/{transaction_id}', headers=headers, json=change).status_code == 200
+        with app.app_context():
+            assert buckets(user_id) == rebuilt(user_id), change
+
+    assert client.delete(f'/api/profile/transactions/{transaction_id}', headers=headers).status_code == 200
+    with app.app_context():
+        assert buckets(user_id) == rebuilt(user_id)
+        assert buckets(other_id) == neighbour
+
+def test_changes_to_expired_rows_move_the_right_amounts(app, ledger):
+    user_id, other_id = ledger
+    with app.app_context():
+        row = FarmLedger(user_id=user_id, amount=40, category='Seeds', transaction_type='expense',
+                         transaction_date=date(2025, 3, 3))
+        db.session.add(row)
+        db.session.commit()
+        # Every change below assigns to attributes the previous commit expired
+        for attribute, value in (('amount', 75.25), ('transaction_type', 'income'), ('category', 'Labour'),
+                                 ('transaction_date', date(2024, 7, 1)), ('transaction_date', date(2025, 11, 30)),
+                                 ('user_id', other_id)):
+            setattr(row, attribute, value)
+            db.session.commit()
+            assert buckets(user_id) == rebuilt(user_id), attribute
+            assert buckets(other_id) == rebuilt(other_id), attribute
+        db.session.delete(row)
+        db.session.commit()
+        assert buckets(other_id) == rebuilt(other_id)
+
+def test_undated_rows_belong_to_no_month(app, make_user):
+    user_id = make_user()
+    with app.app_context():
+        row = FarmLedger(user_id=user_id, amount=5, category='Seeds', transaction_date=date(2025, 1, 1))
+        db.session.add(row)
+        db.session.commit()
+        row.transaction_date = None
+        db.session.commit()
+        assert buckets(user_id) == {}
+        row.transaction_date = date(2025, 2, 1)
+        db.session.commit()
+        assert buckets(user_id) == {(2025, 2, 'expense', 'Seeds'): (5.0, 1)}
+
+@pytest.mark.benchmark
+def test_rollup_reads_against_a_million_row_ledger(app, make_user):
+    """Opt-in (pytest -m benchmark): range reads from the rollup vs summing one user's 1M ledger rows"""
+    rows, chunk = 1_000_000, 50_000
+    user_id = make_user()
+    rng = random.Random(39)
+    with app.app_context():
+        for first in range(0, rows, chunk):
+            # Core executemany: no ORM events, the rollup is rebuilt once below
+            db.session.execute(FarmLedger.__table__.insert(), [{
+                'user_id': user_id, 'amount': round(rng.uniform(1, 5000), 2), 'category': rng.choice(CATEGORIES),
+                'transaction_type': 'income' if i % 4 == 0 else 'expense',
+                'transaction_date': date(2016 + i % 120 // 12, i % 12 + 1, 1 + i % 28),
+            } for i in range(first, first + chunk)])
+        rebuild_ledger_rollups(user_id)
+        db.session.commit()
+
+        def best_of(read, runs=3):
+            timings = []
+            for _ in range(runs):
+                started = time.perf_counter()
+                result = read()
+                timings.append(time.perf_counter() - started)
+            return min(timings), result
+
+        year, month = extract('year', FarmLedger.transaction_date), extract('month', FarmLedger.transaction_date)
+        start, end = (2018, 1), (2024, 12)
+        rollup, by_month = best_of(lambda: totals_by_month(user_id, 'expense', start, end))
+        scan, direct = best_of(lambda: direct_sums(user_id, [year, month], start, end, transaction_type='expense'))
+    print(f"\n{rows} ledger rows, 7-year monthly expenses: rollup {rollup * 1000:.2f} ms, "
+          f"farm_ledger {scan * 1000:.2f} ms")
+    assert by_month == {(int(y), int(m)): value for (y, m), value in direct.items()}
+    assert rollup * 10 < scan
@@ -0,0 +1,71 @@
+# tests/test_pagination.py
+import re
+from datetime import date, datetime, timedelta
+import pytest
+from sqlalchemy import update
+from app import db
+from app.models.forum import ForumPost
+from app.models.transaction import FarmLedger
+
+def query_count(response):
+    return int(re.search(r'desc="(\d+) queries"', response.headers['Server-Timing']).group(1))
+
+def walk(client, url, key, headers=None):
+    """Follow next_cursor from the first page; returns the pages' ids and per-page query counts"""
+    ids, counts, cursor = [], [], ''
+    while cursor is not None:
+        response = client.get(f'{url}&cursor={cursor}', headers=headers)
+        assert response.status_code == 200
+        body = response.get_json()
+        ids.append([item['id'] for item in body[key]])
+        counts.append(query_count(response))
+        cursor = body['pagination']['next_cursor'] if 'pagination' in body else body['next_cursor']
+    return ids, counts
+
+@pytest.fixture
+def ledger(app, make_user):
+    """Transactions sharing dates, plus some without one"""
+    user_id = make_user()
+    with app.app_context():
+        for i in range(23):
+            db.session.add(FarmLedger(user_id=user_id, amount=10 + i, category='Seeds', transaction_type='expense',
+                                      transaction_date=date(2026, 1, 1 + i // 3)))
+        db.session.flush()
+        # The column defaults to today, so undated rows are cleared afterwards
+        db.session.execute(update(FarmLedger).where(FarmLedger.amount.in_([10 + i for i in range(0, 23, 7)]))
+                           .values(transaction_date=None))
+        db.session.commit()
+    return user_id
+
+def test_transactions_keyset_walk_matches_the_full_listing(client, ledger, auth_headers):
+    headers = auth_headers(ledger)
+    everything = client.get('/api/profile/transactions?all=true', headers=headers).get_json()['transactions']
+    pages, counts = walk(client, '/api/profile/transactions?per_page=5', 'transactions', headers)
+    assert [len(page) for page in pages] == [5, 5, 5, 5, 3]
+    assert [item for page in pages for item in page] == [t['id'] for t in everything]
+    # No COUNT(*) and no OFFSET scan; the page where the dates run out also reads the undated rows
+    assert counts == [1, 1, 1, 2, 1]
+
+def test_keyset_total_is_opt_in(client, ledger, auth_headers):
+    body = client.get('/api/profile/transactions?cursor=&per_page=5&include_total=true',
+                      headers=auth_headers(ledger)).get_json()
+    assert body['total'] == 23 and body['has_next'] is True
+
+@pytest.mark.parametrize('cursor', ['not-base64!', 'W10', 'WyJ4IiwgMV0'])  # garbage, [], ["x", 1]
+def test_malformed_cursor_is_rejected(client, ledger, auth_headers, cursor):
+    response = client.get(f'/api/profile/transactions?cursor={cursor}', headers=auth_headers(ledger))
+    assert response.status_code == 400
+
+@pytest.mark.parametrize('sort_by', ['recent', 'hot', 'activity', 'replies'])
+def test_forum_keyset_walk_visits_every_post_once(app, client, make_user, sort_by):
+    author = make_user('author')
+    started = datetime(2026, 4, 1)
+    with app.app_context():
+        for i in range(17):
+            db.session.add(ForumPost(user_id=author, title=f'Post {i}', content='-', category='soil',
+                                     created_at=started + timedelta(hours=i // 2), reply_count=i % 3,
+                                     hot_score=(i % 4) / 3, last_reply_at=None if i % 5 else started))
+        db.session.commit()
+    pages, _ = walk(client, f'/api/forum/posts?sort_by={sort_by}&per_page=4', 'posts')
+    ids = [item for page in pages for item in page]
+    assert len(ids) == len(set(ids)) == 17
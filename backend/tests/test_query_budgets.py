@@ -0,0 +1,75 @@
+# tests/test_query_budgets.py
+"""Routes that used to issue one query per row; a loop creeping back in fails the budget"""
+from datetime import date, datetime, timedelta
+import pytest
+from app import db
+from app.models.farm import Farm, Crop
+from app.models.farm_note import FarmNote
+from app.models.forum import ForumPost, ForumReply
+from app.models.monitored_crop import MonitoredCrop
+
+POSTS = 6
+REPLIES_PER_POST = 4
+
+@pytest.fixture
+def forum(app, make_user):
+    """POSTS posts by one user, each with REPLIES_PER_POST replies by another"""
+    author, replier = make_user('author'), make_user('replier')
+    started = datetime(2026, 1, 1)
+    with app.app_context():
+        post_ids = []
+        for i in range(POSTS):
+            post = ForumPost(user_id=author, title=f'Leaf spots on tomato {i}', content='Brown rings on lower leaves',
+                             category='disease', created_at=started + timedelta(hours=i))
+            db.session.add(post)
+            db.session.flush()
+            for j in range(REPLIES_PER_POST):
+                db.session.add(ForumReply(user_id=replier, post_id=post.id, content=f'Reply {j}',
+                                          created_at=started + timedelta(hours=i, minutes=j + 1)))
+            post.reply_count = REPLIES_PER_POST
+            post_ids.append(post.id)
+        db.session.commit()
+    return {'author': author, 'replier': replier, 'post_ids': post_ids}
+
+@pytest.mark.query_budget(max_queries=3, max_repeats=1)
+def test_post_list_does_not_load_replies_per_post(client, forum):
+    response = client.get('/api/forum/posts')
+    assert response.status_code == 200
+    assert len(response.get_json()['posts']) == POSTS
+
+@pytest.mark.query_budget(max_queries=2, max_repeats=1)
+def test_post_detail_loads_replies_with_authors_in_one_query(client, forum):
+    response = client.get(f"/api/forum/posts/{forum['post_ids'][0]}")
+    assert response.status_code == 200
+    replies = response.get_json()['replies']
+    assert len(replies) == REPLIES_PER_POST
+    assert {reply['author_name'] for reply in replies} == {'replier'}
+
+@pytest.mark.query_budget(max_queries=2, max_repeats=1)
+def test_my_comments_joins_post_context(client, forum, auth_headers):
+    response = client.get('/api/forum/my-comments?per_page=50', headers=auth_headers(forum['replier']))
+    assert response.status_code == 200
+    comments = response.get_json()['comments']
+    assert len(comments) == POSTS * REPLIES_PER_POST
+    assert all(comment['post_title'].startswith('Leaf spots') for comment in comments)
+
+@pytest.mark.query_budget(max_queries=9, max_repeats=1)
+def test_delete_farm_does_not_delete_children_one_by_one(app, client, make_user, auth_headers):
+    user_id = make_user()
+    with app.app_context():
+        farm = Farm(name='North field', main_crop='wheat', size_acres=4, user_id=user_id)
+        db.session.add(farm)
+        db.session.flush()
+        for i in range(8):
+            db.session.add(Crop(name=f'Wheat {i}', farm_id=farm.id))
+            db.session.add(MonitoredCrop(name=f'Wheat {i}', farm_name=farm.name, farm_id=farm.id,
+                                         planting_date=date(2026, 3, 1), user_id=user_id))
+            db.session.add(FarmNote(content=f'Note {i}', farm_id=farm.id, user_id=user_id))
+        db.session.commit()
+        farm_id = farm.id
+
+    response = client.delete(f'/api/farms/{farm_id}', headers=auth_headers(user_id))
+    assert response.status_code == 200
+    with app.app_context():
+        assert db.session.get(Farm, farm_id) is None
+        assert MonitoredCrop.query.filter_by(farm_id=farm_id).count() == 0
@@ -0,0 +1,81 @@
+# tests/test_react_serve.py
+import gzip
+import pytest
+from flask import Flask
+from app.utils import compression
+from app.utils.compression import precompress_directory
+from app.utils.react_serve import IMMUTABLE_MAX_AGE, configure_react_serve
+
+BUNDLE = 'static/js/main.3f2a91c8.js'
+SCRIPT = b'function render(){return "PlantCare"}\n' * 200
+INDEX = b'<!doctype html><html><body><div id="root"></div><script src="/static/js/main.3f2a91c8.js"></script></body></html>'
+
+@pytest.fixture
+def client(tmp_path):
+    """A React build with a precompressed hashed bundle, served next to Flask's own static folder"""
+    build = tmp_path / 'build'
+    (build / 'static' / 'js').mkdir(parents=True)
+    (build / BUNDLE).write_bytes(SCRIPT)
+    (build / 'index.html').write_bytes(INDEX)
+    (build / 'manifest.json').write_text('{"short_name": "PlantCare"}')
+    assert precompress_directory(build) == (2 if compression.BROTLI_AVAILABLE else 1)  # Only the bundle is big enough
+
+    flask_static = tmp_path / 'flask_static'
+    flask_static.mkdir()
+    (flask_static / 'admin.css').write_text('body { color: green; }')
+    app = Flask(__name__, static_folder=str(flask_static), static_url_path='/static')
+    compression.init_app(app)
+    configure_react_serve(app, str(build))
+    return app.test_client()
+
+def get(client, path, accept_encoding=None, **headers):
+    if accept_encoding is not None:
+        headers['Accept-Encoding'] = accept_encoding
+    return client.get(path, headers=headers)
+
+def test_precompressed_gzip_variant_is_served(client):
+    response = get(client, f'/{BUNDLE}', 'gzip')
+    assert response.status_code == 200
+    assert response.headers['Content-Encoding'] == 'gzip' and response.headers['Vary'] == 'Accept-Encoding'
+    assert gzip.decompress(response.data) == SCRIPT
+    assert response.mimetype.endswith('javascript')
+
+@pytest.mark.skipif(not compression.BROTLI_AVAILABLE, reason='brotli is not installed')
+def test_precompressed_brotli_variant_is_preferred(client):
+    response = get(client, f'/{BUNDLE}', 'gzip, deflate, br')
+    assert response.headers['Content-Encoding'] == 'br'
+    assert compression.brotli.decompress(response.data) == SCRIPT
+
+def test_identity_when_no_encoding_is_accepted(client):
+    for accept_encoding in (None, 'gzip;q=0, br;q=0'):
+        response = get(client, f'/{BUNDLE}', accept_encoding)
+        assert 'Content-Encoding' not in response.headers and response.data == SCRIPT
+        assert response.headers['Vary'] == 'Accept-Encoding'
+
+def test_each_variant_has_its_own_etag(client):
+    identity, gzipped = get(client, f'/{BUNDLE}'), get(client, f'/{BUNDLE}', 'gzip')
+    assert identity.headers['ETag'] != gzipped.headers['ETag']
+    assert get(client, f'/{BUNDLE}', 'gzip', **{'If-None-Match': gzipped.headers['ETag']}).status_code == 304
+
+def test_hashed_assets_are_immutable(client):
+    assert get(client, f'/{BUNDLE}').headers['Cache-Control'] == f'public, max-age={IMMUTABLE_MAX_AGE}, immutable'
+    assert get(client, '/manifest.json').headers['Cache-Control'] == 'public, max-age=3600'
+
+@pytest.mark.parametrize('path', ['/', '/index.html', '/farms/12/ledger', '/forum/posts/3'])
+def test_index_and_client_routes_are_revalidated(client, path):
+    response = get(client, path, 'gzip, br')
+    assert response.status_code == 200 and response.data == INDEX  # Too small to have variants
+    assert response.headers['Cache-Control'] == 'no-cache'
+    assert 'Content-Encoding' not in response.headers
+
+def test_static_route_prefers_the_build_and_falls_back_to_flask(client):
+    assert client.application.url_map.bind('localhost').match(f'/{BUNDLE}')[0] == 'static'  # Flask's rule
+    assert get(client, f'/{BUNDLE}').data == SCRIPT
+    assert get(client, '/static/admin.css').data == b'body { color: green; }'
+    assert get(client, '/static/js/missing.3f2a91c8.js').status_code == 404
+
+def test_missing_build_serves_the_development_page(tmp_path):
+    app = Flask(__name__)
+    configure_react_serve(app, str(tmp_path / 'no-build'))
+    response = app.test_client().get('/farms')
+    assert response.status_code == 200 and b'Development Mode' in response.data
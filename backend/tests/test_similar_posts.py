@@ -0,0 +1,107 @@
+# tests/test_similar_posts.py
+import re
+import threading
+from datetime import datetime
+import pytest
+from app import db
+from app.models.forum import ForumPost
+from app.routes import forum, forum_management
+from app.services.similar_posts_service import SimilarPostsIndex, SimilarPostsService
+
+QUESTIONS = [
+    ('Yellow leaves on rice seedlings', 'The lower leaves of my rice nursery are turning yellow'),
+    ('Brown spots on tomato leaves', 'Dark brown rings on the older tomato leaves after rain'),
+    ('When to irrigate wheat', 'How many days between irrigations for wheat on sandy soil'),
+]
+
+def query_count(response):
+    return int(re.search(r'desc="(\d+) queries"', response.headers['Server-Timing']).group(1))
+
+def similar_titles(client, text):
+    return [post['title'] for post in client.get('/api/forum/similar', query_string={'q': text}).get_json()['posts']]
+
+@pytest.fixture
+def author(make_user):
+    return make_user('author')
+
+@pytest.fixture
+def service(app, author, monkeypatch, tmp_path):
+    """A fresh service behind the routes, with its snapshot in tmp_path and the questions already posted"""
+    monkeypatch.setitem(app.config, 'SIMILAR_POSTS_SNAPSHOT', str(tmp_path / 'similar.json.gz'))
+    with app.app_context():
+        db.session.add_all(ForumPost(user_id=author, title=title, content=content, category='disease')
+                           for title, content in QUESTIONS)
+        db.session.commit()
+    service = SimilarPostsService()
+    monkeypatch.setattr(forum, 'similar_posts_service', service)
+    monkeypatch.setattr(forum_management, 'similar_posts_service', service)
+    return service
+
+def test_suggestions_are_empty_until_the_index_is_ready(app, client, service):
+    response = client.get('/api/forum/similar?q=yellow rice leaves')
+    assert response.get_json() == {'posts': []}
+    assert query_count(response) == 0  # Nothing is built on the request path
+    with app.app_context():
+        service.refresh(app)
+    assert similar_titles(client, 'yellow rice leaves')[0] == 'Yellow leaves on rice seedlings'
+
+def test_posts_added_edited_and_removed_through_the_routes(app, client, service, author, auth_headers):
+    headers = auth_headers(author)
+    with app.app_context():
+        service.refresh(app)
+    created = client.post('/api/forum/posts', headers=headers, json={
+        'title': 'Whitefly on cotton plants', 'content': 'Tiny white insects under cotton leaves', 'category': 'pests'})
+    post_id = created.get_json()['id']
+    assert similar_titles(client, 'whitefly cotton') == ['Whitefly on cotton plants']
+
+    assert client.put(f'/api/forum/posts/{post_id}', headers=headers, json={
+        'title': 'Aphids on mustard crop', 'content': 'Green aphids all over the mustard', 'category': 'pests'
+    }).status_code == 200
+    assert similar_titles(client, 'whitefly cotton') == []
+    assert similar_titles(client, 'aphids mustard') == ['Aphids on mustard crop']
+
+    assert client.delete(f'/api/forum/posts/{post_id}', headers=headers).status_code == 200
+    assert similar_titles(client, 'aphids mustard') == []
+
+def test_refresh_picks_up_other_workers_changes(app, client, service, author):
+    with app.app_context():
+        service.refresh(app)
+        db.session.add(ForumPost(user_id=author, title='Potato late blight', content='Black lesions after fog',
+                                 category='disease'))
+        wheat = ForumPost.query.filter_by(title='When to irrigate wheat').one()
+        wheat.title, wheat.edited_at = 'Mustard sowing depth', datetime.utcnow()
+        db.session.delete(ForumPost.query.filter_by(title='Brown spots on tomato leaves').one())
+        db.session.commit()
+    assert similar_titles(client, 'potato blight') == []  # Not synced yet
+    with app.app_context():
+        assert service._sync(service._index, service._synced_at) == 3
+    assert similar_titles(client, 'potato blight') == ['Potato late blight']
+    assert similar_titles(client, 'mustard sowing') == ['Mustard sowing depth']
+    assert similar_titles(client, 'tomato brown spots') == []
+
+def test_snapshot_round_trip(app, service):
+    with app.app_context():
+        service.refresh(app)
+        expected = service._index.query('yellow rice leaves')
+        restored = SimilarPostsService()
+        # Loaded from the snapshot: only posts changed since it was written are read again
+        assert restored._load_snapshot(app)[0].to_snapshot() == service._index.to_snapshot()
+        restored.refresh(app)
+    assert restored._index.query('yellow rice leaves') == expected
+    assert SimilarPostsIndex.from_snapshot(service._index.to_snapshot()).query('yellow rice leaves') == expected
+    with pytest.raises(ValueError):
+        SimilarPostsIndex.from_snapshot({'version': 0})
+
+def test_background_thread_builds_the_index(app, service, monkeypatch):
+    started, hold = threading.Event(), threading.Event()
+
+    def refresh(app):
+        started.set()
+        hold.wait()  # Never released: the daemon thread stays parked instead of syncing later
+
+    monkeypatch.setattr(service, 'refresh', refresh)
+    service.init_app(app)
+    assert service._thread is None  # Off in the testing config
+    monkeypatch.setitem(app.config, 'SIMILAR_POSTS_BACKGROUND', True)
+    service.init_app(app)
+    assert started.wait(timeout=5)
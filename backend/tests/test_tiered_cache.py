@@ -0,0 +1,112 @@
+# tests/test_tiered_cache.py
+import os
+import types
+import pytest
+from flask import Flask
+from flask_caching import Cache
+from flask_caching.utils import function_namespace
+from app.utils import tiered_cache
+
+class Clock:
+    """Stands in for the time module inside tiered_cache so entries can be aged instantly"""
+
+    def __init__(self):
+        self.now = 1_000_000.0
+
+    def time(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(tiered_cache, 'time', types.SimpleNamespace(time=clock.time, sleep=clock.sleep))
+    return clock
+
+@pytest.fixture
+def memo_cache(tmp_path, clock):
+    app = Flask(__name__)
+    cache = Cache(app, config={
+        'CACHE_TYPE': 'app.utils.tiered_cache.TieredCache',
+        'CACHE_SHARED_TYPE': 'filesystem',
+        'CACHE_DIR': str(tmp_path),
+        'CACHE_STALE_TIMEOUT': 60,
+        'CACHE_LOCK_WAIT': 0.1,
+    })
+    with app.app_context():
+        yield cache
+
+def test_memoize_recomputes_stale_entry_instead_of_returning_none(memo_cache, clock):
+    calls = []
+
+    @memo_cache.memoize(timeout=10, cache_none=True)
+    def lookup(name):
+        calls.append(name)
+        return {'name': name} if name != 'unknown' else None
+
+    assert lookup('blight') == {'name': 'blight'}
+    assert lookup('unknown') is None
+    assert lookup('blight') == {'name': 'blight'} and lookup('unknown') is None
+    assert calls == ['blight', 'unknown']  # Both results, None included, come from the cache
+
+    clock.now += 11  # Past the soft expiry, within the stale period
+    # memoize refreshes its version key with the same timeout. While another worker holds that
+    # key's lock this one keeps the stale version, then wins the lock on the stale result itself:
+    # get() misses, and has() must not turn that miss into a cached None
+    backend = memo_cache.cache
+    version_key = memo_cache._memvname(function_namespace(lookup.uncached)[0])
+    backend._try_lock(version_key)
+
+    assert lookup('blight') == {'name': 'blight'}
+    assert calls == ['blight', 'unknown', 'blight']
+    assert lookup('unknown') is None  # A stale None is recomputed too
+    assert calls == ['blight', 'unknown', 'blight', 'unknown']
+
+def test_stale_entry_is_served_while_another_worker_recomputes(memo_cache, clock):
+    backend = memo_cache.cache
+    backend.set('key', 'old', timeout=10)
+    clock.now += 11
+    backend._try_lock('key')  # Another worker is recomputing
+    assert backend.get('key') == 'old'
+    assert backend.has('key') is False  # Stale: not a trustworthy cached value
+
+def test_has_is_false_for_the_key_this_thread_recomputes(memo_cache, clock):
+    backend = memo_cache.cache
+    backend.set('key', None, timeout=10)
+    assert backend.get('key') is None and backend.has('key') is True  # A fresh cached None
+    clock.now += 11
+    assert backend.get('key') is None  # Lock won: recompute
+    assert backend.has('key') is False
+    backend.set('key', 'new', timeout=10)
+    assert backend.get('key') == 'new' and backend.has('key') is True
+
+def test_file_tier_takes_its_lock_outside_the_cache_dir(memo_cache, tmp_path):
+    backend = memo_cache.cache
+    assert backend.file_locks.directory == str(tmp_path) + '.locks'
+    assert backend._try_lock('key') is True
+    assert backend._try_lock('key') is False  # Held, even by the same worker
+    lock_files = os.listdir(backend.file_locks.directory)
+    assert len(lock_files) == 1 and not set(lock_files) & set(os.listdir(tmp_path))  # Kept out of the file cache
+    backend.set('key', 'new', timeout=10)
+    assert backend._try_lock('key') is True  # set() released it
+
+def test_file_locks_are_exclusive_until_released_or_expired(tmp_path, clock):
+    first, second = tiered_cache.FileLocks(str(tmp_path)), tiered_cache.FileLocks(str(tmp_path))
+    assert first.acquire('lock:key', 30) is True
+    assert second.acquire('lock:key', 30) is False
+    assert second.acquire('lock:other', 30) is True
+    first.release('lock:key')
+    assert second.acquire('lock:key', 30) is True
+
+    clock.now += 29
+    assert first.acquire('lock:key', 30) is False
+    clock.now += 2  # Its owner died without releasing it
+    assert first.acquire('lock:key', 30) is True
+    assert second.acquire('lock:key', 30) is False
+
+def test_file_lock_being_written_counts_as_held(tmp_path):
+    locks = tiered_cache.FileLocks(str(tmp_path))
+    open(locks._path('lock:key'), 'w').close()  # Created, expiry not yet written
+    assert locks.acquire('lock:key', 30) is False
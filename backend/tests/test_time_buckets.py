@@ -0,0 +1,103 @@
+# tests/test_time_buckets.py
+import types
+from datetime import date, datetime, timedelta
+import pytest
+from sqlalchemy import func
+from sqlalchemy.dialects import mysql, postgresql
+from app import db
+from app.models.disease import DiseaseDetection
+from app.utils import time_buckets
+from app.utils.time_buckets import BUCKETS, aggregate, bucket_expression, bucket_starts, floor_bucket, next_bucket
+
+START = datetime(2025, 12, 15)
+DAYS = 40
+# Moments on either side of day, week (Monday), month, leap-day and year boundaries
+EDGES = [datetime(2023, 12, 31, 23, 59, 59), datetime(2024, 1, 1), datetime(2024, 2, 28, 23, 59, 59),
+         datetime(2024, 2, 29, 12), datetime(2024, 3, 1), datetime(2024, 3, 3, 23, 59, 59), datetime(2024, 3, 4),
+         datetime(2024, 3, 31, 23, 59, 59), datetime(2024, 4, 1), datetime(2024, 4, 1, 0, 0, 1)]
+
+@pytest.fixture
+def detections(app, make_user):
+    """One detection per day from START, alternating between two diseases, plus another user's"""
+    user_id, other_id = make_user('grower'), make_user('neighbour')
+    with app.app_context():
+        db.session.add_all(DiseaseDetection(user_id=user_id, predicted_disease='Rust' if i % 2 else 'Blight',
+                                            detected_at=START + timedelta(days=i, hours=i % 24))
+                           for i in range(DAYS))
+        db.session.add(DiseaseDetection(user_id=other_id, predicted_disease='Rust', detected_at=START))
+        db.session.commit()
+    return user_id
+
+def test_buckets_match_the_python_calculation(app, detections):
+    moments = [START + timedelta(days=i, hours=i % 24) for i in range(DAYS)]
+    with app.app_context():
+        for bucket in BUCKETS:
+            rows = aggregate(DiseaseDetection, DiseaseDetection.detected_at, bucket, START, START + timedelta(DAYS),
+                             filters=[DiseaseDetection.user_id == detections], fill=False)
+            expected = {}
+            for moment in moments:
+                expected[floor_bucket(moment, bucket)] = expected.get(floor_bucket(moment, bucket), 0) + 1
+            assert {row['period']: row['count'] for row in rows} == expected, bucket
+
+def test_filled_series_per_group(app, detections):
+    with app.app_context():
+        rows = aggregate(DiseaseDetection, DiseaseDetection.detected_at, 'month', datetime(2025, 11, 1),
+                         datetime(2026, 3, 1), group_by=[DiseaseDetection.predicted_disease],
+                         filters=[DiseaseDetection.user_id == detections])
+    series = {(row['predicted_disease'], row['period']): row['count'] for row in rows}
+    months = [date(2025, 11, 1), date(2025, 12, 1), date(2026, 1, 1), date(2026, 2, 1)]
+    assert len(rows) == 2 * len(months)
+    assert [series[('Blight', month)] for month in months] == [0, 9, 11, 0]
+    assert [series[('Rust', month)] for month in months] == [0, 8, 12, 0]
+
+def test_range_end_is_exclusive_and_total_without_bucket(app, detections):
+    with app.app_context():
+        [total] = aggregate(DiseaseDetection, DiseaseDetection.detected_at, None, START, START + timedelta(days=10),
+                            filters=[DiseaseDetection.user_id == detections])
+        assert total == {'count': 10}
+        with pytest.raises(ValueError):
+            aggregate(DiseaseDetection, DiseaseDetection.detected_at, 'day', START)
+
+@pytest.mark.parametrize('bucket', BUCKETS)
+def test_rows_on_bucket_boundaries(app, make_user, bucket):
+    user_id = make_user()
+    with app.app_context():
+        db.session.add_all(DiseaseDetection(user_id=user_id, predicted_disease='Rust', detected_at=moment,
+                                            confidence_score=10 * (i + 1)) for i, moment in enumerate(EDGES))
+        db.session.commit()
+        rows = aggregate(DiseaseDetection, DiseaseDetection.detected_at, bucket, EDGES[0], EDGES[-1],
+                         measures={'count': func.count(), 'confidence': func.sum(DiseaseDetection.confidence_score)},
+                         filters=[DiseaseDetection.user_id == user_id])
+
+    expected = {start: [0, 0] for start in bucket_starts(bucket, EDGES[0], EDGES[-1])}
+    for i, moment in enumerate(EDGES[:-1]):  # The end is exclusive
+        expected[floor_bucket(moment, bucket)][0] += 1
+        expected[floor_bucket(moment, bucket)][1] += 10 * (i + 1)
+    assert [(row['period'], row['count'], row['confidence']) for row in rows] == \
+        [(start, count, total) for start, (count, total) in expected.items()]
+
+def test_unsupported_database_is_a_clear_error(monkeypatch):
+    dialect = types.SimpleNamespace(name='oracle')
+    monkeypatch.setattr(time_buckets, 'db', types.SimpleNamespace(engine=types.SimpleNamespace(dialect=dialect)))
+    with pytest.raises(ValueError, match='mysql, sqlite and postgresql, not oracle'):
+        bucket_expression(DiseaseDetection.detected_at, 'day')
+
+def test_bucket_arithmetic():
+    assert floor_bucket(datetime(2026, 1, 4, 23, 59), 'week') == date(2025, 12, 29)  # A Sunday
+    assert next_bucket(date(2025, 12, 1), 'month') == date(2026, 1, 1)
+    assert next_bucket(date(2025, 1, 1), 'year') == date(2026, 1, 1)
+    assert bucket_starts('month', date(2025, 11, 20), date(2026, 2, 1)) == \
+        [date(2025, 11, 1), date(2025, 12, 1), date(2026, 1, 1)]
+    with pytest.raises(ValueError):
+        floor_bucket(date(2026, 1, 1), 'fortnight')
+
+@pytest.mark.parametrize('dialect, bucket, sql', [
+    (mysql.dialect(), 'month', "date_format(disease_detections.detected_at, '%%Y-%%m-01')"),
+    (mysql.dialect(), 'week', "date_format(subdate(date(disease_detections.detected_at), "
+                              "weekday(disease_detections.detected_at)), '%%Y-%%m-%%d')"),
+    (postgresql.dialect(), 'year', "to_char(date_trunc('year', disease_detections.detected_at), 'YYYY-MM-DD')"),
+])
+def test_bucket_sql_per_dialect(monkeypatch, dialect, bucket, sql):
+    monkeypatch.setattr(time_buckets, 'db', types.SimpleNamespace(engine=types.SimpleNamespace(dialect=dialect)))
+    expression = bucket_expression(DiseaseDetection.detected_at, bucket)
+    assert str(expression.compile(dialect=dialect, compile_kwargs={'literal_binds': True})) == sql
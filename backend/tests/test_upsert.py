@@ -0,0 +1,24 @@
+# tests/test_upsert.py
+from datetime import datetime
+import pytest
+from app import db
+from app.models.forum import ForumPost, ForumVote
+from app.utils.upsert import insert_ignore
+
+def test_duplicate_is_skipped_with_a_zero_rowcount(app, make_user):
+    user_id = make_user()
+    with app.app_context():
+        post = ForumPost(user_id=user_id, title='Rust on wheat', content='Orange pustules')
+        db.session.add(post)
+        db.session.flush()
+        vote = dict(user_id=user_id, post_id=post.id, vote_type='upvote', created_at=datetime(2026, 5, 1))
+        assert db.session.execute(insert_ignore(ForumVote, **vote)).rowcount == 1
+        assert db.session.execute(insert_ignore(ForumVote, **{**vote, 'vote_type': 'downvote'})).rowcount == 0
+        assert [v.vote_type for v in ForumVote.query.filter_by(post_id=post.id)] == ['upvote']
+        db.session.rollback()
+
+def test_unsupported_database_is_a_clear_error(app, monkeypatch):
+    with app.app_context():
+        monkeypatch.setattr(db.engine.dialect, 'name', 'oracle')
+        with pytest.raises(ValueError, match='mysql, sqlite and postgresql, not oracle'):
+            insert_ignore(ForumVote, user_id=1, post_id=1, vote_type='upvote')
@@ -0,0 +1,133 @@
+# tests/test_user_stats.py
+import io
+from datetime import date, datetime
+import pytest
+from app import db
+from app.models.disease import DiseaseDetection
+from app.models.disease_scan import DiseaseScan
+from app.models.farm import Farm
+from app.models.monitored_crop import MonitoredCrop
+from app.models.transaction import FarmLedger
+from app.models.user_stats import UserStats
+from app.routes import disease_scans
+from app.utils import ml_models
+from app.utils.user_stats import adjust_user_stats, compute_user_stats, get_user_stats
+
+def stored(app, user_id):
+    with app.app_context():
+        stats = db.session.get(UserStats, user_id)
+        return stats and {column: value for column, value in stats.to_dict().items() if column != 'updated_at'}
+
+def rebuilt(app, user_id):
+    with app.app_context():
+        return compute_user_stats(user_id)
+
+@pytest.fixture
+def grower(app, make_user, monkeypatch, tmp_path):
+    """A user whose rollup row already exists, so every write below maintains it by deltas"""
+    user_id = make_user()
+    with app.app_context():
+        get_user_stats(user_id)
+    monkeypatch.setattr(disease_scans, 'UPLOAD_FOLDER', str(tmp_path))
+    monkeypatch.setattr(disease_scans, 'request_upload_sweep', lambda: None)
+    return user_id
+
+def upload_scans(client, headers, monkeypatch, confidences):
+    results = iter(confidences)
+    monkeypatch.setattr(ml_models, 'predict_plant_disease',
+                        lambda path: {'class': 'Tomato___Early_blight', 'confidence': next(results)})
+    for i in range(len(confidences)):
+        response = client.post('/api/disease-scans/scans', headers=headers, content_type='multipart/form-data',
+                               data={'image': (io.BytesIO(b'\xff\xd8' + bytes([i])), f'leaf{i}.jpg')})
+        assert response.status_code in (200, 201), response.get_json()
+
+def test_route_writes_keep_the_rollup_equal_to_a_rebuild(app, client, grower, auth_headers, monkeypatch):
+    headers = auth_headers(grower)
+    for name in ('North', 'South'):
+        assert client.post('/api/farms', headers=headers, json={'name': name, 'location': 'Punjab',
+                                                                 'mainCrop': 'rice', 'sizeAcres': 5}).status_code == 201
+    for name, farm in (('Rice', 'North'), ('Wheat', 'North'), ('Maize', 'South')):
+        assert client.post('/api/crops/crops', headers=headers, json={'name': name, 'farmName': farm,
+                                                                       'plantingDate': '2026-06-01'}).status_code == 201
+    ids = [client.post('/api/profile/transactions', headers=headers, json=payload).get_json()['transaction']['id']
+           for payload in ({'amount': 120.25, 'category': 'Seeds'}, {'amount': 80, 'category': 'Labour'},
+                           {'amount': 500, 'category': 'Sale', 'type': 'income'})]
+    client.put(f'/api/profile/transactions/{ids[0]}', headers=headers, json={'amount': 99.5, 'type': 'income'})
+    client.delete(f'/api/profile/transactions/{ids[1]}', headers=headers)
+
+    app.config['HISTORY_CAPS'] = {**app.config['HISTORY_CAPS'], 'disease_scans': 3}
+    try:
+        # The two oldest (one confident) are trimmed by the bulk DELETE
+        upload_scans(client, headers, monkeypatch, [80, 20, 90, 70, 10])
+    finally:
+        app.config['HISTORY_CAPS'] = {**app.config['HISTORY_CAPS'], 'disease_scans': 10}
+    with app.app_context():
+        scan_id = DiseaseScan.query.filter_by(user_id=grower, is_confident=True).first().id
+        assert DiseaseScan.query.filter_by(user_id=grower).count() == 3
+    client.delete(f'/api/disease-scans/scans/{scan_id}', headers=headers)
+
+    assert stored(app, grower) == rebuilt(app, grower) == {
+        'farm_count': 2, 'monitored_crop_count': 3, 'detection_count': 0, 'scan_count': 2,
+        'high_confidence_scan_count': 1, 'total_expenses': 0.0, 'total_income': 599.5}
+
+    # Deleting a farm bulk-deletes its monitored crops
+    with app.app_context():
+        north = Farm.query.filter_by(user_id=grower, name='North').one().id
+    assert client.delete(f'/api/farms/{north}', headers=headers).status_code == 200
+    assert stored(app, grower) == rebuilt(app, grower)
+    assert stored(app, grower)['monitored_crop_count'] == 1
+
+def test_orm_listeners_follow_inserts_updates_and_deletes(app, grower):
+    with app.app_context():
+        detections = [DiseaseDetection(user_id=grower, predicted_disease='Rust', detected_at=datetime(2026, 5, i + 1))
+                      for i in range(4)]
+        scan = DiseaseScan(user_id=grower, image_filename='leaf.jpg', is_confident=False)
+        entry = FarmLedger(user_id=grower, amount=40, category='Seeds', transaction_type='expense',
+                           transaction_date=date(2026, 5, 1))
+        db.session.add_all([*detections, scan, entry, MonitoredCrop(user_id=grower, name='Okra', farm_name='-',
+                                                                     planting_date=date(2026, 5, 1))])
+        db.session.commit()
+        db.session.delete(detections[0])
+        scan.is_confident = True
+        entry.amount, entry.transaction_type = 55.75, 'income'
+        db.session.commit()
+    assert stored(app, grower) == rebuilt(app, grower)
+    assert stored(app, grower)['high_confidence_scan_count'] == 1
+    assert stored(app, grower)['total_income'] == 55.75
+
+    with app.app_context():
+        db.session.add(FarmLedger(user_id=grower, amount=10, category='Seeds', transaction_type='expense'))
+        db.session.rollback()
+    assert stored(app, grower) == rebuilt(app, grower)  # The delta rolls back with the write
+
+def test_adjust_user_stats_covers_bulk_deletes(app, grower, make_user):
+    with app.app_context():
+        db.session.add_all(DiseaseDetection(user_id=grower, predicted_disease='Rust') for _ in range(5))
+        db.session.commit()
+        doomed = [d.id for d in DiseaseDetection.query.filter_by(user_id=grower).limit(3)]
+        removed = DiseaseDetection.query.filter(DiseaseDetection.id.in_(doomed)).delete(synchronize_session=False)
+        adjust_user_stats(grower, detection_count=-removed)
+        db.session.commit()
+    assert stored(app, grower) == rebuilt(app, grower)
+    assert stored(app, grower)['detection_count'] == 2
+
+    newcomer = make_user('newcomer')
+    with app.app_context():
+        adjust_user_stats(newcomer, farm_count=1)  # No row yet: it is built from the source tables on first read
+        db.session.commit()
+    assert stored(app, newcomer) is None
+
+def test_rebuild_command_repairs_drifted_rows(app, grower, make_user):
+    other = make_user('neighbour')
+    with app.app_context():
+        db.session.add(Farm(user_id=grower, name='East', location='-', main_crop='rice', size_acres=1))
+        db.session.add(FarmLedger(user_id=other, amount=12, category='Seeds', transaction_type='expense'))
+        db.session.commit()
+        stats = db.session.get(UserStats, grower)
+        stats.farm_count, stats.total_expenses = 7, 1000
+        db.session.commit()
+    result = app.test_cli_runner().invoke(args=['rebuild-user-stats'])
+    assert result.exit_code == 0 and 'Rebuilt dashboard stats for 2 user(s)' in result.output
+    for user_id in (grower, other):
+        assert stored(app, user_id) == rebuilt(app, user_id)
+    assert stored(app, grower)['farm_count'] == 1
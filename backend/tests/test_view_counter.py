@@ -0,0 +1,41 @@
+# tests/test_view_counter.py
+import pytest
+from app import db
+from app.models.forum import ForumPost
+from app.services.view_counter_service import ViewCounterService
+
+fakeredis = pytest.importorskip('fakeredis')
+pytest.importorskip('lupa')  # fakeredis runs Lua scripts through lupa
+
+@pytest.fixture
+def post_id(app, make_user):
+    with app.app_context():
+        post = ForumPost(user_id=make_user(), title='Aphids on okra', content='Sticky leaves', views=0)
+        db.session.add(post)
+        db.session.commit()
+        return post.id
+
+def test_flush_does_not_release_a_lock_taken_over_after_expiry(app, post_id, monkeypatch):
+    service = ViewCounterService()
+    service._redis = fakeredis.FakeRedis()
+    apply = service._apply
+
+    def slow_apply(counts):
+        # The flush overran LOCK_TIMEOUT: the lock expired and another worker took it
+        service._redis.set(service.LOCK_KEY, 'other-worker', ex=service.LOCK_TIMEOUT)
+        return apply(counts)
+
+    monkeypatch.setattr(service, '_apply', slow_apply)
+    with app.app_context():
+        service._pending[post_id] = 3  # record() would also start the flush thread
+        assert service.flush() == 1
+        assert db.session.get(ForumPost, post_id).views == 3
+    assert service._redis.get(service.LOCK_KEY) == b'other-worker'
+
+def test_flush_releases_its_own_lock(app, post_id):
+    service = ViewCounterService()
+    service._redis = fakeredis.FakeRedis()
+    with app.app_context():
+        service._pending[post_id] = 2
+        assert service.flush() == 1
+    assert service._redis.get(service.LOCK_KEY) is None
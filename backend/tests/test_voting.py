@@ -0,0 +1,80 @@
+# tests/test_voting.py
+import threading
+import pytest
+from app import db
+from app.models.forum import ForumPost, ForumVote
+
+VOTERS = 12
+
+@pytest.fixture
+def post_id(app, make_user):
+    author = make_user('author')
+    with app.app_context():
+        post = ForumPost(user_id=author, title='Yellowing maize leaves', content='Whole field', category='general')
+        db.session.add(post)
+        db.session.commit()
+        return post.id
+
+def run_concurrently(app, calls):
+    """Run each (headers, json) vote in its own thread and session, all released at once"""
+    barrier = threading.Barrier(len(calls))
+    statuses = [None] * len(calls)
+
+    def vote(index, url, headers, json):
+        client = app.test_client()
+        barrier.wait()
+        statuses[index] = client.post(url, headers=headers, json=json).status_code
+
+    threads = [threading.Thread(target=vote, args=(index, *call)) for index, call in enumerate(calls)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return statuses
+
+def counters(app, post_id):
+    with app.app_context():
+        post = db.session.get(ForumPost, post_id)
+        rows = {vote_type: ForumVote.query.filter_by(post_id=post_id, vote_type=vote_type).count()
+                for vote_type in ('upvote', 'downvote')}
+        return (post.upvotes, post.downvotes), (rows['upvote'], rows['downvote'])
+
+def test_concurrent_votes_are_all_counted(app, post_id, make_user, auth_headers):
+    url = f'/api/forum/posts/{post_id}/vote'
+    calls = [(url, auth_headers(make_user(f'voter{i}')), {'vote_type': 'upvote' if i % 3 else 'downvote'})
+             for i in range(VOTERS)]
+    assert run_concurrently(app, calls) == [200] * VOTERS
+    assert counters(app, post_id) == ((8, 4), (8, 4))
+
+def test_double_submitted_vote_keeps_counters_in_step_with_rows(app, post_id, make_user, auth_headers):
+    url = f'/api/forum/posts/{post_id}/vote'
+    headers = auth_headers(make_user('voter'))
+    assert run_concurrently(app, [(url, headers, {'vote_type': 'upvote'})] * 2) == [200, 200]
+    stored, rows = counters(app, post_id)
+    assert stored == rows and rows[0] <= 1  # Toggled off or counted once, never twice
+
+def test_switching_and_toggling_a_vote(client, post_id, make_user, auth_headers):
+    url = f'/api/forum/posts/{post_id}/vote'
+    headers = auth_headers(make_user('voter'))
+    for vote_type, expected in [('upvote', (1, 0, 'upvote')), ('downvote', (0, 1, 'downvote')),
+                                ('downvote', (0, 0, None))]:
+        body = client.post(url, headers=headers, json={'vote_type': vote_type}).get_json()
+        assert (body['upvotes'], body['downvotes'], body['user_vote']) == expected
+
+@pytest.mark.query_budget(max_queries=1)
+def test_vote_statuses_for_a_page_of_posts(client, app, post_id, make_user, auth_headers):
+    voter = make_user('voter')
+    with app.app_context():
+        db.session.add(ForumVote(user_id=voter, post_id=post_id, vote_type='downvote'))
+        db.session.commit()
+    response = client.post('/api/forum/votes/status', headers=auth_headers(voter),
+                           json={'post_ids': [post_id, post_id + 1, post_id]})
+    assert response.status_code == 200
+    assert response.get_json()['votes'] == {str(post_id): 'downvote', str(post_id + 1): None}
+
+def test_vote_statuses_rejects_bad_ids(client, make_user, auth_headers):
+    headers = auth_headers(make_user('voter'))
+    assert client.post('/api/forum/votes/status', headers=headers, json={'post_ids': 'all'}).status_code == 400
+    assert client.post('/api/forum/votes/status', headers=headers, json={'post_ids': ['x']}).status_code == 400
+    too_many = {'post_ids': list(range(101))}
+    assert client.post('/api/forum/votes/status', headers=headers, json=too_many).status_code == 400
@@ -40,7 +40,7 @@ export default function CommunityForum() {
   const [page, setPage] = useState(1);
   const [totalPages, setTotalPages] = useState(1);
   const [selectedCategory, setSelectedCategory] = useState('');
-  const [sortBy, setSortBy] = useState('newest'); // newest, popular, activity
+  const [sortBy, setSortBy] = useState('newest'); // newest, hot, activity
   const [searchQuery, setSearchQuery] = useState('');
   
   // Modal and form state
@@ -75,6 +75,9 @@ export default function CommunityForum() {
   // State for tracking user votes on posts
   const [userVotes, setUserVotes] = useState({}); // {postId: 'upvote'|'downvote'|null}
   
+  // Similar existing questions shown while typing a new one
+  const [similarPosts, setSimilarPosts] = useState([]);
+  
   // Fetch posts with filtering and pagination
   useEffect(() => {
     fetchPosts();
@@ -82,6 +85,28 @@ export default function CommunityForum() {
     // eslint-disable-next-line
   }, [page, selectedCategory, sortBy, searchQuery]);
 
+  // Suggest similar questions as the title is typed (debounced)
+  useEffect(() => {
+    if (!dialogOpen || qTitle.trim().length < 3) {
+      setSimilarPosts([]);
+      return;
+    }
+    
+    const timer = setTimeout(async () => {
+      try {
+        const response = await fetch(`${API_URL}/forum/similar?q=${encodeURIComponent(qTitle.trim())}&limit=5`);
+        if (response.ok) {
+          const data = await response.json();
+          setSimilarPosts(data.posts || []);
+        }
+      } catch (err) {
+        
+      }
+    }, 300);
+    
+    return () => clearTimeout(timer);
+  }, [qTitle, dialogOpen]);
+
   const getCurrentUser = async () => {
     try {
       const token = localStorage.getItem('access_token');
@@ -302,23 +327,12 @@ export default function CommunityForum() {
         setReplyText(postId, '');
         setShowReplyField({...showReplyField, [postId]: false});
         
-        // Update post with new reply if returned
-        if (data.reply) {
-          const updatedPosts = posts.map(post => {
-            if (post.id === postId) {
-              return {
-                ...post,
-                replies: [...(post.replies || []), data.reply],
-                reply_count: (post.reply_count || 0) + 1
-              };
-            }
-            return post;
-          });
-          setPosts(updatedPosts);
-        } else {
-          // If no reply data returned, just refresh
-          fetchPosts();
-        }
+        // List summaries carry no replies, so count the new one and load the
+        // thread (with author names) instead of showing it on its own
+        setPosts(prevPosts => prevPosts.map(post =>
+          post.id === postId ? { ...post, reply_count: (post.reply_count || 0) + 1 } : post
+        ));
+        loadReplies(postId);
       } else {
         setReplyErrors({...replyErrors, [postId]: data.error || 'Failed to post reply'});
       }
@@ -328,6 +342,22 @@ export default function CommunityForum() {
     }
   };
   
+  // Load full replies for a post (list responses only carry a summary)
+  const loadReplies = async (postId) => {
+    try {
+      const response = await fetch(`${API_URL}/forum/posts/${postId}/replies?per_page=100`);
+      const data = await response.json();
+      
+      if (response.ok) {
+        setPosts(prevPosts => prevPosts.map(post =>
+          post.id === postId ? { ...post, replies: data.replies || [] } : post
+        ));
+      }
+    } catch (err) {
+      
+    }
+  };
+  
   // Vote on post
   const handleVote = async (postId, voteType) => {
     try {
@@ -384,27 +414,23 @@ export default function CommunityForum() {
     if (!token || postIds.length === 0) return;
     
     try {
-      const votePromises = postIds.map(async (postId) => {
-        const response = await fetch(`${API_URL}/forum/posts/${postId}/vote`, {
-          headers: {
-            'Authorization': `Bearer ${token}`
-          }
-        });
-        
-        if (response.ok) {
-          const result = await response.json();
-          return { postId, userVote: result.user_vote };
-        }
-        return { postId, userVote: null };
-      });
-      
-      const voteResults = await Promise.all(votePromises);
-      const voteMap = {};
-      voteResults.forEach(({ postId, userVote }) => {
-        voteMap[postId] = userVote;
+      const response = await fetch(`${API_URL}/forum/votes/status`, {
+        method: 'POST',
+        headers: {
+          'Content-Type': 'application/json',
+          'Authorization': `Bearer ${token}`
+        },
+        body: JSON.stringify({ post_ids: postIds })
       });
       
-      setUserVotes(voteMap);
+      if (response.ok) {
+        const result = await response.json();
+        const voteMap = {};
+        postIds.forEach(postId => {
+          voteMap[postId] = result.votes[postId] || null;
+        });
+        setUserVotes(voteMap);
+      }
     } catch (err) {
       
     }
@@ -833,7 +859,7 @@ export default function CommunityForum() {
                   sx={{ borderRadius: 1 }}
                 >
                   <MenuItem value="newest">Newest</MenuItem>
-                  <MenuItem value="popular">Popular</MenuItem>
+                  <MenuItem value="hot">Popular</MenuItem>
                   <MenuItem value="activity">Recent Activity</MenuItem>
                 </Select>
               </FormControl>
@@ -1302,6 +1328,25 @@ export default function CommunityForum() {
                       </Box>
                     </Collapse>
                     
+                    {/* Latest reply preview until the full replies are loaded */}
+                    {!post.replies && post.reply_count > 0 && (
+                      <Box mt={3}>
+                        <Divider sx={{ my: 2 }} />
+                        {post.latest_reply && (
+                          <Typography variant="body2" color="text.secondary" sx={{ mb: 1 }}>
+                            <strong>{post.latest_reply.author_name || 'Anonymous'}:</strong> {post.latest_reply.preview}
+                          </Typography>
+                        )}
+                        <Button
+                          size="small"
+                          onClick={() => loadReplies(post.id)}
+                          sx={{ color: '#16a34a' }}
+                        >
+                          View replies ({post.reply_count})
+                        </Button>
+                      </Box>
+                    )}
+                    
                     {/* Show Replies if any */}
                     {post.replies && post.replies.length > 0 && (
                       <Box mt={3}>
@@ -1478,6 +1523,22 @@ export default function CommunityForum() {
               autoComplete="off"
             />
             
+            {similarPosts.length > 0 && (
+              <Box sx={{ mt: 1, mb: 1, p: 1.5, bgcolor: '#f8fafc', borderRadius: 2 }}>
+                <Typography variant="caption" color="text.secondary" sx={{ fontWeight: 'bold' }}>
+                  Similar questions already asked
+                </Typography>
+                {similarPosts.map((similar) => (
+                  <Typography key={similar.id} variant="body2" sx={{ mt: 0.5 }}>
+                    {similar.title}
+                    <Typography component="span" variant="caption" color="text.secondary" sx={{ ml: 1 }}>
+                      {similar.solved ? 'Solved' : `${similar.reply_count || 0} replies`}
+                    </Typography>
+                  </Typography>
+                ))}
+              </Box>
+            )}
+            
             <FormControl fullWidth margin="normal" error={!!formErrors.category}>
               <InputLabel>Category</InputLabel>
               <Select